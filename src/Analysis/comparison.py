@@ -0,0 +1,400 @@
+"""
+Comparison of the fields of several cases (e.g. the 10 mean flows, of Mach numbers between 0.973 and 0.99).
+
+The fields of the cases are stacked once in arrays of shape (n_cases, n_quantities, nx, nr), so that every
+comparison is a batched array operation over all the cases and quantities instead of a loop over pairs of
+PostProcess objects:
+
+- the pairwise difference fields are a broadcast subtraction;
+- the pairwise L2 norms come from the Gram matrices of the cases, G = X W X^T, one batched matrix product per
+  quantity (W being the quadrature weights of the window), as ||a - b||^2 = G_aa + G_bb - 2 G_ab;
+- the correlation matrices are the Gram matrices of the fields centred case by case, normalized by their diagonal;
+- the pairwise L-infinity norms are reduced block by block of points, within a memory budget.
+
+Examples
+--------
+>>> stack = CaseStack.load(0.4, range(1, 11))
+>>> comparison = CaseComparison(stack, 'total', window=(0, 10, 0, 2), t=25, epsilon=0.01)
+>>> comparison.l2['ux']  # DataFrame (case x case)
+>>> comparison.correlation['p']
+>>> comparisons = compare_cases(0.4, range(1, 11), windows={'core': (0, 10, 0, 1), 'jet': (0, 20, 0, 3)})
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from src.Field.field_registry import get_field_registry
+from src.Field.perturbation_field import PerturbationField
+from src.Field.regridding import get_regridder
+from src.ReadData.read_mach import get_mach_reference
+from src.ReadData.read_radius import get_r_grid
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.tracing import span, traced
+
+pd = LazyModule('pandas')
+
+FIELDS = ('mean', 'amplitude', 'total')
+
+WEIGHTINGS = ('area', 'points')
+
+
+class CaseStack:
+    """
+    Fields of several cases of the same Strouhal number stacked on a common (x, r) grid.
+
+    Attributes
+    ----------
+    St : float
+        Strouhal number of the cases.
+    ID_MACHS : list[int]
+        Mach number IDs of the cases.
+    mach : np.ndarray
+        Mach numbers of the cases.
+    quantities : list[str]
+        Stacked quantities, among `PerturbationField.rans_quantities`.
+    x_grid : np.ndarray
+        x grid of the first case (nx,), on which the other cases are regridded if needed.
+    r_grid : np.ndarray
+        r grid (nr,).
+    mean : np.ndarray
+        Mean part of the total field (n_cases, n_quantities, nx, nr), i.e. the total field for epsilon = 0.
+    amplitude : np.ndarray
+        Complex amplitude of the perturbation part of the total field (n_cases, n_quantities, nx, nr), such that
+        the total field is `mean + epsilon * Re(amplitude * exp(-2 i pi t / 100))`.
+
+    Methods
+    -------
+    load(St: float, ID_MACHS: Iterable[int], quantities: Optional[list[str]] = None) -> CaseStack
+        Loads and stacks the cases through the field registry.
+    get_field(field: str, t: float = 0, epsilon: float = 0.01) -> np.ndarray
+        Returns the 'mean', 'amplitude' (modulus) or 'total' field of every case and quantity.
+    """
+
+    def __init__(self, St: Union[int, float], ID_MACHS: list[int], quantities: list[str], x_grid: np.ndarray,
+                 r_grid: np.ndarray, mean: np.ndarray, amplitude: np.ndarray) -> None:
+        if mean.shape != amplitude.shape or mean.shape != (len(ID_MACHS), len(quantities), len(x_grid), len(r_grid)):
+            raise ValueError("mean and amplitude must be of shape (n_cases, n_quantities, nx, nr)")
+        self.St = St
+        self.ID_MACHS = list(ID_MACHS)
+        self.quantities = list(quantities)
+        self.x_grid = x_grid
+        self.r_grid = r_grid
+        self.mean = mean
+        self.amplitude = amplitude
+        self.mach = np.array([float(get_mach_reference(ID_MACH).iloc[0]) for ID_MACH in self.ID_MACHS])
+
+    @classmethod
+    @traced('CaseStack.load')
+    def load(cls, St: Union[int, float], ID_MACHS: Iterable[int], quantities: Optional[list[str]] = None
+             ) -> CaseStack:
+        """
+        Load the cases through the field registry and stack their fields. The cases on another PSE grid than the
+        first one are regridded on it (linear interpolation).
+
+        Parameters
+        ----------
+        St: int or float
+            Strouhal number.
+        ID_MACHS: iterable of int
+            Mach number IDs of the cases.
+        quantities: list of str, optional
+            Quantities to stack. Default is `PerturbationField.rans_quantities`.
+
+        Returns
+        -------
+        CaseStack
+            The stacked fields.
+        """
+        ID_MACHS = list(dict.fromkeys(ID_MACHS))
+        quantities = PerturbationField.rans_quantities if quantities is None else list(quantities)
+        if not ID_MACHS:
+            raise ValueError("ID_MACHS must contain at least one case")
+        if not quantities or any(quantity not in PerturbationField.rans_quantities for quantity in quantities):
+            raise ValueError(f"quantities must be among {PerturbationField.rans_quantities}")
+
+        registry = get_field_registry()
+        r_grid = np.asarray(get_r_grid(), dtype=float)
+        x_grid = np.asarray(registry.get_perturbation_field(St, ID_MACHS[0]).x_grid, dtype=float)
+        mean = np.empty((len(ID_MACHS), len(quantities), len(x_grid), len(r_grid)))
+        amplitude = np.empty(mean.shape, dtype=complex)
+
+        for i_case, ID_MACH in enumerate(ID_MACHS):
+            field = registry.get_perturbation_field(St, ID_MACH)
+            converted_rans = field.get_converted_rans_values()
+            converted_amplitude = field.convert_to_rans_reference(field.compute_complex_amplitude(), ID_MACH)
+            # Second conversion of compute_total_fields, a scalar per quantity
+            factors = field.convert_to_rans_reference({quantity: 1.0 for quantity in quantities}, ID_MACH)
+            case_mean = np.stack([factors[quantity] * converted_rans[quantity].to_numpy()
+                                  for quantity in quantities])
+            case_amplitude = np.stack([factors[quantity] * converted_amplitude[quantity].to_numpy()
+                                       for quantity in quantities])
+
+            case_x = np.asarray(field.x_grid, dtype=float)
+            if case_x.shape != x_grid.shape or not np.allclose(case_x, x_grid, rtol=0, atol=1e-6):
+                regridder = get_regridder(case_x, r_grid, x_grid, r_grid)
+                case_mean = regridder(case_mean)
+                case_amplitude = regridder(case_amplitude)
+            mean[i_case] = case_mean
+            amplitude[i_case] = case_amplitude
+
+        return cls(St, ID_MACHS, quantities, x_grid, r_grid, mean, amplitude)
+
+    def get_field(self, field: str, t: Union[int, float] = 0, epsilon: Union[int, float] = 0.01) -> np.ndarray:
+        """
+        Return a field of every case and quantity.
+
+        Parameters
+        ----------
+        field: str
+            'mean' (total field for epsilon = 0), 'amplitude' (modulus of the complex amplitude of the perturbation)
+            or 'total' (total field at the phase t for the amplitude epsilon).
+        t: int or float, optional
+            Percentage of the period (0 to 100), for the total field. Default is 0.
+        epsilon: int or float, optional
+            Amplitude of the perturbation, for the total field. Default is 0.01.
+
+        Returns
+        -------
+        np.ndarray
+            The field of shape (n_cases, n_quantities, nx, nr).
+        """
+        match field:
+            case 'mean':
+                return self.mean
+            case 'amplitude':
+                return np.abs(self.amplitude)
+            case 'total':
+                if not isinstance(t, (int, float)) or not (0 <= t <= 100):
+                    raise ValueError("t should be a percentage between 0 and 100.")
+                if not isinstance(epsilon, (int, float)) or epsilon < 0:
+                    raise ValueError("epsilon should be a positive float or integer.")
+                phase = np.exp(-2j * np.pi * t / 100)
+                return self.mean + epsilon * np.real(self.amplitude * phase)
+            case _:
+                raise ValueError(f"field must be among {FIELDS}")
+
+
+class CaseComparison:
+    """
+    Pairwise comparison of the cases of a stack for one field in a window of the (x, r) plane.
+
+    The norms are weighted by the quadrature weights of the window ('area': trapezoidal weights in x and r dr, i.e.
+    the integral over the jet cross-section; 'points': the same weight for every node) and normalized by the sum of
+    the weights, so that the L2 norm is a root mean square comparable between windows of different sizes.
+
+    Attributes
+    ----------
+    stack : CaseStack
+        The compared cases.
+    field : str
+        The compared field, among 'mean', 'amplitude' and 'total'.
+    window : tuple
+        The (x_min, x_max, r_min, r_max) window.
+    values : np.ndarray
+        The field of every case and quantity in the window (n_cases, n_quantities, nx_window, nr_window).
+    weights : np.ndarray
+        Normalized quadrature weights of the window (nx_window, nr_window).
+    gram : np.ndarray
+        Weighted Gram matrices of the cases, per quantity (n_quantities, n_cases, n_cases), computed on the fields
+        centred on the mean over the cases (the differences between cases are unchanged, the round-off much lower).
+    l2 : dict[str, pd.DataFrame]
+        Pairwise L2 norms of the differences, case x case, for each quantity.
+    linf : dict[str, pd.DataFrame]
+        Pairwise L-infinity norms of the differences, for each quantity.
+    correlation : dict[str, pd.DataFrame]
+        Correlation matrices of the cases (weighted Pearson coefficients over the window), for each quantity.
+    norms : pd.DataFrame
+        L2 norm of the field of each case (rows) and quantity (columns), e.g. to make the differences relative.
+
+    Methods
+    -------
+    get_differences() -> np.ndarray
+        Returns all the pairwise difference fields.
+    get_difference(ID_MACH_a: int, ID_MACH_b: int) -> dict[str, pd.DataFrame]
+        Returns the difference field of two cases.
+    """
+
+    def __init__(self, stack: CaseStack, field: str = 'total', window: tuple = (0, 10, 0, 3),
+                 t: Union[int, float] = 0, epsilon: Union[int, float] = 0.01, weighting: str = 'area',
+                 memory_budget: int = 64 * 1024 ** 2) -> None:
+        """
+        Parameters
+        ----------
+        stack: CaseStack
+            The stacked cases.
+        field: str, optional
+            'mean', 'amplitude' or 'total'. Default is 'total'.
+        window: tuple, optional
+            The (x_min, x_max, r_min, r_max) window. Default is (0, 10, 0, 3).
+        t, epsilon: int or float, optional
+            Phase and amplitude of the total field. Default is 0 and 0.01.
+        weighting: str, optional
+            'area' or 'points'. Default is 'area'.
+        memory_budget: int, optional
+            Bound in bytes of the temporaries of the L-infinity norms. Default is 64 MB.
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"weighting must be among {WEIGHTINGS}")
+        if len(stack.ID_MACHS) < 2:
+            raise ValueError("at least two different cases are needed for a comparison")
+        self.stack = stack
+        self.field = field
+        self.window = tuple(window)
+
+        x_slice, r_slice = get_window_slices(stack.x_grid, stack.r_grid, *self.window)
+        self.values = stack.get_field(field, t, epsilon)[..., x_slice, r_slice]
+        if self.values.shape[-1] == 0 or self.values.shape[-2] == 0:
+            raise ValueError(f"the window {self.window} does not contain any node of the grid")
+
+        if weighting == 'area':
+            weights = get_quadrature_weights(stack.x_grid[x_slice], stack.r_grid[r_slice])
+        else:
+            weights = np.ones(self.values.shape[-2:])
+        self.weights = weights / weights.sum()
+
+        n_cases, n_quantities = self.values.shape[:2]
+        flat = self.values.reshape(n_cases, n_quantities, -1).transpose(1, 0, 2)  # (n_quantities, n_cases, n_points)
+        w = self.weights.ravel()
+
+        with span('CaseComparison.gram', n_cases=n_cases, n_points=flat.shape[-1]):
+            centred = flat - flat.mean(axis=1, keepdims=True)
+            self.gram = np.matmul(centred * w, centred.transpose(0, 2, 1))
+            diagonal = np.diagonal(self.gram, axis1=1, axis2=2)
+            squared = diagonal[:, :, None] + diagonal[:, None, :] - 2 * self.gram
+            l2 = np.sqrt(np.clip(squared, 0, None))
+            l2[:, np.arange(n_cases), np.arange(n_cases)] = 0
+
+            # Each case centred on its own weighted mean over the window
+            anomalies = flat - (flat @ w)[..., None]
+            covariance = np.matmul(anomalies * w, anomalies.transpose(0, 2, 1))
+            deviation = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = covariance / (deviation[:, :, None] * deviation[:, None, :])
+
+            norms = np.sqrt(np.einsum('qcp,qcp,p->cq', flat, flat, w))
+
+        with span('CaseComparison.linf'):
+            linf = _get_pairwise_max(flat, memory_budget)
+
+        index = pd.Index(stack.ID_MACHS, name='ID_MACH')
+        self.l2 = {quantity: pd.DataFrame(l2[i], index=index, columns=index)
+                   for i, quantity in enumerate(stack.quantities)}
+        self.linf = {quantity: pd.DataFrame(linf[i], index=index, columns=index)
+                     for i, quantity in enumerate(stack.quantities)}
+        self.correlation = {quantity: pd.DataFrame(correlation[i], index=index, columns=index)
+                            for i, quantity in enumerate(stack.quantities)}
+        self.norms = pd.DataFrame(norms, index=index, columns=stack.quantities)
+
+    def get_differences(self) -> np.ndarray:
+        """
+        Return all the pairwise difference fields in the window, `differences[a, b] = values[a] - values[b]`.
+
+        Returns
+        -------
+        np.ndarray
+            Differences of shape (n_cases, n_cases, n_quantities, nx_window, nr_window).
+        """
+        return self.values[:, None] - self.values[None, :]
+
+    def get_difference(self, ID_MACH_a: int, ID_MACH_b: int) -> dict[str, pd.DataFrame]:
+        """
+        Return the difference field (case a - case b) of every quantity in the window.
+        """
+        for ID_MACH in (ID_MACH_a, ID_MACH_b):
+            if ID_MACH not in self.stack.ID_MACHS:
+                raise ValueError(f"case {ID_MACH} is not in the comparison - cases are {self.stack.ID_MACHS}")
+        difference = self.values[self.stack.ID_MACHS.index(ID_MACH_a)] - \
+            self.values[self.stack.ID_MACHS.index(ID_MACH_b)]
+        return {quantity: pd.DataFrame(difference[i]) for i, quantity in enumerate(self.stack.quantities)}
+
+
+def _get_pairwise_max(flat: np.ndarray, memory_budget: int) -> np.ndarray:
+    """
+    Return the pairwise maxima max_p |flat[q, a, p] - flat[q, b, p]| of shape (n_quantities, n_cases, n_cases),
+    reducing the broadcast differences block by block of points.
+    """
+    n_quantities, n_cases, n_points = flat.shape
+    block = max(1, memory_budget // (2 * 8 * n_quantities * n_cases ** 2))
+    maxima = np.zeros((n_quantities, n_cases, n_cases))
+    for start in range(0, n_points, block):
+        values = flat[..., start:start + block]
+        np.maximum(maxima, np.abs(values[:, :, None, :] - values[:, None, :, :]).max(axis=-1), out=maxima)
+    return maxima
+
+
+def get_window_slices(x_grid: np.ndarray, r_grid: np.ndarray, x_min: Union[int, float] = 0,
+                      x_max: Union[int, float] = 10, r_min: Union[int, float] = 0, r_max: Union[int, float] = 3
+                      ) -> tuple[slice, slice]:
+    """
+    Return the slices of the x and r grids of a window, with the convention of `PostProcess.get_window`.
+    """
+    for bound in (x_min, x_max, r_min, r_max):
+        if not isinstance(bound, (int, float)):
+            raise TypeError("the bounds of the window must be an int or a float")
+    if x_max < x_min or r_max < r_min:
+        raise ValueError("the window must be (x_min, x_max, r_min, r_max) with x_min <= x_max and r_min <= r_max")
+    if x_max < x_grid[0] or x_min > x_grid[-1] or r_max < r_grid[0] or r_min > r_grid[-1]:
+        raise ValueError(f"the window ({x_min}, {x_max}, {r_min}, {r_max}) is outside the grid")
+
+    x_min_idx = np.where(x_grid >= x_min)[0][0]
+    x_max_idx = np.where(x_grid <= x_max)[0][-1]
+    r_min_idx = np.where(r_grid >= r_min)[0][0]
+    r_max_idx = np.where(r_grid <= r_max)[0][-1]
+    return slice(x_min_idx, x_max_idx), slice(r_min_idx, r_max_idx)
+
+
+def get_quadrature_weights(x_grid: np.ndarray, r_grid: np.ndarray) -> np.ndarray:
+    """
+    Return the trapezoidal quadrature weights of the integral over x and r of f(x, r) r dr dx on a structured
+    grid, of shape (nx, nr): the integral is `(weights * values).sum()`.
+    """
+    x_grid, r_grid = np.asarray(x_grid, dtype=float), np.asarray(r_grid, dtype=float)
+    return np.outer(_get_trapezoidal_weights(x_grid), _get_trapezoidal_weights(r_grid) * np.abs(r_grid))
+
+
+def _get_trapezoidal_weights(axis: np.ndarray) -> np.ndarray:
+    if len(axis) == 1:
+        return np.ones(1)
+    steps = np.diff(axis)
+    weights = np.zeros(len(axis))
+    weights[:-1] += steps / 2
+    weights[1:] += steps / 2
+    return weights
+
+
+@traced('compare_cases')
+def compare_cases(St: Union[int, float], ID_MACHS: Iterable[int], fields: Iterable[str] = FIELDS,
+                  windows: Optional[dict[str, tuple]] = None, t: Union[int, float] = 0,
+                  epsilon: Union[int, float] = 0.01, quantities: Optional[list[str]] = None,
+                  weighting: str = 'area') -> dict[tuple[str, str], CaseComparison]:
+    """
+    Compare several cases for several fields and windows, loading and stacking the cases once.
+
+    Parameters
+    ----------
+    St: int or float
+        Strouhal number.
+    ID_MACHS: iterable of int
+        Mach number IDs of the cases.
+    fields: iterable of str, optional
+        Fields among 'mean', 'amplitude' and 'total'. Default is all of them.
+    windows: dict[str, tuple], optional
+        Named (x_min, x_max, r_min, r_max) windows. Default is {'default': (0, 10, 0, 3)}.
+    t, epsilon: int or float, optional
+        Phase and amplitude of the total field. Default is 0 and 0.01.
+    quantities: list of str, optional
+        Compared quantities. Default is `PerturbationField.rans_quantities`.
+    weighting: str, optional
+        'area' or 'points'. Default is 'area'.
+
+    Returns
+    -------
+    dict[tuple[str, str], CaseComparison]
+        The comparisons, keyed by (field, window name).
+    """
+    windows = {'default': (0, 10, 0, 3)} if windows is None else windows
+    stack = CaseStack.load(St, ID_MACHS, quantities)
+    return {(field, name): CaseComparison(stack, field, window, t, epsilon, weighting)
+            for field in fields for name, window in windows.items()}
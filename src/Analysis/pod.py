@@ -0,0 +1,415 @@
+"""
+Proper orthogonal decomposition (POD) of sets of snapshots of the total field, over the phases of a case and across
+cases, to build reduced bases.
+
+The snapshots are never assembled in a DataFrame nor, for the large sets, in memory: a snapshot source produces
+them block by block, either from the cached mean fields and complex amplitudes of the cases (`FieldSnapshots`,
+which evaluates the total field of a block of (case, t) pairs with one broadcast expression) or from arrays on disk
+read through memory maps (`ArraySnapshots`, e.g. the volumes of `evaluate_total_volume`). The POD uses the inner
+product of the jet cross-section, with the quadrature weights w of r dr dx:
+
+    <a, b> = sum(w * a * b)
+
+so that the modes are orthonormal for the energy norm, independently of the stretching of the grids.
+
+Two solvers stream the blocks of snapshots, with a memory use independent of the number of snapshots except for the
+(n_snapshots, n_snapshots) matrix of the first one and the (n_snapshots, n_modes + oversampling) matrix of the second:
+
+- 'exact', the method of snapshots: the correlation matrix C = X W X^T is accumulated block pair by block pair and
+  diagonalized. Best for up to about 10^4 snapshots;
+- 'randomized', the randomized SVD of X W^1/2 (Halko, Martinsson and Tropp, 2011): a Gaussian sketch of the range
+  of the snapshots, refined by power iterations, one pass over the snapshots each.
+
+Both end with one pass computing the spatial modes from the temporal coefficients, Phi = X^T A / S^2, so that the
+modes are defined on every node, including the axis where the weight r dr vanishes.
+
+Examples
+--------
+>>> stack = CaseStack.load(0.4, range(1, 11))
+>>> snapshots = FieldSnapshots(stack, ts=np.arange(0, 100, 2), epsilon=0.05)  # 500 snapshots
+>>> pod = compute_pod(snapshots, n_modes=20, method='randomized', window=(0, 10, 0, 3))
+>>> pod.energy_fraction[:5]
+>>> pod.get_mode(0)['ux']  # DataFrame (nx, nr)
+>>> approximation = pod.reconstruct(pod.coefficients[:3, :10])  # first 3 snapshots with 10 modes
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from src.Analysis.comparison import CaseStack, WEIGHTINGS, get_quadrature_weights, get_window_slices
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.tracing import span, traced
+
+pd = LazyModule('pandas')
+
+METHODS = ('exact', 'randomized')
+
+
+class FieldSnapshots:
+    """
+    Snapshots of the total field of stacked cases at several phases, evaluated block by block from the mean fields
+    and complex amplitudes: snapshot k is the case k // len(ts) at the phase ts[k % len(ts)].
+
+    Attributes
+    ----------
+    stack : CaseStack
+        The cases.
+    ts : np.ndarray
+        Phases in percentage of the period (0 to 100).
+    epsilon : float
+        Amplitude of the perturbation.
+    labels : list[tuple[int, float]]
+        The (ID_MACH, t) pair of every snapshot.
+    quantities : list[str]
+        Quantities of the snapshots.
+    x_grid, r_grid : np.ndarray
+        Grids of the snapshots.
+
+    Methods
+    -------
+    get_block(start: int, stop: int) -> np.ndarray
+        Returns the snapshots start to stop, of shape (stop - start, n_quantities, nx, nr).
+    """
+
+    def __init__(self, stack: CaseStack, ts: Union[list, np.ndarray], epsilon: Union[int, float] = 0.01) -> None:
+        ts = np.atleast_1d(np.asarray(ts, dtype=float))
+        if ts.ndim != 1 or np.any(ts < 0) or np.any(ts > 100):
+            raise ValueError("ts should be percentages between 0 and 100.")
+        if not isinstance(epsilon, (int, float)) or epsilon < 0:
+            raise ValueError("epsilon should be a positive float or integer.")
+        self.stack = stack
+        self.ts = ts
+        self.epsilon = epsilon
+        self.labels = [(ID_MACH, float(t)) for ID_MACH in stack.ID_MACHS for t in ts]
+        self.quantities = stack.quantities
+        self.x_grid = stack.x_grid
+        self.r_grid = stack.r_grid
+        self.__phases = np.exp(-2j * np.pi * ts / 100)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def get_block(self, start: int, stop: int) -> np.ndarray:
+        """
+        Return the snapshots start to stop, of shape (stop - start, n_quantities, nx, nr).
+        """
+        cases, phases = np.divmod(np.arange(start, stop), len(self.ts))
+        phase = self.__phases[phases][:, None, None, None]
+        return self.stack.mean[cases] + self.epsilon * np.real(self.stack.amplitude[cases] * phase)
+
+
+class ArraySnapshots:
+    """
+    Snapshots read from arrays, typically memory maps of files larger than the memory: only the requested block is
+    read.
+
+    Attributes
+    ----------
+    arrays : dict[str, np.ndarray]
+        Snapshots of each quantity, of shape (n_snapshots, nx, nr).
+    labels : list
+        Label of every snapshot (its index by default).
+    quantities : list[str]
+        Quantities of the snapshots.
+    x_grid, r_grid : np.ndarray
+        Grids of the snapshots.
+
+    Methods
+    -------
+    from_volumes(volumes: dict[str, np.ndarray], x_grid, r_grid) -> ArraySnapshots
+        Snapshots of the volumes (n_cases, n_t, n_theta, nx, nr) of `evaluate_total_volume`.
+    get_block(start: int, stop: int) -> np.ndarray
+        Returns the snapshots start to stop, of shape (stop - start, n_quantities, nx, nr).
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray], x_grid: np.ndarray, r_grid: np.ndarray,
+                 labels: Optional[list] = None) -> None:
+        if not arrays:
+            raise ValueError("arrays must contain at least one quantity")
+        shapes = {array.shape for array in arrays.values()}
+        if len(shapes) != 1 or len(next(iter(shapes))) != 3 or next(iter(shapes))[1:] != (len(x_grid), len(r_grid)):
+            raise ValueError("the arrays must all be of shape (n_snapshots, nx, nr)")
+        self.arrays = arrays
+        self.quantities = list(arrays)
+        self.x_grid = np.asarray(x_grid, dtype=float)
+        self.r_grid = np.asarray(r_grid, dtype=float)
+        n_snapshots = next(iter(shapes))[0]
+        self.labels = list(range(n_snapshots)) if labels is None else list(labels)
+        if len(self.labels) != n_snapshots:
+            raise ValueError("labels must contain one label per snapshot")
+
+    @classmethod
+    def from_volumes(cls, volumes: dict[str, np.ndarray], x_grid: np.ndarray, r_grid: np.ndarray) -> ArraySnapshots:
+        """
+        Return the snapshots of the volumes (n_cases, n_t, n_theta, nx, nr) of `evaluate_total_volume`, labelled by
+        their (i_case, i_t, i_theta) indices. The memory maps are reshaped without being read.
+        """
+        shape = next(iter(volumes.values())).shape
+        labels = [tuple(index) for index in np.ndindex(*shape[:-2])]
+        return cls({quantity: volume.reshape(-1, *shape[-2:]) for quantity, volume in volumes.items()},
+                   x_grid, r_grid, labels)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def get_block(self, start: int, stop: int) -> np.ndarray:
+        """
+        Return the snapshots start to stop, of shape (stop - start, n_quantities, nx, nr).
+        """
+        return np.stack([np.asarray(self.arrays[quantity][start:stop], dtype=float) for quantity in self.quantities],
+                        axis=1)
+
+
+class PODResult:
+    """
+    Proper orthogonal decomposition of a set of snapshots: snapshot k is approximated by
+    `mean + sum_i coefficients[k, i] * modes[i]`.
+
+    Attributes
+    ----------
+    method : str
+        Solver, 'exact' or 'randomized'.
+    quantities : list[str]
+        Quantities of the modes.
+    x_grid, r_grid : np.ndarray
+        Grids of the window of the decomposition.
+    weights : np.ndarray
+        Quadrature weights of the inner product (nx, nr).
+    mean : np.ndarray
+        Mean of the snapshots (n_quantities, nx, nr), zero if it was not subtracted.
+    modes : np.ndarray
+        Spatial modes (n_modes, n_quantities, nx, nr), orthonormal for the weighted inner product.
+    energies : np.ndarray
+        Energy of each mode, mean over the snapshots of the squared coefficient (n_modes,).
+    energy_fraction : np.ndarray
+        Fraction of the energy of the snapshots captured by each mode (n_modes,).
+    coefficients : np.ndarray
+        Temporal coefficients of the snapshots on the modes (n_snapshots, n_modes).
+    labels : list
+        Label of every snapshot.
+
+    Methods
+    -------
+    get_mode(index: int) -> dict[str, pd.DataFrame]
+        Returns a mode, for each quantity.
+    project(snapshots: np.ndarray) -> np.ndarray
+        Returns the coefficients of snapshots on the modes.
+    reconstruct(coefficients: np.ndarray) -> np.ndarray
+        Returns the snapshots of the given coefficients.
+    """
+
+    def __init__(self, method: str, quantities: list[str], x_grid: np.ndarray, r_grid: np.ndarray,
+                 weights: np.ndarray, mean: np.ndarray, modes: np.ndarray, energies: np.ndarray,
+                 total_energy: float, coefficients: np.ndarray, labels: list) -> None:
+        self.method = method
+        self.quantities = quantities
+        self.x_grid = x_grid
+        self.r_grid = r_grid
+        self.weights = weights
+        self.mean = mean
+        self.modes = modes
+        self.energies = energies
+        self.energy_fraction = energies / total_energy if total_energy > 0 else np.zeros_like(energies)
+        self.coefficients = coefficients
+        self.labels = labels
+
+    def get_mode(self, index: int) -> dict[str, pd.DataFrame]:
+        """
+        Return the mode of the given index for each quantity.
+        """
+        if not 0 <= index < len(self.modes):
+            raise ValueError(f"index must be between 0 and {len(self.modes) - 1}")
+        return {quantity: pd.DataFrame(self.modes[index, i]) for i, quantity in enumerate(self.quantities)}
+
+    def project(self, snapshots: np.ndarray) -> np.ndarray:
+        """
+        Return the coefficients (n, n_modes) of snapshots (n, n_quantities, nx, nr) on the modes.
+        """
+        snapshots = np.asarray(snapshots, dtype=float)
+        if snapshots.shape[1:] != self.mean.shape:
+            raise ValueError(f"snapshots must be of shape (n, {', '.join(map(str, self.mean.shape))})")
+        n_points = self.mean.size
+        anomalies = (snapshots - self.mean).reshape(len(snapshots), n_points)
+        weights = np.broadcast_to(self.weights, self.mean.shape).ravel()
+        return (anomalies * weights) @ self.modes.reshape(len(self.modes), n_points).T
+
+    def reconstruct(self, coefficients: np.ndarray) -> np.ndarray:
+        """
+        Return the snapshots (n, n_quantities, nx, nr) of coefficients (n, n_used) on the first n_used modes.
+        """
+        coefficients = np.atleast_2d(np.asarray(coefficients, dtype=float))
+        n_used = coefficients.shape[1]
+        if n_used > len(self.modes):
+            raise ValueError(f"there are only {len(self.modes)} modes")
+        modes = self.modes[:n_used].reshape(n_used, -1)
+        return self.mean + (coefficients @ modes).reshape(len(coefficients), *self.mean.shape)
+
+
+@traced('compute_pod')
+def compute_pod(snapshots: Union[FieldSnapshots, ArraySnapshots], n_modes: int = 10, method: str = 'exact',
+                window: Optional[tuple] = None, subtract_mean: bool = True, weighting: str = 'area',
+                memory_budget: int = 256 * 1024 ** 2, oversampling: int = 10, power_iterations: int = 2,
+                seed: Optional[int] = None) -> PODResult:
+    """
+    Compute the POD of a set of snapshots, streaming them block by block.
+
+    Parameters
+    ----------
+    snapshots: FieldSnapshots or ArraySnapshots
+        The snapshots.
+    n_modes: int, optional
+        Number of modes. Default is 10.
+    method: str, optional
+        'exact' (method of snapshots) or 'randomized'. Default is 'exact'.
+    window: tuple, optional
+        The (x_min, x_max, r_min, r_max) window of the decomposition. Default is the whole grid.
+    subtract_mean: bool, optional
+        If True, the decomposition is the one of the fluctuations around the mean of the snapshots. Default is True.
+    weighting: str, optional
+        'area' (r dr dx quadrature) or 'points' (same weight for every node). Default is 'area'.
+    memory_budget: int, optional
+        Bound in bytes of the blocks of snapshots held in memory at once. Default is 256 MB.
+    oversampling: int, optional
+        Additional columns of the random sketch, for the randomized solver. Default is 10.
+    power_iterations: int, optional
+        Number of power iterations of the randomized solver, improving the accuracy when the energies decrease
+        slowly. Default is 2.
+    seed: int, optional
+        Seed of the random sketch.
+
+    Returns
+    -------
+    PODResult
+        The modes, energies and temporal coefficients.
+
+    Raises
+    ------
+    ValueError
+        If the method, weighting or number of modes are not valid, or if the memory budget cannot hold a snapshot.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be among {METHODS}")
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"weighting must be among {WEIGHTINGS}")
+    n_snapshots = len(snapshots)
+    if not isinstance(n_modes, int) or not 1 <= n_modes <= n_snapshots:
+        raise ValueError(f"n_modes must be an integer between 1 and the number of snapshots ({n_snapshots})")
+
+    if window is None:
+        x_slice, r_slice = slice(None), slice(None)
+    else:
+        x_slice, r_slice = get_window_slices(snapshots.x_grid, snapshots.r_grid, *window)
+    x_grid, r_grid = snapshots.x_grid[x_slice], snapshots.r_grid[r_slice]
+    weights = get_quadrature_weights(x_grid, r_grid) if weighting == 'area' else np.ones((len(x_grid), len(r_grid)))
+    shape = (len(snapshots.quantities), len(x_grid), len(r_grid))
+    w = np.broadcast_to(weights, shape).ravel()
+
+    # A streamed block and its temporaries (the full fields of the source, the complex evaluation of FieldSnapshots)
+    # take half of the budget, the other half is for the blocks held by the solvers
+    block_size = int(memory_budget // 2 // (8 * 4 * len(snapshots.quantities) * snapshots.x_grid.size
+                                            * snapshots.r_grid.size))
+    if block_size < 1:
+        raise ValueError("the memory budget is too small to hold a snapshot")
+    held_size = max(block_size, int(memory_budget // 2 // (8 * w.size)))
+
+    def blocks(mean: Optional[np.ndarray] = None, start: int = 0, size: int = block_size
+               ) -> Iterator[tuple[int, int, np.ndarray]]:
+        for block_start in range(start, n_snapshots, size):
+            stop = min(block_start + size, n_snapshots)
+            # Large blocks are read as several streamed blocks
+            block = np.concatenate([snapshots.get_block(i, min(i + block_size, stop))[..., x_slice, r_slice]
+                                    .reshape(-1, w.size) for i in range(block_start, stop, block_size)])
+            yield block_start, stop, block if mean is None else block - mean
+
+    mean = np.zeros(w.size)
+    if subtract_mean:
+        for _, _, block in blocks():
+            mean += block.sum(axis=0)
+        mean /= n_snapshots
+
+    if method == 'exact':
+        coefficients, singular_values, total_energy = _solve_exact(blocks, mean, w, n_snapshots, n_modes,
+                                                                   held_size)
+    else:
+        coefficients, singular_values, total_energy = _solve_randomized(blocks, mean, w, n_snapshots, n_modes,
+                                                                        oversampling, power_iterations, seed)
+
+    # Spatial modes, Phi = X^T A / S^2, orthonormal for the weighted inner product
+    modes = np.zeros((w.size, n_modes))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(singular_values > 0, 1 / singular_values ** 2, 0)
+    for start, stop, block in blocks(mean):
+        modes += block.T @ (coefficients[start:stop] * scale)
+
+    return PODResult(method, list(snapshots.quantities), x_grid, r_grid, weights, mean.reshape(shape),
+                     modes.T.reshape(n_modes, *shape), singular_values ** 2 / n_snapshots, total_energy / n_snapshots,
+                     coefficients, list(snapshots.labels))
+
+
+def _solve_exact(blocks, mean: np.ndarray, w: np.ndarray, n_snapshots: int, n_modes: int, held_size: int):
+    """
+    Method of snapshots: diagonalization of the correlation matrix C = X W X^T, accumulated block pair by block
+    pair, a large outer block (`held_size` snapshots) staying in memory while the next snapshots stream, so that
+    the snapshots are read (n_snapshots / held_size + 1) / 2 times on average, once if they fit in the budget.
+
+    Returns
+    -------
+    tuple
+        The temporal coefficients (n_snapshots, n_modes), the singular values (n_modes,) and the total energy.
+    """
+    correlation = np.empty((n_snapshots, n_snapshots))
+    with span('POD.correlation', n_snapshots=n_snapshots):
+        for start, stop, block in blocks(mean, size=held_size):
+            weighted = block * w
+            correlation[start:stop, start:stop] = weighted @ block.T
+            for other_start, other_stop, other in blocks(mean, start=stop):
+                product = weighted @ other.T
+                correlation[start:stop, other_start:other_stop] = product
+                correlation[other_start:other_stop, start:stop] = product.T
+
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    order = np.argsort(eigenvalues)[::-1][:n_modes]
+    singular_values = np.sqrt(np.clip(eigenvalues[order], 0, None))
+    return eigenvectors[:, order] * singular_values, singular_values, float(np.trace(correlation))
+
+
+def _solve_randomized(blocks, mean: np.ndarray, w: np.ndarray, n_snapshots: int, n_modes: int, oversampling: int,
+                      power_iterations: int, seed: Optional[int]):
+    """
+    Randomized SVD of Y = X W^1/2: the range of Y^T is sketched with a Gaussian matrix (one pass), refined by power
+    iterations (one pass each), then Y is projected on it (one pass) and the small projection is decomposed.
+
+    Returns
+    -------
+    tuple
+        The temporal coefficients (n_snapshots, n_modes), the singular values (n_modes,) and the total energy.
+    """
+    rank = min(n_modes + oversampling, n_snapshots)
+    sketch = np.random.default_rng(seed).standard_normal((n_snapshots, rank))
+    sqrt_w = np.sqrt(w)
+
+    # Range of Y^T, (n_points, rank)
+    range_basis = np.zeros((w.size, rank))
+    total_energy = 0.0
+    for start, stop, block in blocks(mean):
+        weighted = block * sqrt_w
+        range_basis += weighted.T @ sketch[start:stop]
+        total_energy += float(np.einsum('ij,ij->', weighted, weighted))
+
+    for _ in range(power_iterations):
+        range_basis, _ = np.linalg.qr(range_basis)
+        iterated = np.zeros_like(range_basis)
+        for _, _, block in blocks(mean):
+            weighted = block * sqrt_w
+            iterated += weighted.T @ (weighted @ range_basis)
+        range_basis = iterated
+    range_basis, _ = np.linalg.qr(range_basis)
+
+    projection = np.empty((n_snapshots, rank))
+    for start, stop, block in blocks(mean):
+        projection[start:stop] = (block * sqrt_w) @ range_basis
+
+    left, singular_values, _ = np.linalg.svd(projection, full_matrices=False)
+    return left[:, :n_modes] * singular_values[:n_modes], singular_values[:n_modes], total_energy
@@ -0,0 +1,363 @@
+"""
+Resumable parameter sweeps over the product of Strouhal numbers, cases, phases and amplitudes.
+
+The points of a sweep are grouped by (St, case), so that the data of a case is loaded once per group and, inside a
+group, consecutive points only recompute the part of the PostProcess pipeline that changed (the phase for a new
+`t`, the total field for a new `epsilon`). Each result is written to the sweep directory as soon as it is computed
+(atomically, as the derived-product cache does), so an interrupted sweep resumes with the missing points only.
+
+Examples
+--------
+>>> sweep = Sweep('stats', 'Output/sweeps/stats', St=[0.4, 1.0], cases=range(1, 11), t=range(0, 100, 5),
+...               epsilon=[0.01, 0.05], jobs=4)
+>>> report = sweep.run()  # run again after a crash to resume
+>>> results = sweep.load_results()  # {SweepPoint: result}
+
+A user task is a picklable (top-level) function `task(post_process, point)`, called with `post_process.t` and
+`post_process.epsilon` set to the values of the point.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+import numpy as np
+
+from src.Field.post_process import PostProcess
+
+
+@dataclass(frozen=True, order=True)
+class SweepPoint:
+    """
+    Point of a parameter sweep.
+    """
+    St: Union[int, float]
+    ID_MACH: int
+    t: Union[int, float]
+    epsilon: Union[int, float]
+
+    @property
+    def key(self) -> str:
+        """
+        Name of the point, used for its result file. The values are written with `repr`, which round-trips, so
+        that distinct points never share a file.
+        """
+        return f'St{float(self.St)!r}_case{self.ID_MACH}_t{float(self.t)!r}_eps{float(self.epsilon)!r}'
+
+
+@dataclass(frozen=True)
+class SweepProgress:
+    """
+    Progress of a running sweep: completed, failed and total number of points, elapsed time in seconds, throughput
+    in points per second and estimated remaining time in seconds.
+    """
+    completed: int
+    failed: int
+    total: int
+    elapsed: float
+    throughput: float
+    eta: float
+
+    def __str__(self) -> str:
+        eta = f'{self.eta:.0f} s' if np.isfinite(self.eta) else '-'
+        return f"{self.completed}/{self.total} points ({self.failed} failed) - {self.throughput:.2f} points/s - " \
+               f"ETA {eta}"
+
+
+def compute_total(post_process: PostProcess, point: SweepPoint) -> dict[str, np.ndarray]:
+    """
+    Built-in task 'total': the total field of every quantity (nx, nr).
+    """
+    return {quantity: value.to_numpy() for quantity, value in post_process.graph.get('total').items()}
+
+
+def compute_stats(post_process: PostProcess, point: SweepPoint) -> dict[str, dict[str, float]]:
+    """
+    Built-in task 'stats': the statistics of the total field of every quantity in the window of the sweep.
+    """
+    return {quantity: stats.to_dict() for quantity, stats in post_process.get_window_stats().items()}
+
+
+class ExportTask:
+    """
+    Built-in task 'export': writes the total field of the point in `<directory>/<point key>.npz` and returns the path.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+
+    def __call__(self, post_process: PostProcess, point: SweepPoint) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{point.key}.npz'
+        tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp.npz')
+        np.savez(tmp_path, x=post_process.x_grid, r=post_process.r_grid, **compute_total(post_process, point))
+        os.replace(tmp_path, path)
+        return path
+
+
+BUILTIN_TASKS = ('total', 'stats', 'export')
+
+
+class Sweep:
+    """
+    Resumable sweep of a task over a grid of (St, case, t, epsilon), run in a pool of processes.
+
+    Attributes
+    ----------
+    task : Callable
+        The task, called as `task(post_process, point)`.
+    directory : Path
+        Directory of the checkpoint: description of the sweep and one result file per completed point.
+    points : list[SweepPoint]
+        The points of the sweep, grouped by (St, case).
+    window : tuple
+        The (x_min, x_max, r_min, r_max) window set on the PostProcess objects.
+    jobs : int
+        Number of worker processes, 1 running the sweep in the current process.
+    chunk_size : int
+        Maximum number of points of a (St, case) group submitted to a worker at once.
+
+    Methods
+    -------
+    run(callback: Optional[Callable[[SweepProgress], None]] = None, verbose: bool = True) -> SweepProgress
+        Runs the pending points and returns the final progress.
+    get_pending() -> list[SweepPoint]
+        Returns the points without a result.
+    load_results() -> dict[SweepPoint, Any]
+        Returns the results of the completed points.
+    clear()
+        Removes the results of the sweep.
+    """
+
+    def __init__(self, task: Union[str, Callable], directory: Union[str, Path], St: Iterable = (0.4,),
+                 cases: Iterable = (1,), t: Iterable = (0,), epsilon: Iterable = (0.01,),
+                 window: tuple = (0, 10, 0, 3), jobs: int = 1, chunk_size: int = 16) -> None:
+        """
+        Parameters
+        ----------
+        task: str or Callable
+            A built-in task ('total', 'stats' or 'export') or a picklable function `task(post_process, point)`
+            returning a picklable result.
+        directory: str or Path
+            Directory of the checkpoint. A sweep with the same directory, task and grid resumes from it.
+        St, cases, t, epsilon: iterable, optional
+            Values of the grid.
+        window: tuple, optional
+            The (x_min, x_max, r_min, r_max) window of the PostProcess objects, used by the 'stats' task.
+        jobs: int, optional
+            Number of worker processes. Default is 1.
+        chunk_size: int, optional
+            Maximum number of points submitted at once; smaller chunks give a finer progress. Default is 16.
+
+        Raises
+        ------
+        ValueError
+            If the task is unknown, if a parameter is not valid or if the directory holds another sweep.
+        """
+        if not isinstance(jobs, int) or jobs <= 0:
+            raise ValueError("jobs must be a positive integer")
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+
+        self.directory = Path(directory)
+        self.task, task_name = self.__get_task(task)
+        self.window = tuple(window)
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+
+        # Python numbers, so that the grid of NumPy values (e.g. np.arange) is written to the manifest as well
+        grid = {'St': [float(value) for value in St], 'cases': [int(case) for case in cases],
+                't': [float(value) for value in t], 'epsilon': [float(value) for value in epsilon]}
+        for name, values in grid.items():
+            if not values:
+                raise ValueError(f"{name} must contain at least one value")
+        if any(not 0 <= value <= 100 for value in grid['t']):
+            raise ValueError("t should be percentages between 0 and 100.")
+        # Inside a group, the points of the same phase follow each other: a new epsilon only recomputes the total
+        self.points = sorted(SweepPoint(St, ID_MACH, t, epsilon)
+                             for St, ID_MACH, t, epsilon in itertools.product(*grid.values()))
+
+        self.__results_dir = self.directory / 'results'
+        self.__results_dir.mkdir(parents=True, exist_ok=True)
+        self.__check_manifest({'task': task_name, 'window': list(self.window), **grid})
+
+    def get_pending(self) -> list[SweepPoint]:
+        """
+        Return the points without a result in the checkpoint.
+        """
+        completed = {path.stem for path in self.__results_dir.glob('*.pkl')}
+        return [point for point in self.points if point.key not in completed]
+
+    def load_results(self) -> dict[SweepPoint, Any]:
+        """
+        Return the results of the completed points.
+        """
+        results = {}
+        for point in self.points:
+            try:
+                with open(self.__results_dir / f'{point.key}.pkl', 'rb') as file:
+                    results[point] = pickle.load(file)
+            except FileNotFoundError:
+                pass
+        return results
+
+    def clear(self) -> None:
+        """
+        Remove the results of the sweep, so that the next run starts over.
+        """
+        for path in self.__results_dir.glob('*.pkl'):
+            path.unlink(missing_ok=True)
+
+    def run(self, callback: Optional[Callable[[SweepProgress], None]] = None, verbose: bool = True) -> SweepProgress:
+        """
+        Run the pending points, grouped by (St, case), and write each result as soon as it is computed. The failed
+        points are reported and stay pending for the next run.
+
+        Parameters
+        ----------
+        callback: Callable, optional
+            Function called with the progress after every completed chunk.
+        verbose: bool, optional
+            If True, the progress is printed on stderr. Default is True.
+
+        Returns
+        -------
+        SweepProgress
+            The progress at the end of the run.
+        """
+        pending = self.get_pending()
+        total = len(self.points)
+        already_done = total - len(pending)
+        start = time.perf_counter()
+        completed, failures = 0, {}
+
+        def report() -> SweepProgress:
+            elapsed = time.perf_counter() - start
+            throughput = completed / elapsed if elapsed > 0 else 0.0
+            remaining = len(pending) - completed - len(failures)
+            progress = SweepProgress(already_done + completed, len(failures), total, elapsed, throughput,
+                                     remaining / throughput if throughput > 0 else (0.0 if not remaining else np.inf))
+            if callback is not None:
+                callback(progress)
+            if verbose:
+                print(progress, file=sys.stderr)
+            return progress
+
+        chunks = self.__get_chunks(pending)
+        if self.jobs == 1:
+            for chunk in chunks:
+                chunk_completed, chunk_failures = _run_chunk(self.task, self.__results_dir, self.window, chunk)
+                completed += chunk_completed
+                failures.update(chunk_failures)
+                report()
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs, initializer=_exit_with_parent,
+                                     initargs=(os.getpid(),)) as executor:
+                futures = {executor.submit(_run_chunk, self.task, self.__results_dir, self.window, chunk)
+                           for chunk in chunks}
+                try:
+                    while futures:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            chunk_completed, chunk_failures = future.result()
+                            completed += chunk_completed
+                            failures.update(chunk_failures)
+                        report()
+                except BaseException:
+                    # The completed results are on disk: the next run resumes from them
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+
+        for point, error in failures.items():
+            print(f"{point.key}: failed - {error}", file=sys.stderr)
+        return report()
+
+    def __get_chunks(self, points: list[SweepPoint]) -> list[list[SweepPoint]]:
+        chunks = []
+        for _, group in itertools.groupby(points, key=lambda point: (point.St, point.ID_MACH)):
+            group = list(group)
+            chunks.extend(group[i:i + self.chunk_size] for i in range(0, len(group), self.chunk_size))
+        return chunks
+
+    def __get_task(self, task: Union[str, Callable]) -> tuple[Callable, str]:
+        if callable(task):
+            return task, f'{task.__module__}.{getattr(task, "__qualname__", type(task).__name__)}'
+        match task:
+            case 'total':
+                return compute_total, task
+            case 'stats':
+                return compute_stats, task
+            case 'export':
+                return ExportTask(self.directory / 'exports'), task
+            case _:
+                raise ValueError(f"task must be a callable or a string in {list(BUILTIN_TASKS)}")
+
+    def __check_manifest(self, manifest: dict) -> None:
+        """
+        Write the description of the sweep, or check that the directory holds the same sweep.
+        """
+        path = self.directory / 'sweep.json'
+        manifest = json.loads(json.dumps(manifest))
+        if path.exists():
+            with open(path) as file:
+                if json.load(file) != manifest:
+                    raise ValueError(f"{self.directory} holds another sweep - use another directory or remove it")
+            return
+        with open(path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+
+def _exit_with_parent(parent_pid: int) -> None:
+    """
+    Stop the worker when the process running the sweep dies (e.g. killed), instead of leaving it orphaned.
+    """
+    def watch() -> None:
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(1)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _run_chunk(task: Callable, results_dir: Path, window: tuple,
+               points: list[SweepPoint]) -> tuple[int, dict[SweepPoint, str]]:
+    """
+    Run a task on points of the same (St, case) with one PostProcess object, writing each result atomically.
+
+    Returns
+    -------
+    tuple[int, dict]
+        The number of completed points and the error of every failed point.
+    """
+    try:
+        post_process = PostProcess(points[0].St, points[0].ID_MACH)
+        post_process.window = window
+    except Exception as error:
+        return 0, {point: f"{type(error).__name__}: {error}" for point in points}
+
+    completed, failures = 0, {}
+    for point in points:
+        try:
+            post_process.t = point.t
+            post_process.epsilon = point.epsilon
+            result = task(post_process, point)
+        except Exception as error:
+            # A failed point does not stop the others
+            failures[point] = f"{type(error).__name__}: {error}"
+            continue
+        path = results_dir / f'{point.key}.pkl'
+        tmp_path = path.with_name(f'{point.key}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        completed += 1
+    return completed, failures
@@ -0,0 +1,252 @@
+"""
+Benchmark suite measuring the wall time and the peak memory of the main stages of the pipeline: loading, raw
+perturbation parsing, interpolation, reference conversion, perturbation and total field computation, statistics
+and headless plotting.
+
+Every dataset is benchmarked in a fresh interpreter: the bundled `Data/` directory and, for each requested scale
+factor, a copy of the selected case upsampled by this factor along x and r and written in the native file formats.
+The results are written as JSON so that two runs can be compared.
+
+Usage
+-----
+python -m src.Benchmark.benchmark_suite [--St 0.4] [--case 1] [--scales 2 4] [--repeat 3] [--output results.json]
+python -m src.Benchmark.benchmark_suite --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Union
+
+import numpy as np
+
+from src.toolbox.memory import MemoryMonitor
+from src.toolbox.path_directories import BASE_DIR, DIR_DATA, DIR_OUT
+
+STAGES = ['RansField', 'raw_perturbation_values', 'interpolate', 'convert_to_rans_reference',
+          'compute_perturbation_field', 'compute_total_field', 'get_fields_stats', 'plot_field', 'plot_line']
+
+
+def measure(func: Callable, repeat: int = 3) -> dict:
+    """
+    Measure the wall time and the peak of memory allocated by a function.
+
+    The timings are taken without tracing, then one extra call is made under `tracemalloc` (which also tracks
+    the NumPy buffers) to get the peak memory, and a last one under a `MemoryMonitor` to get the increase of the
+    peak resident set size.
+
+    Parameters
+    ----------
+    func: Callable
+        The function to benchmark, called without argument.
+    repeat: int, optional
+        Number of timed calls. Default is 3.
+
+    Returns
+    -------
+    dict
+        Minimum and median wall times in seconds, peak allocated memory and peak RSS increase in bytes.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    monitor = MemoryMonitor()
+    with monitor.stage('measure'):
+        func()
+
+    return {'min': min(times), 'median': statistics.median(times), 'peak_bytes': peak,
+            'peak_rss_increase': monitor.stats['measure']['peak_increase']}
+
+
+def run_stages(St: Union[int, float], ID_MACH: int, repeat: int = 3) -> dict:
+    """
+    Benchmark every stage on the dataset of the current data directory.
+
+    Returns
+    -------
+    dict
+        Grid sizes and the measures of every stage.
+    """
+    from matplotlib import pyplot as plt
+
+    from src.Field.perturbation_field import PerturbationField
+    from src.Field.post_process import PostProcess
+    from src.Field.rans_field import RansField
+
+    post_process = PostProcess(St, ID_MACH, t=25)
+    perturbation_field = post_process.perturbation_field
+    rans_field = RansField(ID_MACH)
+
+    stages = {
+        'RansField': lambda: RansField(ID_MACH),
+        'raw_perturbation_values': perturbation_field._PerturbationField__get_raw_perturbation_values,
+        'interpolate': perturbation_field.interpolate,
+        'convert_to_rans_reference': lambda: PerturbationField.convert_to_rans_reference(
+            perturbation_field.rans_values, ID_MACH),
+        'compute_perturbation_field': lambda: perturbation_field.compute_perturbation_field(25),
+        'compute_total_field': lambda: perturbation_field.compute_total_field(25, 0.01),
+        'get_fields_stats': post_process.get_fields_stats,
+        'plot_field': lambda: plt.close(post_process.plot_field('total', 'ux', x_max=8, r_max=2, show=False)),
+        'plot_line': lambda: plt.close(post_process.plot_line('total', 'ux', [10, 50, 100], show=False)),
+    }
+
+    return {
+        'grid': {'rans': [len(rans_field.x), rans_field.values['ux'].shape[1]],
+                 'pse': [len(post_process.x_grid), len(post_process.r_grid)]},
+        'stages': {name: measure(stages[name], repeat) for name in STAGES},
+    }
+
+
+def write_scaled_dataset(data_dir: Path, St: Union[int, float], ID_MACH: int, scale: int) -> Path:
+    """
+    Write a copy of a bundled case refined `scale` times along x and r (linear interpolation between the original
+    nodes) in the native file formats. The reference files are copied for every case.
+
+    Returns
+    -------
+    Path
+        The root of the scaled dataset.
+    """
+    import pandas as pd
+    from scipy.io import loadmat
+
+    from src.Field.perturbation_field import PerturbationField
+    from src.ReadData.read_radius import get_r_grid
+    from src.toolbox import data_writers
+    from src.toolbox.path_directories import DIR_MEAN, DIR_STABILITY, find_case_file
+
+    data_dir = Path(data_dir)
+    arr = loadmat(DIR_MEAN / f'mean_{ID_MACH}.mat')['arr']
+    data_writers.write_mean_flow(data_dir, ID_MACH, _refine(_refine(arr, 0, scale), 1, scale))
+
+    dir_st = DIR_STABILITY / "St{:02d}".format(int(10 * St))
+    raw = pd.read_csv(find_case_file(dir_st / 'Field', ID_MACH), delimiter=r'\s+', skiprows=3,
+                      names=PerturbationField.pse_quantities)
+    x = raw['x'].unique()
+    r = get_r_grid()
+    values = {quantity: _refine(_refine(raw[quantity].to_numpy().reshape(len(x), len(r)), 0, scale), 1, scale)
+              for quantity in PerturbationField.pse_quantities[2:]}
+    r_scaled = _refine(r, 0, scale)
+    data_writers.write_perturbation_field(data_dir, St, ID_MACH, _refine(x, 0, scale), r_scaled, values)
+
+    stability = pd.read_csv(find_case_file(dir_st / 'alpha', ID_MACH), delimiter=r'\s+', skiprows=3,
+                            names=PerturbationField.stability_quantities)
+    data_writers.write_stability_data(data_dir, St, ID_MACH, {
+        quantity: _refine(stability[quantity].to_numpy(), 0, scale) for quantity in PerturbationField.stability_quantities
+    })
+
+    data_writers.write_r_grid(data_dir, r_scaled)
+    for name in ('info.dat', 'Mach.dat'):
+        (data_dir / name).write_bytes((DIR_DATA / name).read_bytes())
+    return data_dir
+
+
+def _refine(values: np.ndarray, axis: int, scale: int) -> np.ndarray:
+    """
+    Insert `scale - 1` linearly interpolated nodes between two consecutive nodes along an axis.
+    """
+    n = values.shape[axis]
+    position = np.linspace(0, n - 1, (n - 1) * scale + 1)
+    i_0 = np.minimum(position.astype(int), n - 2)
+    weight = (position - i_0).reshape([-1 if i == axis else 1 for i in range(values.ndim)])
+    return (1 - weight) * np.take(values, i_0, axis=axis) + weight * np.take(values, i_0 + 1, axis=axis)
+
+
+def _run_worker(data_dir: Path, St: Union[int, float], ID_MACH: int, repeat: int) -> dict:
+    """
+    Run the stages in a fresh interpreter working on `data_dir`.
+    """
+    env = dict(os.environ, JET_TURBULENT_DATA=str(data_dir), MPLBACKEND='Agg')
+    env['PYTHONPATH'] = os.pathsep.join([str(BASE_DIR), str(BASE_DIR / 'src'), env.get('PYTHONPATH', '')])
+    command = [sys.executable, '-m', 'src.Benchmark.benchmark_suite', '--worker',
+               '--St', str(St), '--case', str(ID_MACH), '--repeat', str(repeat)]
+    output = subprocess.run(command, env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def compare(old_file: Path, new_file: Path) -> None:
+    """
+    Print the ratio of the median times and peak memories of two result files (new / old).
+    """
+    old, new = (json.loads(Path(file).read_text()) for file in (old_file, new_file))
+    for dataset, new_result in new['datasets'].items():
+        if dataset not in old['datasets']:
+            continue
+        print(f"{dataset}")
+        for stage, measures in new_result['stages'].items():
+            previous = old['datasets'][dataset]['stages'].get(stage)
+            if previous is None:
+                continue
+            time_ratio = measures['median'] / previous['median']
+            memory_ratio = measures['peak_bytes'] / max(previous['peak_bytes'], 1)
+            print(f"  {stage:<28} time x{time_ratio:6.2f}   memory x{memory_ratio:6.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--St', type=float, default=0.4)
+    parser.add_argument('--case', type=int, default=1)
+    parser.add_argument('--scales', type=int, nargs='*', default=[2, 4],
+                        help='refinement factors of the scaled synthetic datasets')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--compare', type=Path, nargs=2, metavar=('OLD', 'NEW'))
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+    if args.worker:
+        print(json.dumps(run_stages(args.St, args.case, args.repeat)))
+        return 0
+
+    results = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'St': args.St,
+        'case': args.case,
+        'datasets': {},
+    }
+    results['datasets']['bundled'] = _run_worker(DIR_DATA, args.St, args.case, args.repeat)
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_scaled_dataset(Path(tmp_dir), args.St, args.case, scale)
+            results['datasets'][f'scale_{scale}'] = _run_worker(Path(tmp_dir), args.St, args.case, args.repeat)
+
+    for dataset, result in results['datasets'].items():
+        print(f"{dataset}  RANS {result['grid']['rans']}  PSE {result['grid']['pse']}")
+        for stage, measures in result['stages'].items():
+            print(f"  {stage:<28} {measures['median'] * 1e3:10.2f} ms  {measures['peak_bytes'] / 1024 ** 2:9.2f} MiB"
+                  f"  RSS +{measures['peak_rss_increase'] / 1024 ** 2:8.2f} MiB")
+
+    output = args.output
+    if output is None:
+        output = DIR_OUT / 'benchmarks' / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Cold-start import benchmark. Each module is imported in a fresh interpreter to measure the import cost paid by every
+spawned worker, and the heavy dependencies loaded as a side effect are reported.
+
+Usage
+-----
+python -m src.Benchmark.import_time [--repeat 5] [--max-seconds 0.5] [modules ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from src.toolbox.path_directories import BASE_DIR
+
+DEFAULT_MODULES = ['src.Field.rans_field', 'src.Field.perturbation_field', 'src.Field.post_process']
+HEAVY_MODULES = ['pandas', 'scipy', 'matplotlib']
+
+_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import_time(module: str, repeat: int = 5) -> dict:
+    """
+    Measure the time needed to import a module in a fresh interpreter.
+
+    Parameters
+    ----------
+    module: str
+        Full name of the module, e.g. 'src.Field.post_process'.
+    repeat: int, optional
+        Number of interpreters spawned. Default is 5.
+
+    Returns
+    -------
+    dict
+        Median and minimum import times in seconds and the heavy dependencies loaded by the import.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([str(BASE_DIR), str(BASE_DIR / 'src'), env.get('PYTHONPATH', '')])
+    snippet = _SNIPPET.format(module=module, heavy=HEAVY_MODULES)
+
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', snippet], env=env, capture_output=True, text=True, check=True)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    times = [run['seconds'] for run in runs]
+    return {'module': module, 'median': statistics.median(times), 'min': min(times), 'loaded': runs[0]['loaded']}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=0.5,
+                        help='fail if the median import time of a module exceeds this value')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        result = measure_import_time(module, args.repeat)
+        status = 'OK' if result['median'] <= args.max_seconds else 'TOO SLOW'
+        failed |= status != 'OK'
+        print(f"{result['module']:<35} median {result['median']:.3f} s  min {result['min']:.3f} s  "
+              f"heavy modules loaded: {result['loaded'] or 'none'}  [{status}]")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
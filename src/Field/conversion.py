@@ -0,0 +1,237 @@
+"""
+Conversion of the fields between the reference frames of the data:
+
+- 'dimensionless': the RANS files, made dimensionless with the ambient values (c_0 for the velocities,
+  (gamma - 1) T_0 for the temperature, gamma p_0 for the pressure and rho_0 for the density);
+- 'dimensional': SI units;
+- 'pse': the stability (PSE) reference of a case, made dimensionless with the jet values of `info.dat` (u_j for the
+  velocities, rho_j u_j^2 for the pressure and rho_j for the density). The temperature has no PSE reference.
+
+Every (quantity, frame) pair has a unit, the SI value of 1 in that frame, so that the factor from a source frame to
+a target frame is unit(source) / unit(target). The units of a set of cases and quantities are gathered in one table
+of shape (n_cases, n_quantities, n_frames), built once per set, and a conversion is one broadcast multiply of a
+stacked array (n_quantities, ...) or (n_cases, n_quantities, ...) by the factors, in place if requested.
+
+Examples
+--------
+>>> table = get_conversion_table((1, 2, 3), ('ux', 'p', 'rho'))
+>>> values = table.convert(values, 'pse', 'dimensionless')  # values of shape (3, 3, nx, nr)
+>>> convert_fields(pse_fields, 'pse', 'dimensionless', ID_MACH=1)  # dict of DataFrames, e.g. {'Re(ux)': ...}
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+import numpy as np
+
+from src.ReadData.read_info import get_reference_values
+from src.toolbox.dimless_reference_values import T_0, c_0, gamma, p_0, rho_0
+from src.toolbox.lazy_import import LazyModule
+
+pd = LazyModule('pandas')
+
+FRAMES = ('dimensionless', 'dimensional', 'pse')
+
+QUANTITIES = ('rho', 'ux', 'ur', 'ut', 'T', 'p')
+
+_DIMENSIONLESS_UNITS = {'ux': c_0, 'ur': c_0, 'ut': c_0, 'T': (gamma - 1) * T_0, 'p': gamma * p_0, 'rho': rho_0}
+
+# Real part, imaginary part and modulus of the PSE quantities, e.g. 'Re(ux)'
+_COMPONENT_PATTERN = re.compile(r'^(?:Re|Im|abs)\((\w+)\)$')
+
+
+def get_base_quantity(name: str) -> Optional[str]:
+    """
+    Return the quantity of a field name ('ux' for 'ux', 'Re(ux)', 'Im(ux)' or 'abs(ux)'), or None if the field is
+    not a physical quantity (e.g. 'x', 'r' or 'Re(alpha)').
+    """
+    match = _COMPONENT_PATTERN.match(name)
+    quantity = match.group(1) if match else name
+    return quantity if quantity in QUANTITIES else None
+
+
+@lru_cache(maxsize=None)
+def _get_case_units(ID_MACH: Optional[int]) -> dict[str, dict[str, float]]:
+    """
+    Return the units of every quantity in every frame for a case, reading its reference values once. Without a case,
+    the PSE units are NaN.
+    """
+    if ID_MACH is None:
+        pse_units = {quantity: np.nan for quantity in QUANTITIES}
+    else:
+        ref_values = get_reference_values(ID_MACH)
+        pse_units = {'ux': ref_values['ux'], 'ur': ref_values['ux'], 'ut': ref_values['ux'],
+                     'T': np.nan, 'p': ref_values['rho'] * (ref_values['ux'] ** 2), 'rho': ref_values['rho']}
+    return {'dimensionless': _DIMENSIONLESS_UNITS,
+            'dimensional': {quantity: 1.0 for quantity in QUANTITIES},
+            'pse': {quantity: float(unit) for quantity, unit in pse_units.items()}}
+
+
+class ConversionTable:
+    """
+    Units of a set of quantities of a set of cases in every frame.
+
+    Attributes
+    ----------
+    ID_MACHS : tuple
+        Mach number IDs of the cases, None for a table without case (without the 'pse' frame).
+    quantities : tuple[str]
+        Quantities, or field names such as 'Re(ux)'.
+    units : np.ndarray
+        SI value of 1 in each frame (n_cases, n_quantities, n_frames), NaN where the frame is not defined.
+
+    Methods
+    -------
+    get_factors(source: str, target: str) -> np.ndarray
+        Returns the conversion factors of every case and quantity (n_cases, n_quantities).
+    convert(values: np.ndarray, source: str, target: str, inplace: bool = False) -> np.ndarray
+        Converts stacked values with one broadcast multiply.
+    """
+
+    def __init__(self, ID_MACHS: tuple = (None,), quantities: tuple = QUANTITIES) -> None:
+        bases = [get_base_quantity(quantity) for quantity in quantities]
+        if not quantities or None in bases:
+            raise ValueError(f"quantities must be among {list(QUANTITIES)} or their components (e.g. 'Re(ux)')")
+        if not ID_MACHS:
+            raise ValueError("ID_MACHS must contain at least one case")
+        self.ID_MACHS = tuple(ID_MACHS)
+        self.quantities = tuple(quantities)
+        self.units = np.array([[[_get_case_units(ID_MACH)[frame][base] for frame in FRAMES] for base in bases]
+                               for ID_MACH in self.ID_MACHS])
+
+    def get_factors(self, source: str, target: str) -> np.ndarray:
+        """
+        Return the factors converting the values of every case and quantity from the source frame to the target
+        frame, of shape (n_cases, n_quantities), NaN where a frame is not defined.
+        """
+        for frame in (source, target):
+            if frame not in FRAMES:
+                raise ValueError(f"frames must be among {FRAMES}")
+        return self.units[..., FRAMES.index(source)] / self.units[..., FRAMES.index(target)]
+
+    def convert(self, values: np.ndarray, source: str, target: str, inplace: bool = False) -> np.ndarray:
+        """
+        Convert stacked values with one broadcast multiply.
+
+        Parameters
+        ----------
+        values: np.ndarray
+            Values of shape (n_cases, n_quantities, ...), or (n_quantities, ...) for a table of one case.
+        source, target: str
+            Frames among 'dimensionless', 'dimensional' and 'pse'.
+        inplace: bool, optional
+            If True, `values` is overwritten with the converted values, without any allocation. Default is False.
+
+        Returns
+        -------
+        np.ndarray
+            The converted values.
+
+        Raises
+        ------
+        ValueError
+            If the shape of the values does not match the table, or if a frame is not defined for a quantity.
+        TypeError
+            If the values cannot be converted in place.
+        """
+        n_cases, n_quantities = len(self.ID_MACHS), len(self.quantities)
+        if not inplace:
+            values = np.asarray(values)
+        elif not isinstance(values, np.ndarray) or not np.issubdtype(values.dtype, np.inexact) \
+                or not values.flags.writeable:
+            raise TypeError("values converted in place must be a writeable floating-point or complex array")
+        if values.ndim >= 2 and values.shape[:2] == (n_cases, n_quantities):
+            factors = self.get_factors(source, target)
+        elif n_cases == 1 and values.ndim >= 1 and values.shape[0] == n_quantities:
+            factors = self.get_factors(source, target)[0]
+        else:
+            raise ValueError(f"values must be of shape ({n_cases}, {n_quantities}, ...)"
+                             + (f" or ({n_quantities}, ...)" if n_cases == 1 else ''))
+        if np.isnan(factors).any():
+            undefined = [quantity for quantity, missing in
+                         zip(self.quantities, np.isnan(factors).reshape(-1, n_quantities).any(axis=0)) if missing]
+            raise ValueError(f"the conversion from '{source}' to '{target}' is not defined for {undefined}"
+                             + (" without a case" if None in self.ID_MACHS else ''))
+
+        factors = factors.reshape(factors.shape + (1,) * (values.ndim - factors.ndim))
+        if inplace:
+            return np.multiply(values, factors, out=values)
+        return values * factors
+
+
+@lru_cache(maxsize=256)
+def get_conversion_table(ID_MACHS: tuple = (None,), quantities: tuple = QUANTITIES) -> ConversionTable:
+    """
+    Return the conversion table of a set of cases and quantities, built once per set.
+    """
+    return ConversionTable(tuple(ID_MACHS), tuple(quantities))
+
+
+def convert(values: np.ndarray, quantities: tuple, source: str, target: str, ID_MACHS: tuple = (None,),
+            inplace: bool = False) -> np.ndarray:
+    """
+    Convert stacked values (n_cases, n_quantities, ...) or (n_quantities, ...) between frames, see
+    `ConversionTable.convert`.
+    """
+    return get_conversion_table(tuple(ID_MACHS), tuple(quantities)).convert(values, source, target, inplace)
+
+
+def convert_fields(fields: dict[str, Any], source: str, target: str, ID_MACH: Optional[int] = None
+                   ) -> dict[str, Any]:
+    """
+    Convert a dictionary of fields (DataFrames, arrays or scalars) of a case between frames.
+
+    The fields that are not physical quantities (e.g. 'x', 'r') and the quantities without the requested frames
+    (the temperature in the 'pse' frame) are left out. The arrays of the same shape and type are stacked and
+    converted together, with one multiply, and the DataFrames returned are views of the converted stack.
+
+    Parameters
+    ----------
+    fields: dict
+        Fields by name, e.g. 'ux' or 'Re(ux)'.
+    source, target: str
+        Frames among 'dimensionless', 'dimensional' and 'pse'.
+    ID_MACH: int, optional
+        Mach number ID of the case, needed by the 'pse' frame.
+
+    Returns
+    -------
+    dict
+        The converted fields, of the same types as the inputs.
+    """
+    names = [name for name in fields if get_base_quantity(name) is not None]
+    if not names:
+        return {}
+    factors = get_conversion_table((ID_MACH,), tuple(names)).get_factors(source, target)[0]
+
+    converted = {}
+    groups = {}
+    for name, factor in zip(names, factors):
+        if np.isnan(factor):
+            continue
+        value = fields[name]
+        if isinstance(value, pd.DataFrame):
+            array = value.to_numpy()
+            groups.setdefault(('frame', array.shape, array.dtype), []).append((name, array, factor))
+        elif isinstance(value, np.ndarray) and value.ndim > 0:
+            groups.setdefault(('array', value.shape, value.dtype), []).append((name, value, factor))
+        else:
+            converted[name] = value * factor
+
+    for (kind, shape, _), group in groups.items():
+        stack = np.stack([array for _, array, _ in group])
+        group_factors = np.array([factor for _, _, factor in group]).reshape((-1,) + (1,) * len(shape))
+        if np.issubdtype(stack.dtype, np.inexact):
+            stack *= group_factors
+        else:
+            stack = stack * group_factors
+        for (name, _, _), values in zip(group, stack):
+            if kind == 'frame':
+                converted[name] = pd.DataFrame(values, index=fields[name].index, columns=fields[name].columns,
+                                               copy=False)
+            else:
+                converted[name] = values
+
+    return {name: converted[name] for name in names if name in converted}
@@ -0,0 +1,211 @@
+"""
+Process-wide registry of the loaded fields, so that the PostProcess objects of the same case (e.g. at different
+phases or amplitudes) share one PerturbationField, and the PerturbationFields of the different Strouhal numbers of a
+case share one RansField.
+
+The registry is thread-safe (a field requested by several threads at once is loaded once), bounded in memory (the
+least recently used fields are dropped when the budget is exceeded) and the arrays of the shared fields are flagged
+read-only. The methods of the fields never modify their arrays: a caller needing to modify a field must copy it.
+
+Examples
+--------
+>>> registry = get_field_registry()
+>>> registry.set_max_bytes(200 * 1024 ** 2)
+>>> post_process_0 = PostProcess(0.4, 1, t=0)
+>>> post_process_25 = PostProcess(0.4, 1, t=25)  # shares the PerturbationField of post_process_0
+>>> registry.get_stats()
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+import numpy as np
+
+from src.toolbox.memory import get_buffer, get_memory_report, iter_arrays
+
+if TYPE_CHECKING:
+    from src.Field.perturbation_field import PerturbationField
+    from src.Field.rans_field import RansField
+
+
+class FieldRegistry:
+    """
+    Thread-safe, memory-bounded LRU registry of the RansField and PerturbationField objects, keyed by
+    ('rans', ID_MACH) and ('perturbation', St, ID_MACH).
+
+    Attributes
+    ----------
+    max_bytes : int
+        Memory budget of the registered fields.
+    hits : int
+        Number of requests served by a registered field.
+    misses : int
+        Number of fields loaded.
+    evictions : int
+        Number of fields dropped to respect the memory budget.
+
+    Methods
+    -------
+    get_perturbation_field(St: Union[int, float], ID_MACH: int) -> PerturbationField
+        Returns the shared PerturbationField of a case, loading it on the first request.
+    get_rans_field(ID_MACH: int) -> RansField
+        Returns the shared RansField of a case, loading it on the first request.
+    add_perturbation_field(perturbation_field: PerturbationField)
+        Registers a PerturbationField loaded elsewhere (e.g. by another process).
+    set_max_bytes(max_bytes: int)
+        Changes the memory budget, dropping the least recently used fields if needed.
+    evict(key: Optional[tuple] = None)
+        Drops a field, or the least recently used one.
+    clear()
+        Drops every field.
+    get_stats() -> dict
+        Returns the counters, the memory used and the registered keys with their size.
+    """
+
+    def __init__(self, max_bytes: int = 1024 ** 3) -> None:
+        """
+        Parameters
+        ----------
+        max_bytes: int, optional
+            Memory budget of the registered fields. Default is 1 GB.
+        """
+        self.__check_max_bytes(max_bytes)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()  # key -> (field, nbytes), the most recently used last
+        self.__loading = {}  # key -> lock held while the field is loaded
+        self.__lock = threading.RLock()
+
+    def get_perturbation_field(self, St: Union[int, float], ID_MACH: int) -> PerturbationField:
+        """
+        Return the shared PerturbationField of a case, loading it on the first request.
+        """
+        from src.Field.perturbation_field import PerturbationField
+
+        return self.__get(('perturbation', St, ID_MACH), lambda: PerturbationField(St, ID_MACH))
+
+    def get_rans_field(self, ID_MACH: int) -> RansField:
+        """
+        Return the shared RansField of a case, loading it on the first request.
+        """
+        from src.Field.rans_field import RansField
+
+        return self.__get(('rans', ID_MACH), lambda: RansField(ID_MACH))
+
+    def add_perturbation_field(self, perturbation_field: PerturbationField) -> None:
+        """
+        Register a PerturbationField loaded elsewhere (e.g. by another process), replacing the registered one.
+        """
+        key = ('perturbation', perturbation_field.St, perturbation_field.ID_MACH)
+        self.__add(key, perturbation_field)
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """
+        Change the memory budget, dropping the least recently used fields if needed.
+        """
+        self.__check_max_bytes(max_bytes)
+        with self.__lock:
+            self.max_bytes = max_bytes
+            self.__evict_over_budget()
+
+    def evict(self, key: Optional[tuple] = None) -> None:
+        """
+        Drop a field, e.g. ('perturbation', 0.4, 1) or ('rans', 1), or the least recently used one if `key` is None.
+        The objects still referenced elsewhere stay alive, but are no longer shared with the new requests.
+        """
+        with self.__lock:
+            if key is None:
+                if self.__entries:
+                    self.__entries.popitem(last=False)
+                    self.evictions += 1
+            elif self.__entries.pop(key, None) is not None:
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drop every field.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Return the counters, the memory used and the size of every registered field, the most recently used last.
+        """
+        with self.__lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'nbytes': sum(nbytes for _, nbytes in self.__entries.values()), 'max_bytes': self.max_bytes,
+                    'entries': {key: nbytes for key, (_, nbytes) in self.__entries.items()}}
+
+    def __get(self, key: tuple, load: Callable):
+        with self.__lock:
+            if key in self.__entries:
+                self.hits += 1
+                self.__entries.move_to_end(key)
+                return self.__entries[key][0]
+            key_lock = self.__loading.setdefault(key, threading.Lock())
+
+        # The fields are loaded outside the registry lock so that different keys load concurrently, while the
+        # requests of the same key wait for the first one
+        with key_lock:
+            with self.__lock:
+                if key in self.__entries:
+                    self.hits += 1
+                    self.__entries.move_to_end(key)
+                    return self.__entries[key][0]
+            try:
+                field = load()
+                with self.__lock:
+                    self.misses += 1
+                self.__add(key, field)
+            finally:
+                with self.__lock:
+                    self.__loading.pop(key, None)
+        return field
+
+    def __add(self, key: tuple, field) -> None:
+        _set_read_only(field)
+        nbytes = get_memory_report({'field': field}, find_duplicates=False).total
+        with self.__lock:
+            self.__entries[key] = (field, nbytes)
+            self.__entries.move_to_end(key)
+            self.__evict_over_budget(keep=key)
+
+    def __evict_over_budget(self, keep: Optional[tuple] = None) -> None:
+        total = sum(nbytes for _, nbytes in self.__entries.values())
+        for key in list(self.__entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self.__entries.pop(key)[1]
+            self.evictions += 1
+
+    @staticmethod
+    def __check_max_bytes(max_bytes):
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+
+
+def _set_read_only(field) -> None:
+    """
+    Flag the NumPy buffers of a field (including the blocks of its DataFrames) as read-only.
+    """
+    for array in iter_arrays(field):
+        if isinstance(array, np.ndarray):
+            get_buffer(array).flags.writeable = False
+            array.flags.writeable = False
+
+
+_registry = FieldRegistry()
+
+
+def get_field_registry() -> FieldRegistry:
+    """
+    Return the registry of the process.
+    """
+    return _registry
@@ -0,0 +1,183 @@
+"""
+Detection of the alignment between two structured grids. When the points of a target grid are, within a tolerance,
+points of a source grid (the PSE x grid is every 5th RANS x node up to x/D = 10, the PSE and RANS r grids are both
+`RANS69pt.dat`), the values of the source are taken at the matching nodes instead of being interpolated: with a
+strided subsample, the result is a view of the source array without any copy.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class AxisAlignment:
+    """
+    Alignment of the nodes of a target axis with the nodes of a source axis.
+
+    Attributes
+    ----------
+    kind : str
+        'identical' (same nodes), 'strided' (target = source[start:stop:step]), 'subset' (every target node is a
+        source node), 'partial' (only some target nodes are source nodes) or 'none'.
+    index : slice or np.ndarray or None
+        Slice of the source nodes for 'identical' and 'strided', source index of every target node for 'subset',
+        and for 'partial' with -1 for the target nodes without a matching source node.
+    max_error : float
+        Largest distance between a matched target node and its source node.
+    """
+    kind: str
+    index: Optional[Union[slice, np.ndarray]]
+    max_error: float = 0.0
+
+    @property
+    def is_exact(self) -> bool:
+        """
+        True if every target node is a source node.
+        """
+        return self.kind in ('identical', 'strided', 'subset')
+
+    @property
+    def is_view(self) -> bool:
+        """
+        True if the target nodes are selected from the source with a slice, i.e. without copy.
+        """
+        return self.kind in ('identical', 'strided')
+
+    @property
+    def matched(self) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the target nodes having a matching source node, for 'partial'.
+        """
+        return self.index >= 0 if self.kind == 'partial' else None
+
+    def __repr__(self) -> str:
+        index = self.index if isinstance(self.index, slice) or self.index is None else f'array({len(self.index)})'
+        return f'AxisAlignment(kind={self.kind!r}, index={index}, max_error={self.max_error:.3g})'
+
+
+def align_axis(source: np.ndarray, target: np.ndarray, atol: float = 1e-6, rtol: float = 1e-9) -> AxisAlignment:
+    """
+    Detect how the nodes of a target axis match the nodes of a source axis.
+
+    Parameters
+    ----------
+    source: np.ndarray
+        Nodes of the source axis, increasing.
+    target: np.ndarray
+        Nodes of the target axis.
+    atol: float, optional
+        Absolute tolerance of the match. Default is 1e-6, the precision of the PSE files.
+    rtol: float, optional
+        Relative tolerance of the match. Default is 1e-9.
+
+    Returns
+    -------
+    AxisAlignment
+        The kind of alignment and the indices of the matching source nodes.
+    """
+    source = np.asarray(source, dtype=float)
+    target = np.asarray(target, dtype=float)
+    if source.ndim != 1 or target.ndim != 1:
+        raise ValueError("source and target must be one-dimensional arrays")
+    if len(source) == 0 or len(target) == 0 or np.any(np.diff(source) <= 0):
+        return AxisAlignment('none', None)
+
+    # Nearest source node of every target node
+    right = np.clip(np.searchsorted(source, target), 0, len(source) - 1)
+    left = np.maximum(right - 1, 0)
+    nearest = np.where(np.abs(source[left] - target) <= np.abs(source[right] - target), left, right)
+    error = np.abs(source[nearest] - target)
+    matched = error <= atol + rtol * np.abs(target)
+
+    if not matched.any():
+        return AxisAlignment('none', None)
+    max_error = float(error[matched].max())
+    if not matched.all():
+        return AxisAlignment('partial', np.where(matched, nearest, -1), max_error)
+
+    steps = np.diff(nearest)
+    if len(nearest) == 1 or (steps[0] > 0 and np.all(steps == steps[0])):
+        step = 1 if len(nearest) == 1 else int(steps[0])
+        start, stop = int(nearest[0]), int(nearest[-1]) + 1
+        if start == 0 and stop == len(source) and step == 1:
+            return AxisAlignment('identical', slice(None), max_error)
+        return AxisAlignment('strided', slice(start, stop, step), max_error)
+    return AxisAlignment('subset', nearest, max_error)
+
+
+@dataclass(frozen=True)
+class GridAlignment:
+    """
+    Alignment of a target (x, r) grid with a source (x, r) grid.
+
+    Attributes
+    ----------
+    x : AxisAlignment
+        Alignment of the x axes.
+    r : AxisAlignment
+        Alignment of the r axes.
+
+    Methods
+    -------
+    detect(source_x, source_r, target_x, target_r, atol=1e-6) -> GridAlignment
+        Detects the alignment of the two grids.
+    take(values: np.ndarray) -> np.ndarray
+        Returns the values of the source at the target nodes, for the 'view' and 'gather' paths.
+    """
+    x: AxisAlignment
+    r: AxisAlignment
+
+    @classmethod
+    def detect(cls, source_x: np.ndarray, source_r: np.ndarray, target_x: np.ndarray, target_r: np.ndarray,
+               atol: float = 1e-6) -> GridAlignment:
+        """
+        Detect the alignment of a target grid with a source grid, axis by axis.
+        """
+        return cls(align_axis(source_x, target_x, atol), align_axis(source_r, target_r, atol))
+
+    @property
+    def path(self) -> str:
+        """
+        Path used to bring the source values on the target grid:
+
+        - 'view': both axes are strided subsamples, the values are a view of the source;
+        - 'gather': every target node is a source node, the values are copied from the source;
+        - 'partial': the r axes match and some x nodes do, only the other x nodes are interpolated;
+        - 'spline': the r axes match, the values are interpolated along x;
+        - 'regrid': the r axes do not match, the values are interpolated in the (x, r) plane.
+        """
+        if self.x.is_view and self.r.is_view:
+            return 'view'
+        if self.x.is_exact and self.r.is_exact:
+            return 'gather'
+        if not self.r.is_exact:
+            return 'regrid'
+        if self.x.kind == 'partial':
+            return 'partial'
+        return 'spline'
+
+    def take(self, values: np.ndarray) -> np.ndarray:
+        """
+        Return the values (..., nx_source, nr_source) of the source at the target nodes (..., nx_target, nr_target),
+        a view of `values` for the 'view' path.
+
+        Raises
+        ------
+        ValueError
+            If some target nodes are not source nodes.
+        """
+        if not (self.x.is_exact and self.r.is_exact):
+            raise ValueError(f"the grids are not aligned (path '{self.path}') - the values must be interpolated")
+        if self.path == 'view':
+            return values[..., self.x.index, self.r.index]
+        return values[..., self.x.index, :][..., self.r.index]
+
+    def describe(self) -> str:
+        """
+        Return a one-line description of the alignment, e.g. for the verbose outputs.
+        """
+        return f"{self.path} (x: {self.x.kind}, max error {self.x.max_error:.2g}; " \
+               f"r: {self.r.kind}, max error {self.r.max_error:.2g})"
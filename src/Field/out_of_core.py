@@ -0,0 +1,292 @@
+"""
+Out-of-core evaluation of the total field over (case, t, theta, x, r) volumes larger than the memory.
+
+The total field of a mode of azimuthal wavenumber m is
+
+    q(t, theta, x, r) = q_rans(x, r) + epsilon * Re(A(x, r) * exp(i (m theta - 2 pi t / 100)))
+
+with the same reference conversions as `PerturbationField.compute_total_fields` (the bundled PSE modes are
+axisymmetric, m = 0, so that theta only matters for other modes). The domain is split into chunks holding all the
+phases of a block of azimuthal positions and x stations, sized to respect a memory budget. Each chunk is evaluated
+with vectorized NumPy, written to a `.npy` array on disk (returned as a read-only memory map) and reduced over t
+(min, max, mean, percentiles) in the same pass.
+
+The chunks are written with plain file writes rather than through a writable memory map, whose dirty pages would
+count in the resident memory of the process until the end of the evaluation.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from src.Field.field_registry import get_field_registry
+from src.Field.perturbation_field import PerturbationField
+from src.toolbox.path_directories import DIR_OUT
+from src.toolbox.tracing import span, traced
+
+REDUCTIONS = ('min', 'max', 'mean')
+
+
+class OutOfCoreResult:
+    """
+    Result of `evaluate_total_volume`.
+
+    Attributes
+    ----------
+    volumes : dict[str, np.memmap]
+        For each quantity, the read-only memory map of the total field, of shape (n_cases, n_t, n_theta, nx, nr).
+        Empty if the volume was not written.
+    reductions : dict[str, dict[str, np.ndarray]]
+        For each reduction ('min', 'max', 'mean', 'p<q>') and quantity, the reduction over t of shape
+        (n_cases, n_theta, nx, nr).
+    paths : list[Path]
+        Files written.
+    chunk_shape : tuple[int, int, int]
+        Number of phases, azimuthal positions and x stations of a chunk.
+    """
+
+    def __init__(self, volumes: dict, reductions: dict, paths: list[Path], chunk_shape: tuple[int, int, int]) -> None:
+        self.volumes = volumes
+        self.reductions = reductions
+        self.paths = paths
+        self.chunk_shape = chunk_shape
+
+
+def get_chunk_shape(n_t: int, n_theta: int, nx: int, nr: int, chunk_budget: int,
+                    bytes_per_value: int) -> tuple[int, int, int]:
+    """
+    Return the largest chunk (n_t, n_theta, n_x), holding all the phases if possible, whose values fit in
+    `chunk_budget` bytes, each value needing `bytes_per_value` bytes with the temporaries.
+
+    Raises
+    ------
+    ValueError
+        If a single radial profile does not fit in the budget.
+    """
+    n_values = chunk_budget // bytes_per_value
+    if n_values < nr:
+        raise ValueError(f"the memory budget is too small: a chunk needs at least {nr * bytes_per_value} bytes")
+    if n_values >= n_t * nr:
+        # All the phases: the reductions over t are computed chunk by chunk
+        n_x = min(nx, n_values // (n_t * nr))
+        n_theta = min(n_theta, n_values // (n_t * n_x * nr)) if n_x == nx else 1
+        return n_t, n_theta, n_x
+    return n_values // nr, 1, 1
+
+
+@traced('OutOfCore.evaluate_total_volume')
+def evaluate_total_volume(St: Union[int, float], ID_MACHS: list[int], ts: Union[list, np.ndarray],
+                          thetas: Union[list, np.ndarray] = (0,), epsilon: Union[int, float] = 0.01, m: int = 0,
+                          quantities: Optional[list[str]] = None, memory_budget: int = 256 * 1024 ** 2,
+                          out_dir: Optional[Path] = None, write_volume: bool = True,
+                          reductions: tuple = REDUCTIONS, percentiles: tuple = (),
+                          dtype: np.dtype = np.float64) -> OutOfCoreResult:
+    """
+    Evaluate the total field of several cases over a grid of phases and azimuthal positions chunk by chunk.
+
+    Parameters
+    ----------
+    St: int or float
+        Strouhal number.
+    ID_MACHS: list of int
+        Cases, sharing the same PSE grid.
+    ts: list or np.ndarray
+        Phases in percentage of the period (0 to 100).
+    thetas: list or np.ndarray, optional
+        Azimuthal positions in radians. Default is (0,).
+    epsilon: int or float, optional
+        Amplitude of the perturbation. Default is 0.01.
+    m: int, optional
+        Azimuthal wavenumber of the mode. Default is 0 (axisymmetric, as the bundled PSE modes).
+    quantities: list of str, optional
+        Quantities to evaluate. Default is `PerturbationField.rans_quantities`.
+    memory_budget: int, optional
+        Bound in bytes of the memory used by the evaluation, including the fields of the current case, the
+        reductions and the temporaries of a chunk. The cases are dropped from the field registry once evaluated,
+        except the ones already registered by the caller, which are not counted. Default is 256 MB.
+    out_dir: Path, optional
+        Directory of the `.npy` files. Default is `Output/out_of_core/St<St>`.
+    write_volume: bool, optional
+        If False, only the reductions are computed and written. Default is True.
+    reductions: tuple of str, optional
+        Reductions over t among 'min', 'max' and 'mean'. Default is all of them.
+    percentiles: tuple of float, optional
+        Percentiles over t (0 to 100). They require a chunk holding all the phases of one radial profile.
+    dtype: np.dtype, optional
+        Type of the values written on disk. Default is float64.
+
+    Returns
+    -------
+    OutOfCoreResult
+        Memory maps of the volumes and reductions over t.
+
+    Raises
+    ------
+    ValueError
+        If the phases, reductions or percentiles are not valid, if the cases do not share the same grid or if the
+        memory budget is too small.
+    """
+    quantities = PerturbationField.rans_quantities if quantities is None else list(quantities)
+    ts = np.atleast_1d(np.asarray(ts, dtype=float))
+    thetas = np.atleast_1d(np.asarray(thetas, dtype=float))
+    if ts.ndim != 1 or np.any(ts < 0) or np.any(ts > 100):
+        raise ValueError("ts should be percentages between 0 and 100.")
+    if any(reduction not in REDUCTIONS for reduction in reductions):
+        raise ValueError(f"reductions must be among {REDUCTIONS}")
+    if any(not 0 <= q <= 100 for q in percentiles):
+        raise ValueError("percentiles must be between 0 and 100")
+    if any(quantity not in PerturbationField.rans_quantities for quantity in quantities):
+        raise ValueError(f"quantities must be among {PerturbationField.rans_quantities}")
+
+    # The cases are loaded one at a time, the first one giving the grid
+    registry = get_field_registry()
+    registered = set(registry.get_stats()['entries'])
+    nx, nr = registry.get_perturbation_field(St, ID_MACHS[0]).rans_values[quantities[0]].shape
+
+    n_cases, n_t, n_theta = len(ID_MACHS), len(ts), len(thetas)
+    reduction_names = list(reductions) + [f'p{q:g}' for q in percentiles]
+    # Base and amplitude of every quantity of the current case (float + complex) and the reductions
+    case_bytes = len(quantities) * nx * nr * 24
+    reduction_bytes = len(quantities) * len(reduction_names) * n_cases * n_theta * nx * nr * 8
+    chunk_budget = memory_budget - case_bytes - reduction_bytes
+    # Chunk values, real and imaginary temporaries, plus the sorted copy of the percentiles
+    bytes_per_value = 8 * (4 if percentiles else 3)
+    if chunk_budget <= 0:
+        raise ValueError(f"the memory budget is too small: the fields and reductions need "
+                         f"{case_bytes + reduction_bytes} bytes")
+    chunk_t, chunk_theta, chunk_x = get_chunk_shape(n_t, n_theta, nx, nr, chunk_budget, bytes_per_value)
+    if percentiles and chunk_t < n_t:
+        raise ValueError("the memory budget is too small to compute percentiles: a chunk must hold all the phases "
+                         "of a radial profile")
+
+    out_dir = Path(DIR_OUT / 'out_of_core' / "St{:02d}".format(int(10 * St)) if out_dir is None else out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    writers = {}
+    if write_volume:
+        for quantity in quantities:
+            path = out_dir / f'total_{quantity}.npy'
+            writers[quantity] = _VolumeWriter(path, (n_cases, n_t, n_theta, nx, nr), dtype)
+            paths.append(path)
+    reduced = {name: {quantity: np.empty((n_cases, n_theta, nx, nr)) for quantity in quantities}
+               for name in reduction_names}
+
+    # exp(i (m theta - 2 pi t / 100)) of shape (n_t, n_theta, 1, 1)
+    phase = np.exp(1j * (m * thetas[None, :] - 2 * np.pi * ts[:, None] / 100))[:, :, None, None]
+    phase_real, phase_imag = np.ascontiguousarray(phase.real), np.ascontiguousarray(phase.imag)
+
+    for i_case, ID_MACH in enumerate(ID_MACHS):
+        field = registry.get_perturbation_field(St, ID_MACH)
+        if field.rans_values[quantities[0]].shape != (nx, nr):
+            raise ValueError("the cases must share the same PSE grid")
+        base, amplitude = _get_case_arrays(field, quantities)
+        for quantity in quantities:
+            for theta_0 in range(0, n_theta, chunk_theta):
+                theta_slice = slice(theta_0, min(theta_0 + chunk_theta, n_theta))
+                for x_0 in range(0, nx, chunk_x):
+                    x_slice = slice(x_0, min(x_0 + chunk_x, nx))
+                    with span('OutOfCore.chunk'):
+                        _evaluate_x_block(base[quantity][x_slice], amplitude[quantity][x_slice], epsilon,
+                                          phase_real[:, theta_slice], phase_imag[:, theta_slice], chunk_t,
+                                          writers.get(quantity), (i_case, theta_0, x_0),
+                                          {name: values[quantity][i_case, theta_slice, x_slice]
+                                           for name, values in reduced.items()},
+                                          reductions, percentiles)
+        # The fields of the case are released before the next one is loaded, so that the memory does not grow with
+        # the number of cases
+        del field, base, amplitude
+        for key in (('perturbation', St, ID_MACH), ('rans', ID_MACH)):
+            if key not in registered:
+                registry.evict(key)
+    for writer in writers.values():
+        writer.close()
+
+    for name, values in reduced.items():
+        for quantity, value in values.items():
+            path = out_dir / f'{name}_{quantity}.npy'
+            np.save(path, value)
+            paths.append(path)
+
+    volumes = {quantity: np.load(path, mmap_mode='r') for quantity, path in zip(quantities, paths)} \
+        if write_volume else {}
+    return OutOfCoreResult(volumes, reduced, paths, (chunk_t, chunk_theta, chunk_x))
+
+
+def _get_case_arrays(field: PerturbationField, quantities: list[str]) -> tuple[dict, dict]:
+    """
+    Return the base and the complex amplitude of each quantity such that the total field is
+    base + epsilon * Re(amplitude * phase), with the conversions of `PerturbationField.compute_total_fields`.
+    """
+    converted_rans = field.convert_to_rans_reference(field.get_converted_rans_values(), field.ID_MACH)
+    amplitude = field.convert_to_rans_reference(field.compute_complex_amplitude(), field.ID_MACH)
+    amplitude = field.convert_to_rans_reference(amplitude, field.ID_MACH)
+    return ({quantity: converted_rans[quantity].to_numpy() for quantity in quantities},
+            {quantity: amplitude[quantity].to_numpy() for quantity in quantities})
+
+
+class _VolumeWriter:
+    """
+    Writer of the chunks of a (n_cases, n_t, n_theta, nx, nr) `.npy` file, one contiguous radial block at a time.
+    """
+
+    def __init__(self, path: Path, shape: tuple, dtype: np.dtype) -> None:
+        # open_memmap writes the header and sizes the (sparse) file, the values being written by `write`
+        volume = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+        self.offset = volume.offset
+        del volume
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.file = open(path, 'r+b')
+
+    def write(self, i_case: int, t_0: int, theta_0: int, x_0: int, chunk: np.ndarray) -> None:
+        """
+        Write a chunk of shape (n_t, n_theta, n_x, nr) starting at the given indices.
+        """
+        _, n_t, n_theta, nx, nr = self.shape
+        for k_t in range(chunk.shape[0]):
+            for k_theta in range(chunk.shape[1]):
+                index = (((i_case * n_t + t_0 + k_t) * n_theta + theta_0 + k_theta) * nx + x_0) * nr
+                self.file.seek(self.offset + index * self.dtype.itemsize)
+                self.file.write(chunk[k_t, k_theta].astype(self.dtype, copy=False).tobytes())
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _evaluate_x_block(base: np.ndarray, amplitude: np.ndarray, epsilon: float, phase_real: np.ndarray,
+                      phase_imag: np.ndarray, chunk_t: int, writer: Optional[_VolumeWriter], position: tuple,
+                      reduced: dict[str, np.ndarray], reductions: tuple, percentiles: tuple) -> None:
+    """
+    Evaluate the total field of a block of x stations and azimuthal positions over all the phases, `chunk_t` phases
+    at a time, write it with `writer` at `position` (case, theta and x indices) and store its reductions over t in
+    `reduced`.
+    """
+    n_t = phase_real.shape[0]
+    totals = {'min': None, 'max': None, 'sum': None}
+    for t_0 in range(0, n_t, chunk_t):
+        t_slice = slice(t_0, min(t_0 + chunk_t, n_t))
+        # base + epsilon * (Re(A) cos - Im(A) sin), without complex temporaries
+        chunk = np.multiply(amplitude.real, phase_real[t_slice])
+        imag = np.multiply(amplitude.imag, phase_imag[t_slice])
+        chunk -= imag
+        del imag
+        chunk *= epsilon
+        chunk += base
+
+        if writer is not None:
+            writer.write(position[0], t_0, position[1], position[2], chunk)
+        if 'min' in reductions:
+            totals['min'] = chunk.min(axis=0) if totals['min'] is None else np.minimum(totals['min'], chunk.min(axis=0))
+        if 'max' in reductions:
+            totals['max'] = chunk.max(axis=0) if totals['max'] is None else np.maximum(totals['max'], chunk.max(axis=0))
+        if 'mean' in reductions:
+            totals['sum'] = chunk.sum(axis=0) if totals['sum'] is None else totals['sum'] + chunk.sum(axis=0)
+        if percentiles:
+            # The chunk holds all the phases when percentiles are requested
+            for q, value in zip(percentiles, np.percentile(chunk, percentiles, axis=0)):
+                reduced[f'p{q:g}'][...] = value
+
+    for reduction in reductions:
+        reduced[reduction][...] = totals['sum'] / n_t if reduction == 'mean' else totals[reduction]
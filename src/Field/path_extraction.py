@@ -0,0 +1,324 @@
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from src.Field.perturbation_field import PerturbationField
+from src.Field.rans_field import RansField
+from src.ReadData.read_radius import get_r_grid
+
+# Quantities that can be extracted along a path from each field: for 'pse', the complex amplitude (e.g. 'ux') or the
+# stored PSE quantities (e.g. 'abs(ux)')
+PATH_QUANTITIES = {'rans': RansField.quantities,
+                   'pse': PerturbationField.rans_quantities + PerturbationField.pse_quantities[2:],
+                   'total': PerturbationField.rans_quantities}
+
+
+class LinePath:
+    """
+    Class describing a path in the (x/D, r/D) plane, resampled at a constant arc-length resolution.
+    Paths can be built from a polyline, from a parametric function or from the usual jet lines
+    (lipline, centreline, conical rays, shear-layer centre).
+
+    Attributes
+    ----------
+    x : np.ndarray
+        x-coordinates of the resampled points.
+    r : np.ndarray
+        r-coordinates of the resampled points.
+    s : np.ndarray
+        Curvilinear abscissa (arc length) of each resampled point, starting at 0.
+    name : str
+        Name of the path, used for plot labels.
+
+    Methods
+    -------
+    from_parametric(func: Callable, u_min: float, u_max: float, ds: float, n_eval: int = 2000, name: str = 'path')
+        Builds a path from a parametric function u -> (x(u), r(u)).
+    lipline(x_min: float = 0, x_max: float = 10, ds: float = 0.05)
+        Builds the lipline r/D = 0.5.
+    centreline(x_min: float = 0, x_max: float = 10, ds: float = 0.05)
+        Builds the jet axis r/D = 0.
+    ray(angle: float, length: float, origin: tuple = (0, 0.5), ds: float = 0.05)
+        Builds a straight ray starting from the nozzle lip with an angle (in degrees) with respect to the x-axis.
+    shear_layer_centre(x_grid: np.ndarray, r_grid: np.ndarray, ux: np.ndarray, ds: float = 0.05)
+        Builds the curve where the axial velocity is half of its centreline value.
+    """
+
+    def __init__(self, x: Union[list, np.ndarray], r: Union[list, np.ndarray], ds: Optional[float] = None,
+                 name: str = 'path') -> None:
+        """
+        Parameters
+        ----------
+        x: list or np.ndarray
+            x-coordinates of the polyline vertices.
+        r: list or np.ndarray
+            r-coordinates of the polyline vertices.
+        ds: float, optional
+            Arc-length resolution of the resampling. If None, the vertices are kept as they are.
+        name: str, optional
+            Name of the path.
+
+        Raises
+        ------
+        ValueError
+            If the polyline has less than two vertices, if x and r do not have the same size or if `ds` is not positive.
+        """
+        x = np.asarray(x, dtype=float)
+        r = np.asarray(r, dtype=float)
+        if x.ndim != 1 or x.shape != r.shape or len(x) < 2:
+            raise ValueError("x and r must be 1D arrays of the same size with at least two points")
+        if ds is not None and (not isinstance(ds, (int, float)) or ds <= 0):
+            raise ValueError("ds must be a positive number")
+
+        s = np.concatenate(([0], np.cumsum(np.hypot(np.diff(x), np.diff(r)))))
+        if ds is not None:
+            s_new = np.linspace(0, s[-1], max(int(np.ceil(s[-1] / ds)), 1) + 1)
+            x, r, s = np.interp(s_new, s, x), np.interp(s_new, s, r), s_new
+
+        self.x = x
+        self.r = r
+        self.s = s
+        self.name = name
+
+    def __len__(self) -> int:
+        return len(self.s)
+
+    @classmethod
+    def from_parametric(cls, func: Callable, u_min: float, u_max: float, ds: float, n_eval: int = 2000,
+                        name: str = 'path') -> 'LinePath':
+        """
+        Builds a path from a parametric function. The function is first evaluated on a fine regular grid of the
+        parameter, then the resulting polyline is resampled at the arc-length resolution `ds`.
+
+        Parameters
+        ----------
+        func: Callable
+            Vectorized function returning the tuple (x, r) for an array of parameters u.
+        u_min: float
+            Lower bound of the parameter.
+        u_max: float
+            Upper bound of the parameter.
+        ds: float
+            Arc-length resolution of the path.
+        n_eval: int, optional
+            Number of evaluations of `func` used to approximate the curve. Default is 2000.
+        name: str, optional
+            Name of the path.
+        """
+        u = np.linspace(u_min, u_max, n_eval)
+        x, r = func(u)
+        return cls(np.broadcast_to(x, u.shape), np.broadcast_to(r, u.shape), ds=ds, name=name)
+
+    @classmethod
+    def lipline(cls, x_min: float = 0, x_max: float = 10, ds: float = 0.05) -> 'LinePath':
+        """
+        Builds the lipline r/D = 0.5 between `x_min` and `x_max`.
+        """
+        return cls([x_min, x_max], [0.5, 0.5], ds=ds, name='lipline')
+
+    @classmethod
+    def centreline(cls, x_min: float = 0, x_max: float = 10, ds: float = 0.05) -> 'LinePath':
+        """
+        Builds the jet axis r/D = 0 between `x_min` and `x_max`.
+        """
+        return cls([x_min, x_max], [0, 0], ds=ds, name='centreline')
+
+    @classmethod
+    def ray(cls, angle: float, length: float, origin: tuple = (0, 0.5), ds: float = 0.05) -> 'LinePath':
+        """
+        Builds a straight ray from `origin` (the nozzle lip by default) with an angle in degrees relative to the
+        x-axis.
+        """
+        x_0, r_0 = origin
+        angle_rad = np.deg2rad(angle)
+        return cls([x_0, x_0 + length * np.cos(angle_rad)], [r_0, r_0 + length * np.sin(angle_rad)],
+                   ds=ds, name=f'ray {angle}°')
+
+    @classmethod
+    def shear_layer_centre(cls, x_grid: np.ndarray, r_grid: np.ndarray, ux: np.ndarray,
+                           ds: float = 0.05) -> 'LinePath':
+        """
+        Builds the curve following the centre of the shear layer, defined at each x as the first radius where the
+        axial velocity drops below half of its value on the axis.
+
+        Parameters
+        ----------
+        x_grid: np.ndarray
+            x-coordinates of the field.
+        r_grid: np.ndarray
+            r-coordinates of the field.
+        ux: np.ndarray
+            Axial velocity of shape (nx, nr).
+        ds: float, optional
+            Arc-length resolution of the path.
+        """
+        ux = np.asarray(ux)
+        ratio = ux / ux[:, :1] - 0.5
+        # Index of the last point above half of the centreline velocity, then linear interpolation to the next one
+        i_r = np.clip(np.argmax(ratio < 0, axis=1) - 1, 0, len(r_grid) - 2)
+        rows = np.arange(len(x_grid))
+        f_0, f_1 = ratio[rows, i_r], ratio[rows, i_r + 1]
+        weight = np.clip(f_0 / np.where(f_0 == f_1, 1, f_0 - f_1), 0, 1)
+        r = r_grid[i_r] + weight * (r_grid[i_r + 1] - r_grid[i_r])
+        return cls(x_grid, r, ds=ds, name='shear layer centre')
+
+
+class PathExtractor:
+    """
+    Class evaluating fields given on a rectilinear (x, r) grid along a `LinePath` with a bilinear interpolation.
+    The interpolation indices and weights are computed once, so that any number of fields, phases or cases
+    stacked along the leading axes are evaluated in a single vectorized operation.
+
+    Attributes
+    ----------
+    path : LinePath
+        The path along which the fields are evaluated.
+    x_grid : np.ndarray
+        x-coordinates of the field grid.
+    r_grid : np.ndarray
+        r-coordinates of the field grid.
+    """
+
+    def __init__(self, path: LinePath, x_grid: np.ndarray, r_grid: np.ndarray) -> None:
+        """
+        Parameters
+        ----------
+        path: LinePath
+            The path along which the fields are evaluated.
+        x_grid: np.ndarray
+            Increasing x-coordinates of the field grid.
+        r_grid: np.ndarray
+            Increasing r-coordinates of the field grid.
+
+        Raises
+        ------
+        ValueError
+            If a point of the path lies outside the grid.
+        """
+        self.path = path
+        self.x_grid = np.asarray(x_grid, dtype=float)
+        self.r_grid = np.asarray(r_grid, dtype=float)
+
+        for name, coord, grid in (('x', path.x, self.x_grid), ('r', path.r, self.r_grid)):
+            if coord.min() < grid[0] or coord.max() > grid[-1]:
+                raise ValueError(f"the path goes outside of the grid - {name} must lie in [{grid[0]}, {grid[-1]}]")
+
+        self.__i_x, self.__w_x = self.__locate(self.x_grid, path.x)
+        self.__i_r, self.__w_r = self.__locate(self.r_grid, path.r)
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the field(s) along the path.
+
+        Parameters
+        ----------
+        values: np.ndarray
+            Real or complex array of shape (..., nx, nr).
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (..., n_points) with the values along the path.
+        """
+        values = np.asarray(values)
+        i_x, i_r, w_x, w_r = self.__i_x, self.__i_r, self.__w_x, self.__w_r
+        return ((1 - w_x) * (1 - w_r) * values[..., i_x, i_r] + w_x * (1 - w_r) * values[..., i_x + 1, i_r]
+                + (1 - w_x) * w_r * values[..., i_x, i_r + 1] + w_x * w_r * values[..., i_x + 1, i_r + 1])
+
+    @staticmethod
+    def __locate(grid, coord):
+        """
+        Return the index of the cell containing each coordinate and the relative position inside the cell.
+        """
+        idx = np.clip(np.searchsorted(grid, coord, side='right') - 1, 0, len(grid) - 2)
+        weight = (coord - grid[idx]) / (grid[idx + 1] - grid[idx])
+        return idx, weight
+
+
+def check_path_quantities(fields: tuple[str, ...], quantities: list[str]) -> None:
+    """
+    Check that every quantity can be extracted from every field, see `PATH_QUANTITIES`.
+
+    Raises
+    ------
+    ValueError
+        If a field or a quantity of a field is not available.
+    """
+    for field in fields:
+        if field not in PATH_QUANTITIES:
+            raise ValueError("field must be a string in ['rans', 'pse', 'total']")
+        for quantity in quantities:
+            if quantity not in PATH_QUANTITIES[field]:
+                raise ValueError(f"{quantity} is not a valid quantity - choose among {PATH_QUANTITIES[field]}")
+
+
+def extract_along_path(path: LinePath, St: Union[int, float], ID_MACHS: Union[int, list[int]],
+                       fields: tuple[str, ...] = ('rans', 'pse', 'total'), quantities: Optional[list[str]] = None,
+                       ts: Union[int, float, list, np.ndarray] = 0,
+                       epsilon: Union[int, float] = 0.01) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Extract the requested quantities along a path for one or several cases. The fields of all the cases are stacked
+    and evaluated along the path at once.
+
+    Parameters
+    ----------
+    path: LinePath
+        The path along which the fields are evaluated.
+    St: int or float
+        Strouhal number.
+    ID_MACHS: int or list[int]
+        Case(s) selected based on the Mach reference.
+    fields: tuple of str, optional
+        Fields to extract among 'rans', 'pse' (complex amplitude of the perturbation) and 'total'.
+    quantities: list of str, optional
+        Quantities to extract, among `PATH_QUANTITIES` of every field. Default is `PerturbationField.rans_quantities`.
+    ts: int, float, list or np.ndarray, optional
+        Percentage(s) of the period used for the total field.
+    epsilon: int or float, optional
+        Amplitude parameter for instabilities.
+
+    Returns
+    -------
+    dict[str, dict[str, np.ndarray]]
+        For each field and quantity, an array of shape (n_cases, n_points) for 'rans' and 'pse' and
+        (n_cases, n_t, n_points) for 'total'.
+
+    Raises
+    ------
+    ValueError
+        If a field or a quantity is not available or if the cases are not defined on the same grid.
+    """
+    if isinstance(ID_MACHS, int):
+        ID_MACHS = [ID_MACHS]
+    quantities = PerturbationField.rans_quantities if quantities is None else quantities
+    check_path_quantities(fields, quantities)
+    ts = np.atleast_1d(ts)
+
+    stacked = {field: {quantity: [] for quantity in quantities} for field in fields}
+    x_grid = None
+    for ID_MACH in ID_MACHS:
+        perturbation_field = PerturbationField(St, ID_MACH)
+        if x_grid is None:
+            x_grid = perturbation_field.x_grid
+        elif not np.array_equal(x_grid, perturbation_field.x_grid):
+            raise ValueError(f"case {ID_MACH} is not defined on the same x grid as case {ID_MACHS[0]}")
+
+        case_fields = {}
+        if 'rans' in fields:
+            case_fields['rans'] = {quantity: perturbation_field.rans_values[quantity].to_numpy()
+                                   for quantity in quantities}
+        if 'pse' in fields:
+            amplitude = perturbation_field.compute_complex_amplitude()
+            case_fields['pse'] = {quantity: (amplitude[quantity] if quantity in amplitude
+                                             else perturbation_field.values[quantity]).to_numpy()
+                                  for quantity in quantities}
+        if 'total' in fields:
+            case_fields['total'] = perturbation_field.compute_total_fields(ts, epsilon)
+
+        for field in fields:
+            for quantity in quantities:
+                stacked[field][quantity].append(case_fields[field][quantity])
+
+    extractor = PathExtractor(path, x_grid, get_r_grid())
+    return {field: {quantity: extractor(np.stack(values)) for quantity, values in by_quantity.items()}
+            for field, by_quantity in stacked.items()}
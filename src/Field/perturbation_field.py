@@ -1,14 +1,23 @@
+from __future__ import annotations
+
 from typing import Union
 
 import numpy as np
-import pandas as pd
-from scipy.interpolate import CubicSpline
 
 from src.ReadData.read_radius import get_r_grid
+from src.Field import conversion, grid_alignment, regridding
+from src.Field.conversion import convert_fields
+from src.Field.field_registry import get_field_registry
+from src.Field.grid_alignment import GridAlignment
 from src.Field.rans_field import RansField
-from src.toolbox.path_directories import DIR_STABILITY
-from src.ReadData.read_info import get_reference_values
-from src.toolbox.dimless_reference_values import D, c_0, p_0, rho_0, gamma
+from src.Field.regridding import get_regridder
+from src.toolbox.path_directories import DIR_DATA, DIR_MEAN, DIR_STABILITY, find_case_file, get_rans_files
+from src.toolbox.disk_cache import cached_product
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.tracing import record_bytes_read, span, traced
+
+pd = LazyModule('pandas')
+interpolate = LazyModule('scipy.interpolate')
 
 
 class PerturbationField:
@@ -39,15 +48,27 @@ class PerturbationField:
     compute_total_field(t: Union[int, float] = 0, epsilon_q: Union[int, float] = 0.01) -> dict[str, pd.DataFrame]
         Calculates the total field by combining RANS and perturbation fields.
 
+    compute_total_fields(ts: Union[list, np.ndarray], epsilon_q: Union[int, float] = 0.01) -> dict[str, np.ndarray]
+        Calculates the total field at several phases in one vectorized evaluation.
+
     compute_perturbation_field(t_percent_T: Union[int, float] = 0) -> dict[str, pd.DataFrame]
         Generates the perturbation field by combining real and imaginary parts and applying a time-based multiplier.
 
+    compute_complex_amplitude() -> dict[str, pd.DataFrame]
+        Computes the phase-independent complex amplitude of the perturbation field.
+
     convert_to_rans_reference(dimless_field: dict[str, pd.DataFrame], ID_MACH: int) -> dict[str, pd.DataFrame]
         Converts dimensionless PSE field values to the RANS reference frame.
 
+    get_converted_rans_values() -> dict[str, pd.DataFrame]
+        Returns the interpolated RANS values converted to the RANS reference.
+
     interpolate() -> dict[str, pd.DataFrame]
         Interpolates RANS values to align with the PSE grid for consistency.
 
+    get_grid_alignment() -> GridAlignment
+        Returns the alignment of the PSE grid with the RANS grid, i.e. the path taken by `interpolate`.
+
     __get_raw_perturbation_values() -> None
         Retrieves raw perturbation values from a file and organizes them by quantity and grid indices.
 
@@ -98,9 +119,13 @@ class PerturbationField:
         self.values = None
         self.St = St
         self.ID_MACH = ID_MACH
+        self.__grid_alignment = None
         self.__get_raw_perturbation_values()
-        self.rans_values = self.interpolate()
+        self.rans_values = cached_product('rans_values', self.__get_rans_inputs, self.interpolate,
+                                          (PerturbationField.interpolate, PerturbationField.get_grid_alignment,
+                                           RansField, grid_alignment, regridding))
 
+    @traced('PerturbationField.compute_total_field')
     def compute_total_field(self, t: Union[int, float] = 0, epsilon_q: Union[int, float] = 0.01):
         """
         Computes the total field by summing the base RANS field and a scaled perturbation field.
@@ -131,13 +156,81 @@ class PerturbationField:
 
         q_prime = self.compute_perturbation_field(t_percent_T=t)
         q_prime = self.convert_to_rans_reference(q_prime, self.ID_MACH)
-        self.rans_values = self.convert_to_rans_reference(self.rans_values, self.ID_MACH)
+        rans_values = self.get_converted_rans_values()
         for rans_quantity in self.rans_quantities:
             perturbation = epsilon_q * np.real(q_prime[rans_quantity])
-            q_tot[rans_quantity] = self.rans_values[rans_quantity] + perturbation
+            q_tot[rans_quantity] = rans_values[rans_quantity] + perturbation
 
         return self.convert_to_rans_reference(q_tot, self.ID_MACH)
 
+    @traced('PerturbationField.compute_total_fields')
+    def compute_total_fields(self, ts: Union[list, np.ndarray], epsilon_q: Union[int, float] = 0.01
+                             ) -> dict[str, np.ndarray]:
+        """
+        Computes the total field at several phases in a single vectorized evaluation.
+
+        Parameters
+        ----------
+        ts : list or np.ndarray
+            Percentages of the period (0 to 100) at which the total field is evaluated.
+        epsilon_q : int or float, optional
+            Amplitude scaling factor for perturbations, by default 0.01.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Total field of each quantity as an array of shape (len(ts), nx, nr). Each slice `[k]` is equal to
+            `compute_total_field(ts[k], epsilon_q)[quantity]`.
+
+        Raises
+        ------
+        ValueError
+            If one of the `ts` is not in [0, 100] or if `epsilon_q` is negative.
+        """
+        ts = np.atleast_1d(np.asarray(ts, dtype=float))
+        if ts.ndim != 1 or np.any(ts < 0) or np.any(ts > 100):
+            raise ValueError("ts should be percentages between 0 and 100.")
+        if not isinstance(epsilon_q, (int, float)) or epsilon_q < 0:
+            raise ValueError("epsilon_q should be a positive float or integer.")
+
+        amplitude = self.convert_to_rans_reference(self.compute_complex_amplitude(), self.ID_MACH)
+        rans_values = self.get_converted_rans_values()
+        phase = np.exp(-2j * np.pi * ts / 100)[:, None, None]
+
+        q_tot = {}
+        for rans_quantity in self.rans_quantities:
+            perturbation = epsilon_q * np.real(amplitude[rans_quantity].to_numpy()[None, :, :] * phase)
+            q_tot[rans_quantity] = rans_values[rans_quantity].to_numpy()[None, :, :] + perturbation
+
+        return self.convert_to_rans_reference(q_tot, self.ID_MACH)
+
+    @traced('PerturbationField.compute_complex_amplitude')
+    def compute_complex_amplitude(self) -> dict[str, pd.DataFrame]:
+        """
+        Computes the phase-independent complex amplitude of the perturbation field, i.e. the PSE shape function
+        multiplied by the streamwise envelope exp(i int(alpha)).
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            Complex amplitude for each quantity. The perturbation field at a time `t` is obtained by multiplying it
+            by exp(-i St t).
+        """
+        stability_data = self.get_stability_data()
+        theta_real = stability_data['Re(int(alpha))']
+        theta_imag = stability_data['Im(int(alpha))']
+
+        envelope = np.exp(-theta_imag) * np.exp(1j * theta_real)
+
+        amplitude = {}
+        for rans_quantity in self.rans_quantities:
+            real_part = self.values[f'Re({rans_quantity})']
+            imag_part = self.values[f'Im({rans_quantity})']
+            amplitude[rans_quantity] = (real_part + 1j * imag_part).mul(envelope, axis='index')
+
+        return amplitude
+
+    @traced('PerturbationField.compute_perturbation_field')
     def compute_perturbation_field(self, t_percent_T: Union[int, float] = 0) -> dict[str, pd.DataFrame]:
         """
         Computes the time-dependent perturbation field values from real and imaginary parts.
@@ -160,36 +253,27 @@ class PerturbationField:
         if not isinstance(t_percent_T, (int, float)) or not (0 <= t_percent_T <= 100):
             raise ValueError("t_percent_T must be a positive number between 0 and 100.")
 
-        stability_data = self.get_stability_data()
-        theta_real = stability_data['Re(int(alpha))']
-        theta_imag = stability_data['Im(int(alpha))']
-
         T = 2 * np.pi / self.St
         t = (t_percent_T / 100) * T
 
-        time_multiplier = np.exp(-theta_imag) * np.exp(1j * (theta_real - (self.St * t)))
-
-        rans_pse_quantities = {
-            rans_quantity: [
-                pse_quantity for pse_quantity in self.pse_quantities[2:]
-                if rans_quantity in pse_quantity and 'abs' not in pse_quantity
-            ]
-            for rans_quantity in self.rans_quantities
-        }
-
-        q_prime = {}
+        time_multiplier = np.exp(-1j * (self.St * t))
 
-        for rans_quantity, pse_parts in rans_pse_quantities.items():
-            real_part = self.values[pse_parts[0]]
-            imag_part = self.values[pse_parts[1]]
-            q_prime[rans_quantity] = real_part + 1j * imag_part
+        return {rans_quantity: amplitude * time_multiplier
+                for rans_quantity, amplitude in self.compute_complex_amplitude().items()}
 
-        for rans_quantity in q_prime:
-            q_prime[rans_quantity] = q_prime[rans_quantity].mul(time_multiplier, axis='index')
-
-        return q_prime
+    def get_converted_rans_values(self) -> dict[str, pd.DataFrame]:
+        """
+        Returns the interpolated RANS values converted with `convert_to_rans_reference`, through the derived-product
+        cache when it is enabled.
+        """
+        return cached_product('converted_rans_values', lambda: self.__get_rans_inputs() + [DIR_DATA / 'info.dat'],
+                              lambda: self.convert_to_rans_reference(self.rans_values, self.ID_MACH),
+                              (PerturbationField.interpolate, PerturbationField.get_grid_alignment,
+                               PerturbationField.convert_to_rans_reference, RansField, grid_alignment, regridding,
+                               conversion))
 
     @staticmethod
+    @traced('PerturbationField.convert_to_rans_reference')
     def convert_to_rans_reference(dimless_field: dict[str, pd.DataFrame], ID_MACH: int) -> dict[str, pd.DataFrame]:
         """
         Converts a dimensionless PSE field to the RANS reference for nondimensionless values.
@@ -204,65 +288,80 @@ class PerturbationField:
         Returns
         -------
         dict[str, pd.DataFrame]
-            Converted field values scaled to the RANS reference system.
+            Converted field values scaled to the RANS reference system. The fields that are not physical quantities
+            (e.g. 'x', 'r') are left out, the real and imaginary parts and moduli (e.g. 'Re(ux)') are converted as
+            their quantity.
         """
-        conversion_factors = {
-            'ux': c_0,
-            'ur': c_0,
-            'ut': c_0,
-            'p': gamma * p_0,
-            'rho': rho_0
-        }
-
-        ref_values = get_reference_values(ID_MACH)
-        scaling_factors = {
-            'ux': ref_values['ux'],
-            'ur': ref_values['ux'],
-            'ut': ref_values['ux'],
-            'p': ref_values['rho'] * (ref_values['ux'] ** 2),
-            'rho': ref_values['rho']
-        }
-
-        pse_to_rans = {}
-        for key, df in dimless_field.items():
-            for quantity in conversion_factors:
-                if quantity in key:
-                    conv_factor = conversion_factors[quantity]
-                    scale_factor = scaling_factors[quantity]
-                    pse_to_rans[key] = df * (scale_factor / conv_factor)
-                    break
-
-        return pse_to_rans
+        return convert_fields(dimless_field, 'pse', 'dimensionless', ID_MACH)
 
+    @traced('PerturbationField.interpolate')
     def interpolate(self) -> dict[str, pd.DataFrame]:
         """
-        Interpolates RANS field values onto the PSE grid using cubic spline interpolation. The interpolation assumes
-        that the r-grid is the same for both grid.
-        If it is not the case, please use the scipy.interpolate.griddata.
-        For these data, the expected result is that each 5-ith row in the RANS grid must match the i-th row in PSE grid
+        Brings the RANS field values onto the PSE grid. The PSE nodes that are RANS nodes (every 5th RANS x node up
+        to x/D = 10, and the r grid, which is the same for both grids) take the RANS values: when all the nodes match
+        with a constant stride, the results are views of the RANS values without copy. The other x nodes are
+        interpolated with cubic splines along x when the r grid is the same for both grids, and otherwise in the
+        (x, r) plane with a cached linear regridder (see `src.Field.regridding`).
+        The path taken is given by `get_grid_alignment().path`.
 
         Returns
         -------
         dict[str, pd.DataFrame]
             Interpolated values of the RANS field aligned with the PSE grid.
         """
-        rans_field = RansField(self.ID_MACH)
+        rans_field = get_field_registry().get_rans_field(self.ID_MACH)
         r_grid = get_r_grid()
+        alignment = self.get_grid_alignment()
+        if alignment.path == 'regrid':
+            # The weights are computed once for the grids and applied to all the quantities in one product. The
+            # linear weights do not overshoot across the sharp shear layer at the nozzle lip, unlike the higher orders
+            regridder = get_regridder(rans_field.x, rans_field.r, self.x_grid, r_grid, method='linear')
+            with span('PerturbationField.regrid', path=alignment.path):
+                regridded = regridder(np.stack([rans_field.values[quantity].to_numpy()
+                                                for quantity in RansField.quantities]))
+            return {quantity: pd.DataFrame(values, copy=False)
+                    for quantity, values in zip(RansField.quantities, regridded)}
+
         rans_interpolated = {}
         for quantity in RansField.quantities:
-            field = np.zeros((len(self.x_grid), len(r_grid)))
-
-            for i, r_val in enumerate(r_grid):
-                rans_values_at_r = rans_field.values[quantity].iloc[:, i]
-
-                cs = CubicSpline(rans_field.x, rans_values_at_r)
-
-                field[:, i] = cs(self.x_grid)
-
-            rans_interpolated[quantity] = pd.DataFrame(field)
+            values = rans_field.values[quantity].to_numpy()
+            match alignment.path:
+                case 'view' | 'gather':
+                    field = alignment.take(values)
+                case 'partial':
+                    # Only the x nodes missing from the RANS grid are interpolated
+                    matched = alignment.x.matched
+                    columns = values[:, alignment.r.index]
+                    field = np.empty((len(self.x_grid), len(r_grid)))
+                    field[matched] = columns[alignment.x.index[matched]]
+                    with span('PerturbationField.spline_fit', quantity=quantity, path=alignment.path):
+                        cs = interpolate.CubicSpline(rans_field.x, columns, axis=0)
+                        field[~matched] = cs(self.x_grid[~matched])
+                case _:
+                    field = np.zeros((len(self.x_grid), len(r_grid)))
+                    with span('PerturbationField.spline_fit', quantity=quantity, path=alignment.path):
+                        for i, r_val in enumerate(r_grid):
+                            rans_values_at_r = rans_field.values[quantity].iloc[:, i]
+
+                            cs = interpolate.CubicSpline(rans_field.x, rans_values_at_r)
+
+                            field[:, i] = cs(self.x_grid)
+
+            rans_interpolated[quantity] = pd.DataFrame(field, copy=False)
 
         return rans_interpolated
 
+    def get_grid_alignment(self) -> GridAlignment:
+        """
+        Returns the alignment of the PSE grid with the RANS grid (x of the mean flow file, r of `RANS69pt.dat`), which
+        decides the path taken by `interpolate`: 'view', 'gather', 'partial', 'spline' or 'regrid'.
+        """
+        if self.__grid_alignment is None:
+            rans_field = get_field_registry().get_rans_field(self.ID_MACH)
+            self.__grid_alignment = GridAlignment.detect(rans_field.x, rans_field.r, self.x_grid, get_r_grid())
+        return self.__grid_alignment
+
+    @traced('PerturbationField.load')
     def __get_raw_perturbation_values(self):
         """
         Retrieves perturbation field data from stored files. Parses and structures data for each quantity
@@ -281,27 +380,38 @@ class PerturbationField:
         dir_field = dir_st / 'Field'
         file_perturbation = self.__find_file(dir_field)
 
-        full_data = pd.read_csv(
-            file_perturbation,
-            delimiter=r'\s+',
-            skiprows=3,
-            names=self.pse_quantities,
-        )
+        with span('PerturbationField.parse'):
+            full_data = pd.read_csv(
+                file_perturbation,
+                delimiter=r'\s+',
+                skiprows=3,
+                names=self.pse_quantities,
+            )
+            record_bytes_read(file_perturbation)
 
         x_values = full_data['x'].unique()
         nx = range(len(x_values))
         nr = range(len(get_r_grid()))
         perturbation_dict = {}
 
-        for quantity in self.pse_quantities[2:]:
-            quantity_df = full_data.pivot(index='x', columns='r', values=quantity)
-            quantity_df.index = nx
-            quantity_df.columns = nr
-            perturbation_dict[quantity] = quantity_df
+        with span('PerturbationField.pivot'):
+            for quantity in self.pse_quantities[2:]:
+                quantity_df = full_data.pivot(index='x', columns='r', values=quantity)
+                quantity_df.index = nx
+                quantity_df.columns = nr
+                perturbation_dict[quantity] = quantity_df
 
         self.values = perturbation_dict
         self.x_grid = x_values
 
+    def __get_rans_inputs(self) -> list:
+        """
+        Returns the inputs of the interpolated RANS values, hashed by the derived-product cache: the mean flow file,
+        the PSE x grid, the r grid and the case ID.
+        """
+        return [DIR_MEAN / get_rans_files()[self.ID_MACH], self.x_grid, get_r_grid(), self.ID_MACH]
+
+    @traced('PerturbationField.get_stability_data')
     def get_stability_data(self) -> pd.DataFrame:
         """
         Loads stability field data, containing values such as real and imaginary parts of `alpha`.
@@ -324,6 +434,7 @@ class PerturbationField:
         dir_alpha = dir_st / 'alpha'
         file_alpha = self.__find_file(dir_alpha)
 
+        record_bytes_read(file_alpha)
         return pd.read_csv(file_alpha,
                            delimiter=r'\s+',
                            skiprows=3,
@@ -348,13 +459,4 @@ class PerturbationField:
        FileNotFoundError
            If no file for the specified Mach case is found within the directory.
        """
-        files = list(directory.glob('*/*'))
-        wanted_file = None
-        for i, file in enumerate(files):
-            if file.stem.endswith(str(self.ID_MACH)):
-                wanted_file = files[i]
-
-        if wanted_file is None:
-            raise FileNotFoundError('File not found - Case might be available')
-
-        return wanted_file
+        return find_case_file(directory, self.ID_MACH)
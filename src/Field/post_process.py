@@ -1,17 +1,28 @@
+from __future__ import annotations
+
 import numpy as np
-import pandas as pd
-import scipy
-from matplotlib import pyplot as plt, ticker
+from collections import OrderedDict
 from typing import Union, Optional
 
+from src.Field.field_registry import get_field_registry
+from src.Field.path_extraction import LinePath, PathExtractor, check_path_quantities
 from src.Field.perturbation_field import PerturbationField
 from src.Field.rans_field import RansField
 from src.ReadData.read_info import get_reference_values
 from src.ReadData.read_mach import get_mach_reference
 from src.ReadData.read_radius import get_r_grid
-from src.toolbox.fig_parameters import RANS_FIGSIZE
-from toolbox.fig_parameters import DEFAULT_FIGSIZE
-from toolbox.path_directories import DIR_OUT
+from src.Plot.raster import FieldPyramid, draw_raster
+from src.toolbox.compute_graph import ComputeGraph
+from src.toolbox.disk_cache import cached_product
+from src.toolbox.fig_parameters import DEFAULT_FIGSIZE, FIELD_TITLES, RANS_FIGSIZE, get_contour_levels
+from src.toolbox.path_directories import DIR_OUT
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.memory import MemoryReport, get_memory_report
+from src.toolbox.tracing import span, traced
+
+pd = LazyModule('pandas')
+plt = LazyModule('matplotlib.pyplot')
+ticker = LazyModule('matplotlib.ticker')
 
 
 class PostProcess:
@@ -25,16 +36,25 @@ class PostProcess:
         An instance of the `RansField` class containing the Reynolds-Averaged Navier-Stokes (RANS) field data for a specific Mach case.
     perturbation_field : PerturbationField
         An instance of the `PerturbationField` class containing perturbation data based on a Strouhal number and Mach case.
+        It is shared (read-only) by the PostProcess objects of the same case through the field registry.
     ID_MACH : int
         The identifier for the Mach number case used to retrieve relevant data.
     St : float
         The Strouhal number used for perturbation analysis.
     t : float
         A percentage (from 0 to 100) representing a point in the time period `T` for perturbation field evaluation.
+        Setting it only recomputes the phase and what depends on it.
     epsilon : float
         A scaling factor applied to perturbation fields when computing the total field.
+    window : tuple
+        The (x_min, x_max, r_min, r_max) domain of `get_total_in_window`. Setting it only recomputes the slicing.
+    graph : ComputeGraph
+        The memoized pipeline of the total field (converted RANS values, complex amplitude, phase, perturbation,
+        total field, window and statistics), see `graph.describe()` and `graph.get_log()` for what was recomputed.
     x_grid : np.ndarray
         The spatial grid of x-coordinates (e.g., axial or horizontal positions) for the simulation.
+    max_cached_pyramids : int
+        Number of raster pyramids kept by `plot_field(raster=True)`, the least recently used being dropped first.
 
     Methods
     -------
@@ -73,19 +93,40 @@ class PostProcess:
     get_fields_stats(quantity: Optional[str] = None, axis: int = 0) -> Union[pd.DataFrame, dict[str, pd.DataFrame]]
         Retrieves statistical values (mean, standard deviation, variance) for each field along the specified axis (x or r).
 
+    extract_path(path: LinePath, fields: tuple[str, ...] = ('rans', 'pse', 'total'), quantities: Optional[list[str]] = None,
+                 ts: Optional[Union[int, float, list]] = None) -> dict[str, dict[str, np.ndarray]]
+        Returns the values of the requested fields and quantities along an arbitrary path.
+
+    get_total_in_window(name_value: Optional[str] = None) -> tuple
+        Returns the total field in the domain of the `window` attribute.
+
+    get_window_stats(name_value: Optional[str] = None) -> Union[pd.Series, dict[str, pd.Series]]
+        Returns the statistics of the total field in the domain of the `window` attribute.
+
+    get_memory_report(include_derived: bool = True) -> MemoryReport
+        Returns the resident footprint of the loaded and derived fields, with their duplicate copies.
+
     plot_alpha()
         Displays the real and imaginary parts of the growth rate (alpha) for stability analysis.
 
     plot_field(field: str, name_value: str, x_min: Union[int, float] = 0, x_max: Union[int, float] = 10,
-               r_min: Union[int, float] = 0, r_max: Union[int, float] = 5)
+               r_min: Union[int, float] = 0, r_max: Union[int, float] = 5, show: bool = True, raster: bool = False)
         Plots a filled contour of the specified field quantity in a subfield (ranging in x and r).
 
-    plot_line(name_value: str, field: str, x_idx: int)
+    plot_line(name_value: str, field: str, x_idx: int, show: bool = True)
         Plots a line of a specific quantity at a given x-index for a selected field.
 
+    plot_panels(panels: list[tuple], ncols: int = 2, x_min: Union[int, float] = 0, x_max: Union[int, float] = 10,
+                r_min: Union[int, float] = 0, r_max: Union[int, float] = 5, share_colorbar: bool = True,
+                show: bool = True)
+        Plots several fields, quantities and x stations in a grid of subplots, computing each field only once.
+
     get_value_in_field(value, x_min=0, x_max=10, r_min=0, r_max=3)
         Returns the specified field values within the desired x and r domain.
 
+    get_window(x_min=0, x_max=10, r_min=0, r_max=3)
+        Returns the slices of the x and r grids corresponding to the desired domain.
+
     __get_title(field: str, name_value: str) -> str
         Generates the title for a given field and quantity name for plotting purposes.
 
@@ -107,6 +148,10 @@ class PostProcess:
     - It includes functions for both numerical and visual analysis of the data (such as plotting stability growth rates).
     """
 
+    # Number of raster pyramids kept by `plot_field`, e.g. the total fields of the last phases of a sweep
+    max_cached_pyramids = 8
+
+    @traced('PostProcess.init')
     def __init__(self, St: Union[int, float], ID_MACH: int, t: Union[int, float] = 0, epsilon: Union[int, float] = 0.01,
                  verbose: bool = False) -> None:
         """
@@ -131,15 +176,113 @@ class PostProcess:
         self.verbose = verbose
         self.St = St
         self.ID_MACH = ID_MACH
-        self.epsilon = epsilon
-        self.t = t
-        self.perturbation_field = PerturbationField(St, ID_MACH)
+        # Shared read-only with the other PostProcess objects of the case, see `get_field_registry`
+        self.perturbation_field = get_field_registry().get_perturbation_field(St, ID_MACH)
         self.x_grid = self.perturbation_field.x_grid
         self.r_grid = get_r_grid()
+        # Raster pyramids of the plotted fields, the least recently used dropped beyond `max_cached_pyramids`
+        self.__pyramids = OrderedDict()
+        self.graph = self.__build_graph()
+        self.t = t
+        self.epsilon = epsilon
 
         if verbose:
             self.__verbose()
 
+    @property
+    def t(self) -> Union[int, float]:
+        return self.graph.get('t')
+
+    @t.setter
+    def t(self, t: Union[int, float]) -> None:
+        if not isinstance(t, (int, float)) or not (0 <= t <= 100):
+            raise ValueError("t should be a percentage between 0 and 100.")
+        self.graph.set('t', t)
+
+    @property
+    def epsilon(self) -> Union[int, float]:
+        return self.graph.get('epsilon')
+
+    @epsilon.setter
+    def epsilon(self, epsilon: Union[int, float]) -> None:
+        if not isinstance(epsilon, (int, float)) or epsilon < 0:
+            raise ValueError("epsilon should be a positive float or integer.")
+        self.graph.set('epsilon', epsilon)
+
+    @property
+    def window(self) -> tuple:
+        return self.graph.get('window')
+
+    @window.setter
+    def window(self, window: tuple) -> None:
+        if not isinstance(window, tuple) or len(window) != 4:
+            raise TypeError("window must be a tuple (x_min, x_max, r_min, r_max)")
+        self.__test_validity_input_field(*window)
+        self.graph.set('window', window)
+
+    def __build_graph(self) -> ComputeGraph:
+        """
+        Build the pipeline of the total field: each node is computed once and recomputed only when an input it
+        depends on (t, epsilon or window) changes.
+        """
+        perturbation_field = self.perturbation_field
+        quantities = PerturbationField.rans_quantities
+
+        graph = ComputeGraph()
+        graph.add_input('t', 0)
+        graph.add_input('epsilon', 0.01)
+        graph.add_input('window', (0, 10, 0, 3))
+        graph.add_node('converted_rans', perturbation_field.get_converted_rans_values)
+        graph.add_node('amplitude', lambda: PerturbationField.convert_to_rans_reference(
+            perturbation_field.compute_complex_amplitude(), self.ID_MACH))
+        graph.add_node('phase', lambda t: np.exp(-2j * np.pi * t / 100), ['t'])
+        graph.add_node('perturbation', lambda amplitude, phase: {quantity: np.real(amplitude[quantity] * phase)
+                                                                 for quantity in quantities},
+                       ['amplitude', 'phase'])
+        graph.add_node('total', lambda rans_values, perturbation, epsilon: PerturbationField.convert_to_rans_reference(
+            {quantity: rans_values[quantity] + epsilon * perturbation[quantity] for quantity in quantities},
+            self.ID_MACH), ['converted_rans', 'perturbation', 'epsilon'])
+        graph.add_node('window_slices', lambda window: self.get_window(*window), ['window'])
+        graph.add_node('total_window', lambda total, slices: {quantity: value.iloc[slices]
+                                                              for quantity, value in total.items()},
+                       ['total', 'window_slices'])
+        graph.add_node('window_stats', lambda total_window: {quantity: value.stack().describe()
+                                                             for quantity, value in total_window.items()},
+                       ['total_window'])
+        return graph
+
+    def get_total_in_window(self, name_value: Optional[str] = None) -> tuple:
+        """
+        Return the total field in the domain of the `window` attribute.
+
+        Parameters
+        ----------
+        name_value: str, optional
+            The quantity to return. If None, all the quantities are returned.
+
+        Returns
+        -------
+        tuple
+            The x and r grids of the window and the values, a DataFrame or a dict of DataFrames.
+        """
+        x_slice, r_slice = self.graph.get('window_slices')
+        total_window = self.graph.get('total_window')
+        if name_value is not None and name_value not in total_window:
+            raise ValueError(f"quantity not valid - choose among {PerturbationField.rans_quantities}")
+        return (self.x_grid[x_slice], self.r_grid[r_slice],
+                total_window if name_value is None else total_window[name_value])
+
+    def get_window_stats(self, name_value: Optional[str] = None) -> Union[pd.Series, dict[str, pd.Series]]:
+        """
+        Return the statistics (count, mean, std, min, quartiles, max) of the total field in the domain of the
+        `window` attribute, for one quantity or all of them.
+        """
+        stats = self.graph.get('window_stats')
+        if name_value is not None and name_value not in stats:
+            raise ValueError(f"quantity not valid - choose among {PerturbationField.rans_quantities}")
+        return stats if name_value is None else stats[name_value]
+
+    @traced('PostProcess.get_fields_stats')
     def get_fields_stats(self, quantity: Optional[str] = None, axis: int = 0) -> Union[
         pd.DataFrame, dict[str, pd.DataFrame]]:
         """
@@ -167,17 +310,97 @@ class PostProcess:
         if axis not in (0, 1):
             raise ValueError("Axis must be 0 or 1")
 
-        stats_dict = {}
+        # The statistics are keyed by the content of the interpolated RANS values in the derived-product cache
         rans_values = self.perturbation_field.rans_values
+        quantities = [quantity] if quantity else PerturbationField.rans_quantities
+        stats_dict = cached_product('rans_stats', lambda: {quantity: rans_values[quantity] for quantity in quantities},
+                                    lambda: {quantity: rans_values[quantity].describe() for quantity in quantities},
+                                    (PostProcess.get_fields_stats,))
         if quantity:
-            return pd.DataFrame(rans_values[quantity].describe())
-        else:
-            for quantity in PerturbationField.rans_quantities:
-                stats = rans_values[quantity].describe()
-                stats_dict[quantity] = stats
+            return pd.DataFrame(stats_dict[quantity])
 
         return stats_dict
 
+    @traced('PostProcess.extract_path')
+    def extract_path(self, path: LinePath, fields: tuple[str, ...] = ('rans', 'pse', 'total'),
+                     quantities: Optional[list[str]] = None,
+                     ts: Optional[Union[int, float, list]] = None) -> dict[str, dict[str, np.ndarray]]:
+        """
+        Return the values of the requested fields along a path (lipline, centreline, ray, polyline...).
+
+        Parameters
+        ----------
+        path: LinePath
+            The path along which the fields are evaluated.
+        fields: tuple of str, optional
+            Fields to extract among 'rans', 'pse' (complex amplitude of the perturbation) and 'total'.
+        quantities: list of str, optional
+            Quantities to extract, among `PATH_QUANTITIES` of every field (see `src.Field.path_extraction`): for 'pse',
+            the complex amplitude (e.g. 'ux') or the stored PSE quantities (e.g. 'abs(ux)'). Default is
+            `PerturbationField.rans_quantities`.
+        ts: int, float or list, optional
+            Percentage(s) of the period used for the total field. Default is the `t` attribute.
+
+        Returns
+        -------
+        dict[str, dict[str, np.ndarray]]
+            For each field and quantity, an array of shape (n_points,) for 'rans' and 'pse' and (n_t, n_points)
+            for 'total'.
+
+        Raises
+        ------
+        ValueError
+            If a field or a quantity of a field is not available.
+        """
+        quantities = PerturbationField.rans_quantities if quantities is None else quantities
+        ts = self.t if ts is None else ts
+        check_path_quantities(fields, quantities)
+        extractor = PathExtractor(path, self.x_grid, self.r_grid)
+
+        extracted = {}
+        for field in fields:
+            match field:
+                case 'rans':
+                    values = {quantity: self.perturbation_field.rans_values[quantity] for quantity in quantities}
+                case 'pse':
+                    amplitude = self.perturbation_field.compute_complex_amplitude()
+                    values = {quantity: amplitude[quantity] if quantity in amplitude
+                              else self.perturbation_field.values[quantity] for quantity in quantities}
+                case 'total':
+                    total_fields = self.perturbation_field.compute_total_fields(ts, self.epsilon)
+                    values = {quantity: total_fields[quantity] for quantity in quantities}
+            extracted[field] = {quantity: extractor(value) for quantity, value in values.items()}
+
+        return extracted
+
+    def get_memory_report(self, include_derived: bool = True) -> MemoryReport:
+        """
+        Return the resident footprint of the fields held by the object: raw perturbation frames, interpolated RANS
+        values and raster pyramids, and optionally the derived fields computed on demand (RANS values converted to
+        the RANS reference, complex amplitude and total field).
+
+        Parameters
+        ----------
+        include_derived: bool, optional
+            If True, the derived fields are computed to measure them. Default is True.
+
+        Returns
+        -------
+        MemoryReport
+            Size of every object and groups of buffers holding identical data.
+        """
+        objects = {
+            'raw perturbation': self.perturbation_field.values,
+            'interpolated RANS': self.perturbation_field.rans_values,
+            'raster pyramids': {' '.join(map(str, key)): pyramid.levels for key, pyramid in self.__pyramids.items()},
+        }
+        if include_derived:
+            objects['converted RANS'] = self.graph.get('converted_rans')
+            objects['complex amplitude'] = self.graph.get('amplitude')
+            objects['total field'] = self.graph.get('total')
+
+        return get_memory_report(objects)
+
     def plot_alpha(self):
         """
         Display the values of alpha according to x, showing the real and imaginary parts of the growth rate.
@@ -193,8 +416,10 @@ class PostProcess:
         fig.tight_layout()
         plt.show()
 
+    @traced('PostProcess.plot_field')
     def plot_field(self, field: str, name_value: str, x_min: Union[int, float] = 0, x_max: Union[int, float] = 10,
-                   r_min: Union[int, float] = 0, r_max: Union[int, float] = 5):
+                   r_min: Union[int, float] = 0, r_max: Union[int, float] = 5, show: bool = True,
+                   raster: bool = False):
         """
         Plot the contour line (filled) of the desired quantity in a subfield.
 
@@ -212,18 +437,43 @@ class PostProcess:
             Minimum value of r for the plot. Default is 0.
         r_max: int or float, optional
             Maximum value of r for the plot. Default is 5.
+        show: bool, optional
+            If True, the figure is displayed. Default is True.
+        raster: bool, optional
+            If True, the field is drawn as an image taken from a multi-resolution pyramid of the field, at the
+            resolution of the figure, instead of a filled contour. The pyramid is built on the first call and reused
+            for every other window of the same field (the last `max_cached_pyramids` fields are kept). Default is
+            False.
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+            The figure of the plot.
         """
         if field not in ["rans", "pse", "total"]:
             raise ValueError("field must be a string in ['rans', 'pse', 'total']")
 
         self.__test_validity_input_field(x_min, x_max, r_min, r_max)
-        value = self.__get_field(name_value, field)
-
-        x, r, value_sub = self.get_value_in_field(value, x_min=x_min, x_max=x_max, r_min=r_min, r_max=r_max)
         plt.style.use("ggplot")
         fig, ax = plt.subplots(figsize=RANS_FIGSIZE, layout="constrained")
 
-        cs = ax.contourf(x, r, value_sub.transpose(), levels=100, cmap="jet")
+        if raster:
+            key = (field, name_value, self.t, self.epsilon) if field == 'total' else (field, name_value)
+            if key in self.__pyramids:
+                self.__pyramids.move_to_end(key)
+            else:
+                value = self.__get_field(name_value, field)
+                self.__pyramids[key] = FieldPyramid(self.x_grid, self.r_grid, value.to_numpy())
+                while len(self.__pyramids) > self.max_cached_pyramids:
+                    self.__pyramids.popitem(last=False)
+            with span('matplotlib.imshow'):
+                cs = draw_raster(ax, self.__pyramids[key], x_min, x_max, r_min, r_max, cmap="jet")
+            value = self.__pyramids[key].levels[0]
+        else:
+            value = self.__get_field(name_value, field)
+            x, r, value_sub = self.get_value_in_field(value, x_min=x_min, x_max=x_max, r_min=r_min, r_max=r_max)
+            with span('matplotlib.contourf'):
+                cs = ax.contourf(x, r, value_sub.transpose(), levels=100, cmap="jet")
 
         plt.xlabel("x/D")
         plt.ylabel("r/D")
@@ -236,9 +486,12 @@ class PostProcess:
         cbar.locator = tick_locator
         cbar.set_ticks(ticks=tick_locator, vmin=value.min(), vmax=value.max())
         cbar.update_ticks()
-        plt.show()
+        if show:
+            plt.show()
+        return fig
 
-    def plot_line(self, field: str, name_value: str, x_idxs: [int, list[int]]):
+    @traced('PostProcess.plot_line')
+    def plot_line(self, field: str, name_value: str, x_idxs: [int, list[int]], show: bool = True):
         """
         Plot the line of a specific quantity at a given x index.
 
@@ -250,6 +503,13 @@ class PostProcess:
             The specific quantity to plot within the field.
         x_idx: int or list[int]
             The index of the x-coordinate at which to plot the field data.
+        show: bool, optional
+            If True, the figure is displayed. Default is True.
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+            The figure of the plot.
         """
 
         if field not in ["rans", "pse", "total"]:
@@ -261,19 +521,118 @@ class PostProcess:
 
         fig, ax = plt.subplots(figsize=DEFAULT_FIGSIZE, layout="constrained")
 
+        value = self.__get_field(name_value, field)
         for x_idx in x_idxs:
 
             if not isinstance(x_idx, int) or not (0 <= x_idx < len(self.x_grid)):
                 raise TypeError(f"x_idx must be an integer in [0, {len(self.x_grid) - 1}]")
 
-            value = self.__get_field(name_value, field)
             ax.plot(self.r_grid, value.iloc[x_idx, :],
                     label=rf"$x_{{{x_idx}}} = {self.x_grid[x_idx]}$", linestyle='-',
                     )
         ax.grid(True)
 
         plt.legend()
-        plt.show()
+        if show:
+            plt.show()
+        return fig
+
+    @traced('PostProcess.plot_panels')
+    def plot_panels(self, panels: list[tuple], ncols: int = 2, x_min: Union[int, float] = 0,
+                    x_max: Union[int, float] = 10, r_min: Union[int, float] = 0, r_max: Union[int, float] = 5,
+                    share_colorbar: bool = True, show: bool = True):
+        """
+        Plot several quantities, fields and x stations in a grid of subplots. Each field is computed once for the
+        whole figure and only the data inside the plotted window is given to matplotlib.
+
+        Parameters
+        ----------
+        panels: list of tuple
+            One tuple per subplot. `(field, name_value)` draws the filled contour of the quantity, as `plot_field`,
+            and `(field, name_value, x_idxs)` draws the radial lines at the given x indices, as `plot_line`.
+        ncols: int, optional
+            Number of columns of the subplot grid. Default is 2.
+        x_min: int or float, optional
+            Minimum value of x for the contour panels. Default is 0.
+        x_max: int or float, optional
+            Maximum value of x for the contour panels. Default is 10.
+        r_min: int or float, optional
+            Minimum value of r for all the panels. Default is 0.
+        r_max: int or float, optional
+            Maximum value of r for all the panels. Default is 5.
+        share_colorbar: bool, optional
+            If True, contour panels displaying the same field and quantity share their colour levels and colorbar.
+        show: bool, optional
+            If True, the figure is displayed. Default is True.
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+            The figure containing all the panels.
+        """
+        if not isinstance(ncols, int) or ncols <= 0:
+            raise ValueError("ncols must be a positive integer")
+        for panel in panels:
+            if not isinstance(panel, tuple) or len(panel) not in (2, 3):
+                raise TypeError("each panel must be a tuple (field, name_value) or (field, name_value, x_idxs)")
+            if panel[0] not in ["rans", "pse", "total"]:
+                raise ValueError("field must be a string in ['rans', 'pse', 'total']")
+
+        x_slice, r_slice = self.get_window(x_min=x_min, x_max=x_max, r_min=r_min, r_max=r_max)
+        x_sub = self.x_grid[x_slice]
+        r_sub = self.r_grid[r_slice]
+
+        windows = {}
+        for panel in panels:
+            field, name_value = panel[:2]
+            if len(panel) == 2 and (field, name_value) not in windows:
+                value = self.__get_field(name_value, field).to_numpy()
+                windows[(field, name_value)] = value[x_slice, r_slice].T
+
+        levels = {key: get_contour_levels(window) for key, window in windows.items()}
+
+        nrows = -(-len(panels) // ncols)
+        plt.style.use("ggplot")
+        fig, axes = plt.subplots(nrows, ncols, figsize=(RANS_FIGSIZE[0] * ncols, RANS_FIGSIZE[1] * nrows),
+                                 layout="constrained", squeeze=False)
+        axes = axes.ravel()
+        for ax in axes[len(panels):]:
+            ax.set_visible(False)
+
+        contours = {}
+        for ax, panel in zip(axes, panels):
+            field, name_value = panel[:2]
+            ax.set_title(self.__get_title(field, name_value))
+            if len(panel) == 2:
+                key = (field, name_value)
+                with span('matplotlib.contourf'):
+                    cs = ax.contourf(x_sub, r_sub, windows[key], levels=levels[key] if share_colorbar else 100,
+                                     cmap="jet")
+                ax.set_xlabel("x/D")
+                ax.set_ylabel("r/D")
+                ax.xaxis.set_major_locator(ticker.MultipleLocator(1))
+                ax.yaxis.set_major_locator(ticker.MultipleLocator(1))
+                contours.setdefault(key if share_colorbar else id(ax), []).append((ax, cs))
+            else:
+                x_idxs = [panel[2]] if isinstance(panel[2], int) else panel[2]
+                value = self.__get_field(name_value, field).to_numpy()
+                for x_idx in x_idxs:
+                    if not isinstance(x_idx, int) or not (0 <= x_idx < len(self.x_grid)):
+                        raise TypeError(f"x_idx must be an integer in [0, {len(self.x_grid) - 1}]")
+                    ax.plot(r_sub, value[x_idx, r_slice],
+                            label=rf"$x_{{{x_idx}}} = {self.x_grid[x_idx]}$", linestyle='-')
+                ax.set_xlabel("r/D")
+                ax.grid(True)
+                ax.legend()
+
+        for group in contours.values():
+            cbar = fig.colorbar(group[0][1], ax=[ax for ax, _ in group])
+            cbar.locator = ticker.MaxNLocator(nbins=5)
+            cbar.update_ticks()
+
+        if show:
+            plt.show()
+        return fig
 
     def get_value_in_field(self, value, x_min=0, x_max=10, r_min=0, r_max=3):
         """
@@ -297,38 +656,43 @@ class PostProcess:
         tuple
             The extracted x, r, and field values as numpy arrays.
         """
+        x_slice, r_slice = self.get_window(x_min=x_min, x_max=x_max, r_min=r_min, r_max=r_max)
+        x_sub = self.x_grid[x_slice]
+        r_sub = self.r_grid[r_slice]
+
+        value_sub = value.iloc[x_slice, r_slice]
+        return x_sub, r_sub, value_sub
+
+    def get_window(self, x_min=0, x_max=10, r_min=0, r_max=3) -> tuple[slice, slice]:
+        """
+        Return the slices of the x and r grids corresponding to the desired domain.
+
+        Parameters
+        ----------
+        x_min: int or float, optional
+            Minimum value of x. Default is 0.
+        x_max: int or float, optional
+            Maximum value of x. Default is 10.
+        r_min: int or float, optional
+            Minimum value of r. Default is 0.
+        r_max: int or float, optional
+            Maximum value of r. Default is 3.
+
+        Returns
+        -------
+        tuple[slice, slice]
+            The slices along the x and r axes, usable on any array of shape (..., nx, nr).
+        """
         self.__test_validity_input_field(x_min, x_max, r_min, r_max)
 
         x_min_idx, x_max_idx, r_min_idx, r_max_idx = self.__get_index(x_min, x_max, r_min, r_max)
-        x_sub = self.x_grid[x_min_idx: x_max_idx]
-        r_sub = self.r_grid[r_min_idx: r_max_idx]
-
-        value_sub = value.iloc[x_min_idx: x_max_idx, r_min_idx: r_max_idx]
-        return x_sub, r_sub, value_sub
+        return slice(x_min_idx, x_max_idx), slice(r_min_idx, r_max_idx)
 
     def __get_title(self, field: str, name_value: str) -> str:
         """
         Get the formatted title for a specific field and value name.
         """
-        titles = {
-            'total': {
-                'ux': r"$\tilde{U}_x$", 'ur': r"$\tilde{U}_r$", 'ut': r"$\tilde{U}_\theta$",
-                'rho': r"$\tilde{\rho}$", 'p': r"$\tilde{p}$", 'T': r"$\tilde{T}$"
-            },
-            'rans': {
-                'ux': r"$U_x$", 'ur': r"$U_r$", 'ut': r"$U_\theta$", 'rho': r"$\rho$",
-                'p': r"$p$", 'T': r"$T$"
-            },
-            'pse': {
-                'Re(ux)': r"$\Re(u_x')$", 'Im(ux)': r"$\Im(u_x')$", 'abs(ux)': r"$|u_x'|$",
-                'Re(ur)': r"$\Re(u_r')$", 'Im(ur)': r"$\Im(u_r')$", 'abs(ur)': r"$|u_r'|$",
-                'Re(ut)': r"$\Re(u_\theta')$", 'Im(ut)': r"$\Im(u_\theta')$", 'abs(ut)': r"$|u_\theta'|$",
-                'Re(rho)': r"$\Re(\rho')$", 'Im(rho)': r"$\Im(\rho')$", 'abs(rho)': r"$|\rho'|$",
-                'Re(p)': r"$\Re(p')$", 'Im(p)': r"$\Im(p')$", 'abs(p)': r"$|p'|$",
-                'Re(T)': r"$\Re(T')$", 'Im(T)': r"$\Im(T')$", 'abs(T)': r"$|T'|$"
-            }
-        }
-        return titles[field][name_value]
+        return FIELD_TITLES[field][name_value]
 
     def __test_validity_input_field(self, x_min, x_max, r_min, r_max):
         """
@@ -376,6 +740,7 @@ class PostProcess:
         if r_min > max_of_r:
             raise ValueError(f"r_max must be greater than or equal to {max_of_r}")
 
+    @traced('PostProcess.get_field')
     def __get_field(self, name_value, field):
         """
         Return the value depending on the field selected in the plot methods.
@@ -385,7 +750,7 @@ class PostProcess:
         name_value: str
             The specific quantity within the field.
         field: str
-            The field type ('total', 'rans', 'pse').
+            The field type ('total', 'rans', 'pse'). The total field is taken from the memoized pipeline.
 
         Returns
         -------
@@ -396,7 +761,7 @@ class PostProcess:
             case "total":
                 if name_value not in PerturbationField.rans_quantities:
                     raise ValueError("quantity not valid - choose among", PerturbationField.rans_quantities)
-                value = self.perturbation_field.compute_total_field(self.t, self.epsilon)[name_value]
+                value = self.graph.get('total')[name_value]
             case 'rans':
                 if name_value not in RansField.quantities:
                     raise ValueError("quantity not valid - choose among", RansField.quantities)
@@ -0,0 +1,140 @@
+"""
+Background prefetching of the cases of a sweep: while the caller works on a case, the next ones are read and
+interpolated by a thread or a process pool, so that the wall-clock time of a sweep approaches its compute time.
+
+Examples
+--------
+>>> plan = [(0.4, ID_MACH) for ID_MACH in range(1, 11)]
+>>> with CasePrefetcher(plan, depth=2) as prefetcher:
+...     for post_process in prefetcher:
+...         post_process.plot_field('total', 'ux', show=False)
+>>> prefetcher.wait_time
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, Optional, Union
+
+from src.Field.field_registry import get_field_registry
+from src.Field.perturbation_field import PerturbationField
+from src.Field.post_process import PostProcess
+
+
+class CasePrefetcher:
+    """
+    Iterator over the PostProcess objects of an iteration plan, loading the next cases in the background.
+
+    The loaded PerturbationFields are added to the field registry, from which the PostProcess objects take them.
+    At most `depth` cases are loaded ahead of the current one, and fewer if they would exceed `max_bytes`.
+
+    Attributes
+    ----------
+    plan : list[tuple[float, int]]
+        The (St, ID_MACH) pairs, in the order of the iteration.
+    depth : int
+        Maximum number of cases loaded ahead of the current one.
+    max_bytes : int or None
+        Maximum memory of the cases loaded ahead, estimated from the size of the previous cases.
+    wait_time : float
+        Time in seconds spent by the caller waiting for a case to be loaded.
+
+    Methods
+    -------
+    close()
+        Cancels the pending loads and stops the workers.
+    """
+
+    def __init__(self, plan: list[tuple[Union[int, float], int]], depth: int = 2, executor: str = 'thread',
+                 max_bytes: Optional[int] = None, **post_process_kwargs) -> None:
+        """
+        Parameters
+        ----------
+        plan: list of tuple
+            The (St, ID_MACH) pairs to iterate over.
+        depth: int, optional
+            Maximum number of cases loaded ahead of the current one. Default is 2.
+        executor: str, optional
+            'thread' loads the cases in a background thread of the process, 'process' in a pool of `depth` processes
+            (the parsing and the interpolation then run in parallel with the caller). Default is 'thread'.
+        max_bytes: int, optional
+            Maximum memory of the cases loaded ahead. Default is no limit other than `depth`.
+        post_process_kwargs:
+            Keyword arguments of the PostProcess objects (t, epsilon, verbose).
+        """
+        if not isinstance(depth, int) or depth <= 0:
+            raise ValueError("depth must be a positive integer")
+        if executor not in ('thread', 'process'):
+            raise ValueError("executor must be 'thread' or 'process'")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        self.plan = list(plan)
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.wait_time = 0.0
+        self.__post_process_kwargs = post_process_kwargs
+        self.__executor_type = executor
+        self.__executor = None
+        self.__case_bytes = 0
+
+    def __iter__(self) -> Iterator[PostProcess]:
+        registry = get_field_registry()
+        if self.__executor_type == 'thread':
+            self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        else:
+            self.__executor = ProcessPoolExecutor(max_workers=self.depth)
+
+        pending: deque[tuple[float, int, Future]] = deque()
+        remaining = iter(self.plan)
+        try:
+            self.__fill(pending, remaining)
+            while pending:
+                St, ID_MACH, future = pending.popleft()
+                start = time.perf_counter()
+                perturbation_field = future.result()
+                self.wait_time += time.perf_counter() - start
+                if self.__executor_type == 'process':
+                    registry.add_perturbation_field(perturbation_field)
+                self.__case_bytes = max(self.__case_bytes,
+                                        registry.get_stats()['entries'].get(('perturbation', St, ID_MACH), 0))
+
+                post_process = PostProcess(St, ID_MACH, **self.__post_process_kwargs)
+                # The next loads start before the caller works on this case
+                self.__fill(pending, remaining)
+                yield post_process
+        finally:
+            self.close()
+
+    def __enter__(self) -> CasePrefetcher:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Cancel the pending loads and stop the workers.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+            self.__executor = None
+
+    def __fill(self, pending: deque, remaining: Iterator) -> None:
+        """
+        Submit the loads of the next cases, up to `depth` cases and `max_bytes` ahead.
+        """
+        depth = self.depth
+        if self.max_bytes is not None and self.__case_bytes:
+            depth = max(1, min(depth, self.max_bytes // self.__case_bytes))
+        while len(pending) < depth:
+            try:
+                St, ID_MACH = next(remaining)
+            except StopIteration:
+                return
+            if self.__executor_type == 'thread':
+                future = self.__executor.submit(get_field_registry().get_perturbation_field, St, ID_MACH)
+            else:
+                future = self.__executor.submit(PerturbationField, St, ID_MACH)
+            pending.append((St, ID_MACH, future))
@@ -1,9 +1,12 @@
-import pandas as pd
-from scipy.io import loadmat
+from __future__ import annotations
 
-from ReadData.read_info import get_reference_values
-from toolbox.path_directories import CASE_NUMBER, DIR_MEAN, RANS_FILES
-from toolbox.dimless_reference_values import gamma, rho_0, c_0, T_0, p_0
+from src.Field.conversion import convert_fields
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.path_directories import DIR_MEAN, get_case_number, get_rans_files
+from src.toolbox.tracing import record_bytes_read, traced
+
+pd = LazyModule('pandas')
+scipy_io = LazyModule('scipy.io')
 
 
 class RansField:
@@ -21,6 +24,8 @@ class RansField:
         Dictionary where each key is a quantity name and each value is a DataFrame of RANS field data.
     x : np.ndarray
         Array of x-coordinates used in the RANS field data for spatial referencing.
+    r : np.ndarray
+        Array of r-coordinates of the RANS field data.
 
     Methods
     -------
@@ -50,13 +55,15 @@ class RansField:
         """
         self.values = None
         self.x = None
-        if not isinstance(ID_MACH, int) or ID_MACH <= 0 or ID_MACH > CASE_NUMBER:
-            raise TypeError(f'ID_MACH must be a positive integer comprised between 0 and {CASE_NUMBER}')
+        self.r = None
+        if not isinstance(ID_MACH, int) or ID_MACH <= 0 or ID_MACH > get_case_number():
+            raise TypeError(f'ID_MACH must be a positive integer comprised between 0 and {get_case_number()}')
 
         self.ID_MACH = ID_MACH
         self.__get_rans_values()
 
     @staticmethod
+    @traced('RansField.convert_to_pse_ref')
     def convert_to_pse_ref(dimless_field: dict[str, pd.DataFrame], ID_MACH: int) -> dict[str, pd.DataFrame]:
         """
         Converts dimensionless RANS field values to the stability reference.
@@ -69,41 +76,20 @@ class RansField:
         Returns
         -------
         dict of str : pd.DataFrame
-            Dictionary with dimensionless RANS field values in the stability reference for each field except 'x' and 'r'.
+            Dictionary with dimensionless RANS field values in the stability reference for each field except 'x', 'r'
+            and 'T', which has no stability reference.
 
         Notes
         -----
-        The method applies different conversion factors to each field:
-        - 'ux', 'ur', 'ut' are scaled by the speed of sound `c_0`.
-        - 'T' is scaled by a factor based on the adiabatic constant `gamma` and reference temperature `T_0`.
-        - 'p' is scaled by a factor involving `gamma` and reference pressure `p_0`.
-        - 'rho' is scaled by the reference density `rho_0`.
-
-        Warnings
-        --------
-        If a field in `quantities` is missing from `dimless_field`, a warning is printed and it is skipped.
+        The conversion goes through the factor table of `conversion.get_conversion_table`:
+        - 'ux', 'ur', 'ut' are scaled by `c_0 / ux_ref`.
+        - 'p' is scaled by `gamma * p_0 / (rho_ref * ux_ref ** 2)`.
+        - 'rho' is scaled by `rho_0 / rho_ref`.
         """
-
-        ref_values = get_reference_values(ID_MACH)
-        scaling_factors = {
-            'ux': ref_values['ux'],
-            'ur': ref_values['ux'],
-            'ut': ref_values['ux'],
-            'p': ref_values['rho'] * (ref_values['ux'] ** 2),
-            'rho': ref_values['rho']
-        }
-        dim_field = RansField.dimensionalized(dimless_field)
-        rans_pse = {}
-
-        for field, scale in scaling_factors.items():
-            if field in dim_field:
-                rans_pse[field] = dim_field[field] / scale
-            else:
-                print(f"Warning: '{field}' is missing in dimless_field, skipping dimensionalization.")
-
-        return rans_pse
+        return convert_fields(dimless_field, 'dimensionless', 'pse', ID_MACH)
 
     @staticmethod
+    @traced('RansField.dimensionalized')
     def dimensionalized(dimless_field: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
         """
         Converts dimensionless RANS field values to dimensional values based on known reference values.
@@ -120,35 +106,15 @@ class RansField:
 
         Notes
         -----
-        The method applies different conversion factors to each field:
+        The conversion goes through the factor table of `conversion.get_conversion_table`:
         - 'ux', 'ur', 'ut' are scaled by the speed of sound `c_0`.
         - 'T' is scaled by a factor based on the adiabatic constant `gamma` and reference temperature `T_0`.
         - 'p' is scaled by a factor involving `gamma` and reference pressure `p_0`.
         - 'rho' is scaled by the reference density `rho_0`.
-
-        Warnings
-        --------
-        If a field in `quantities` is missing from `dimless_field`, a warning is printed and it is skipped.
         """
-        conversion_factors = {
-            'ux': c_0,
-            'ur': c_0,
-            'ut': c_0,
-            'T': (gamma - 1) * T_0,
-            'p': gamma * p_0,
-            'rho': rho_0
-        }
-
-        rans_dim = {}
-
-        for field, factor in conversion_factors.items():
-            if field in dimless_field:
-                rans_dim[field] = dimless_field[field] * factor
-            else:
-                print(f"Warning: '{field}' is missing in dimless_field, skipping dimensionalization.")
-
-        return rans_dim
+        return convert_fields(dimless_field, 'dimensionless', 'dimensional')
 
+    @traced('RansField.load')
     def __get_rans_values(self) -> None:
         """
         Loads the RANS field data from a .mat file for the specified Mach case ID.
@@ -167,13 +133,15 @@ class RansField:
         correspond to the field quantities specified in `quantities`.
         """
 
-        rans_file = DIR_MEAN / RANS_FILES[self.ID_MACH]
+        rans_file = DIR_MEAN / get_rans_files()[self.ID_MACH]
         if rans_file.exists():
-            rans_field_array = loadmat(rans_file)['arr']
+            rans_field_array = scipy_io.loadmat(rans_file)['arr']
+            record_bytes_read(rans_file)
         else:
             raise ValueError('mat file not found - The case you have entered might not be available')
 
         nx, nr, nvalues = rans_field_array.shape  # 536, 69, 8
         self.x = rans_field_array[:, 0, 0]
+        self.r = rans_field_array[0, :, 1]
         self.values = {name: pd.DataFrame(rans_field_array[:, :, i + 2], index=range(nx), columns=range(nr))
                        for i, name in enumerate(self.quantities)}
@@ -0,0 +1,263 @@
+"""
+Regridding between two sets of (x, r) points that are not aligned (e.g. RANS and PSE grids with different r
+distributions, or datasets of mixed resolution).
+
+The interpolation is linear in the values, so it is stored as a sparse matrix of weights W (n_target, n_source):
+the Delaunay triangulation, the neighbour searches and the weights are computed once per pair of grids and cached
+by the hash of the grids, then every quantity and every case on the same grids is regridded with one sparse matrix
+product W @ values.
+
+- 'linear': barycentric weights in the Delaunay triangle containing the target point (3 weights per point);
+- 'quadratic', 'cubic': local least-squares polynomial of degree 2 or 3, fitted on the vertices of the containing
+  triangle and their first (quadratic) or first two (cubic) rings of neighbours, evaluated at the target point.
+
+Examples
+--------
+>>> regridder = get_regridder(rans_field.x, rans_field.r, x_grid, r_grid, method='linear')
+>>> values = regridder(np.stack([rans_field.values[quantity].to_numpy() for quantity in RansField.quantities]))
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.tracing import span
+
+spatial = LazyModule('scipy.spatial')
+sparse = LazyModule('scipy.sparse')
+
+METHODS = ('linear', 'quadratic', 'cubic')
+
+_POLYNOMIAL_DEGREES = {'quadratic': 2, 'cubic': 3}
+
+
+class Regridder:
+    """
+    Sparse linear interpolation operator from a set of source points to a set of target points in the (x, r) plane.
+
+    Attributes
+    ----------
+    method : str
+        Interpolation method, among 'linear', 'quadratic' and 'cubic'.
+    weights : scipy.sparse.csr_matrix
+        Interpolation weights of shape (n_target, n_source).
+    source_shape : tuple
+        Shape of the source values, (nx, nr) for a structured grid or (n_source,).
+    target_shape : tuple
+        Shape of the target values, (nx, nr) for a structured grid or (n_target,).
+    outside : np.ndarray
+        Mask of the target points outside the convex hull of the source points, which take the value of the nearest
+        source point (or NaN if `fill` is 'nan').
+
+    Methods
+    -------
+    __call__(values: np.ndarray) -> np.ndarray
+        Regrids values of shape (..., *source_shape) to (..., *target_shape).
+    """
+
+    def __init__(self, source: np.ndarray, target: np.ndarray, method: str = 'linear', fill: str = 'nearest',
+                 source_shape: Optional[tuple] = None, target_shape: Optional[tuple] = None) -> None:
+        """
+        Parameters
+        ----------
+        source: np.ndarray
+            Source points of shape (n_source, 2).
+        target: np.ndarray
+            Target points of shape (n_target, 2).
+        method: str, optional
+            'linear', 'quadratic' or 'cubic'. Default is 'linear'.
+        fill: str, optional
+            Value of the target points outside the convex hull of the source points: 'nearest' source value or 'nan'.
+            Default is 'nearest'.
+        source_shape, target_shape: tuple, optional
+            Shapes of the values on the grids. Default is the number of points.
+        """
+        if method not in METHODS:
+            raise ValueError(f"method must be a string in {list(METHODS)}")
+        if fill not in ('nearest', 'nan'):
+            raise ValueError("fill must be 'nearest' or 'nan'")
+        source = np.asarray(source, dtype=float)
+        target = np.asarray(target, dtype=float)
+        if source.ndim != 2 or source.shape[1] != 2 or target.ndim != 2 or target.shape[1] != 2:
+            raise ValueError("source and target must be arrays of points of shape (n, 2)")
+
+        self.method = method
+        self.source_shape = (len(source),) if source_shape is None else tuple(source_shape)
+        self.target_shape = (len(target),) if target_shape is None else tuple(target_shape)
+        if np.prod(self.source_shape) != len(source) or np.prod(self.target_shape) != len(target):
+            raise ValueError("source_shape and target_shape must match the number of points")
+
+        source_key = _hash_points(source)
+        triangulation = _get_cached(('delaunay', source_key), lambda: spatial.Delaunay(source))
+        simplices = triangulation.find_simplex(target)
+        self.outside = simplices < 0
+
+        with span('Regridder.weights', method=method, n_source=len(source), n_target=len(target)):
+            if method == 'linear':
+                rows, columns, weights = _get_barycentric_weights(triangulation, simplices, target)
+            else:
+                rows, columns, weights = _get_polynomial_weights(triangulation, source, target, simplices,
+                                                                 _POLYNOMIAL_DEGREES[method])
+
+            # The points outside the hull take the nearest source value
+            outside = np.flatnonzero(self.outside)
+            if len(outside):
+                tree = _get_cached(('kdtree', source_key), lambda: spatial.cKDTree(source))
+                _, nearest = tree.query(target[outside])
+                rows = np.concatenate([rows, outside])
+                columns = np.concatenate([columns, nearest])
+                weights = np.concatenate([weights, np.full(len(outside), np.nan if fill == 'nan' else 1.0)])
+
+            self.weights = sparse.csr_matrix((weights, (rows, columns)), shape=(len(target), len(source)))
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        """
+        Regrid values of shape (..., *source_shape), e.g. all the quantities of a case stacked along the first
+        axis, in one sparse matrix product.
+
+        Returns
+        -------
+        np.ndarray
+            Values of shape (..., *target_shape).
+        """
+        values = np.asarray(values)
+        n_dims = len(self.source_shape)
+        if values.shape[values.ndim - n_dims:] != self.source_shape:
+            raise ValueError(f"values must be of shape (..., {', '.join(map(str, self.source_shape))})")
+
+        leading = values.shape[:values.ndim - n_dims]
+        flat = values.reshape(-1, self.weights.shape[1]).T
+        regridded = (self.weights @ flat).T
+        return regridded.reshape(leading + self.target_shape)
+
+
+def _get_barycentric_weights(triangulation, simplices: np.ndarray, target: np.ndarray):
+    """
+    Return the (rows, columns, weights) of the barycentric weights of the target points inside the triangulation.
+    """
+    inside = np.flatnonzero(simplices >= 0)
+    transform = triangulation.transform[simplices[inside]]
+    barycentric = np.einsum('ijk,ik->ij', transform[:, :2], target[inside] - transform[:, 2])
+    weights = np.column_stack([barycentric, 1 - barycentric.sum(axis=1)])
+    columns = triangulation.simplices[simplices[inside]]
+    return np.repeat(inside, 3), columns.ravel(), weights.ravel()
+
+
+def _get_polynomial_weights(triangulation, source: np.ndarray, target: np.ndarray, simplices: np.ndarray,
+                            degree: int):
+    """
+    Return the (rows, columns, weights) of a local least-squares polynomial fit of the given degree, centred on
+    every target point inside the triangulation. The fit uses the vertices of the triangle containing the point and
+    their neighbours in the triangulation (degree - 1 rings), which surround the point in every direction even on
+    strongly stretched grids. The value at the target point is the constant coefficient of the fit, a linear
+    combination of the neighbour values.
+    """
+    powers = [(i, total - i) for total in range(degree + 1) for i in range(total, -1, -1)]
+    indptr, indices = triangulation.vertex_neighbor_vertices
+
+    inside = np.flatnonzero(simplices >= 0)
+    neighbourhoods = {}
+    groups = {}
+    for row, simplex in zip(inside, simplices[inside]):
+        # The targets in the same triangle share the neighbourhood
+        if simplex not in neighbourhoods:
+            vertices = triangulation.simplices[simplex]
+            for _ in range(degree - 1):
+                vertices = np.unique(np.concatenate([vertices] + [indices[indptr[v]:indptr[v + 1]] for v in vertices]))
+            neighbourhoods[simplex] = vertices
+        groups.setdefault(len(neighbourhoods[simplex]), []).append((row, neighbourhoods[simplex]))
+
+    rows, columns, weights = [], [], []
+    # The fits of the neighbourhoods of the same size are solved together
+    for n_neighbours, group in groups.items():
+        group_rows = np.array([row for row, _ in group])
+        neighbours = np.array([vertices for _, vertices in group])
+        offsets = source[neighbours] - target[group_rows][:, None, :]
+        # The offsets are scaled by the neighbourhood size, axis by axis, for the conditioning of the fit
+        scale = np.abs(offsets).max(axis=1, keepdims=True)
+        offsets = offsets / np.where(scale > 0, scale, 1)
+        design = np.stack([offsets[..., 0] ** i * offsets[..., 1] ** j for i, j in powers], axis=-1)
+        rows.append(np.repeat(group_rows, n_neighbours))
+        columns.append(neighbours.ravel())
+        weights.append(np.linalg.pinv(design, rcond=1e-10)[:, 0, :].ravel())
+    if not rows:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+    return np.concatenate(rows), np.concatenate(columns), np.concatenate(weights)
+
+
+def _hash_points(points: np.ndarray) -> str:
+    points = np.ascontiguousarray(points, dtype=float)
+    return hashlib.sha256(f'{points.shape}'.encode() + points.data).hexdigest()
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_size = 32
+
+
+def _get_cached(key: tuple, build):
+    """
+    Return a cached triangulation, tree or regridder, building it on the first request. The least recently used
+    entries are dropped beyond `_cache_size` entries.
+    """
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = build()
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+    return value
+
+
+def get_regridder(source_x: np.ndarray, source_r: np.ndarray, target_x: np.ndarray, target_r: np.ndarray,
+                  method: str = 'linear', fill: str = 'nearest') -> Regridder:
+    """
+    Return the regridder between two structured (x, r) grids, cached by the hash of the grids so that the
+    triangulation and the weights are computed once for all the quantities and cases on the same grids.
+
+    Parameters
+    ----------
+    source_x, source_r: np.ndarray
+        Axes of the source grid (nx_source,) and (nr_source,), or the coordinates of every source node
+        (nx_source, nr_source) for a curvilinear grid.
+    target_x, target_r: np.ndarray
+        Axes of the target grid (nx_target,) and (nr_target,), or the coordinates of every target node.
+    method: str, optional
+        'linear', 'quadratic' or 'cubic'. Default is 'linear'.
+    fill: str, optional
+        Value outside the source grid: 'nearest' or 'nan'. Default is 'nearest'.
+
+    Returns
+    -------
+    Regridder
+        Regridder from values (..., nx_source, nr_source) to (..., nx_target, nr_target).
+    """
+    source, source_shape = _get_points(source_x, source_r)
+    target, target_shape = _get_points(target_x, target_r)
+    key = ('regridder', _hash_points(source), source_shape, _hash_points(target), target_shape, method, fill)
+    return _get_cached(key, lambda: Regridder(source, target, method, fill, source_shape, target_shape))
+
+
+def _get_points(x: np.ndarray, r: np.ndarray) -> tuple[np.ndarray, tuple]:
+    x, r = np.asarray(x, dtype=float), np.asarray(r, dtype=float)
+    if x.ndim == 1 and r.ndim == 1:
+        x, r = np.meshgrid(x, r, indexing='ij')
+    elif x.shape != r.shape or x.ndim != 2:
+        raise ValueError("x and r must be 1-D axes or 2-D coordinates of the same shape")
+    return np.column_stack([x.ravel(), r.ravel()]), x.shape
+
+
+def clear_cache() -> None:
+    """
+    Drop the cached triangulations and regridders.
+    """
+    with _cache_lock:
+        _cache.clear()
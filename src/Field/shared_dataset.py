@@ -0,0 +1,376 @@
+"""
+Shared-memory dataset for the multi-process sweeps. The parent process loads the cases once and copies their arrays
+(grids, interpolated RANS values, mean fields and complex PSE amplitudes in the RANS reference) into
+`multiprocessing.shared_memory` blocks; the workers attach to the blocks and get read-only NumPy views, without
+parsing, interpolation, pickling or copy.
+
+The parent owns the blocks: they are unlinked by `close()`, at the exit of the `with` block, at the exit of the
+interpreter, and, if the parent is killed, by the resource tracker of `multiprocessing`. `cleanup_stale_segments`
+removes the blocks left by a dead parent when even the resource tracker could not run.
+
+Examples
+--------
+>>> def task(St, ID_MACH, t):
+...     return get_attached_dataset()[St, ID_MACH].compute_total_fields([t], epsilon=0.01)['ux'].max()
+>>> with SharedDataset.create([(0.4, ID_MACH) for ID_MACH in range(1, 11)]) as dataset:
+...     with ProcessPoolExecutor(4, initializer=attach_dataset, initargs=(dataset.spec,)) as executor:
+...         maxima = list(executor.map(task, *zip(*[(0.4, 1, t) for t in range(0, 100, 5)])))
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import sys
+import threading
+import uuid
+import weakref
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from src.Field.field_registry import get_field_registry
+from src.Field.perturbation_field import PerturbationField
+from src.Field.rans_field import RansField
+from src.ReadData.read_info import get_reference_values
+from src.ReadData.read_radius import get_r_grid
+
+SEGMENT_PREFIX = 'jet_turbulent'
+
+_register_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SharedCaseSpec:
+    """
+    Description of the shared-memory block of a case: name of the block, layout of its arrays and the scalars of
+    the case. It is small and picklable, and is what the workers receive.
+    """
+    St: Union[int, float]
+    ID_MACH: int
+    segment: str
+    arrays: dict  # name -> (offset, shape, dtype)
+    reference_values: dict  # reference values of the case (ux, rho, T, P...)
+    factors: dict  # quantity -> factor of PerturbationField.convert_to_rans_reference
+
+
+@dataclass(frozen=True)
+class SharedDatasetSpec:
+    """
+    Description of a shared dataset, passed to `SharedDataset.attach` or `attach_dataset` in the workers.
+    """
+    cases: tuple[SharedCaseSpec, ...]
+
+
+class SharedCase:
+    """
+    Read-only view of a case in shared memory.
+
+    Attributes
+    ----------
+    St : float
+        Strouhal number of the case.
+    ID_MACH : int
+        Mach number ID of the case.
+    x_grid : np.ndarray
+        x grid of the PSE data (nx,).
+    r_grid : np.ndarray
+        r grid (nr,).
+    rans_values : dict[str, np.ndarray]
+        RANS values interpolated on the PSE grid (nx, nr), as `PerturbationField.rans_values`.
+    mean : dict[str, np.ndarray]
+        RANS values converted to the RANS reference (nx, nr), as `PerturbationField.get_converted_rans_values`.
+    amplitude : dict[str, np.ndarray]
+        Complex PSE amplitudes converted to the RANS reference (nx, nr).
+    reference_values : dict[str, float]
+        Reference values of the case.
+
+    Methods
+    -------
+    compute_total_fields(ts: Union[list, np.ndarray], epsilon: Union[int, float] = 0.01) -> dict[str, np.ndarray]
+        Computes the total field at several phases, as `PerturbationField.compute_total_fields`.
+    """
+
+    def __init__(self, spec: SharedCaseSpec, buffer: memoryview) -> None:
+        self.St = spec.St
+        self.ID_MACH = spec.ID_MACH
+        self.reference_values = spec.reference_values
+        self.__factors = spec.factors
+
+        views = {}
+        for name, (offset, shape, dtype) in spec.arrays.items():
+            view = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            view.flags.writeable = False
+            views[name] = view
+        self.x_grid = views['x_grid']
+        self.r_grid = views['r_grid']
+        self.rans_values = dict(zip(RansField.quantities, views['rans_values']))
+        self.mean = dict(zip(PerturbationField.rans_quantities, views['mean']))
+        self.amplitude = dict(zip(PerturbationField.rans_quantities, views['amplitude']))
+
+    def compute_total_fields(self, ts: Union[list, np.ndarray], epsilon: Union[int, float] = 0.01
+                             ) -> dict[str, np.ndarray]:
+        """
+        Compute the total field at several phases from the shared arrays, equal to
+        `PerturbationField.compute_total_fields(ts, epsilon)`.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Total field of each quantity as an array of shape (len(ts), nx, nr).
+
+        Raises
+        ------
+        ValueError
+            If one of the `ts` is not in [0, 100] or if `epsilon` is negative.
+        """
+        ts = np.atleast_1d(np.asarray(ts, dtype=float))
+        if ts.ndim != 1 or np.any(ts < 0) or np.any(ts > 100):
+            raise ValueError("ts should be percentages between 0 and 100.")
+        if not isinstance(epsilon, (int, float)) or epsilon < 0:
+            raise ValueError("epsilon should be a positive float or integer.")
+
+        phase = np.exp(-2j * np.pi * ts / 100)[:, None, None]
+        return {quantity: self.__factors[quantity] * (self.mean[quantity][None, :, :]
+                                                      + epsilon * np.real(self.amplitude[quantity][None, :, :] * phase))
+                for quantity in PerturbationField.rans_quantities}
+
+
+class SharedDataset:
+    """
+    Set of cases in shared memory, created by the parent process with `create` and attached by the workers with
+    `attach`. The cases are accessed with `dataset[St, ID_MACH]`.
+
+    Attributes
+    ----------
+    spec : SharedDatasetSpec
+        Picklable description of the dataset, to be sent to the workers.
+    owner : bool
+        True for the process that created the blocks and unlinks them.
+    nbytes : int
+        Total size of the shared blocks.
+
+    Methods
+    -------
+    create(plan: list[tuple[float, int]]) -> SharedDataset
+        Loads the cases and copies them into shared memory.
+    attach(spec: SharedDatasetSpec) -> SharedDataset
+        Attaches to the blocks of a dataset created by another process.
+    close()
+        Releases the views, and unlinks the blocks if the process owns them.
+    """
+
+    def __init__(self, spec: SharedDatasetSpec, segments: list[shared_memory.SharedMemory], owner: bool) -> None:
+        self.spec = spec
+        self.owner = owner
+        self.nbytes = sum(segment.size for segment in segments)
+        self.__segments = segments
+        self.__cases = {(case.St, case.ID_MACH): SharedCase(case, segment.buf)
+                        for case, segment in zip(spec.cases, segments)}
+        # The blocks are released even if `close` is not called
+        self.__finalizer = weakref.finalize(self, _release, segments, owner)
+
+    @classmethod
+    def create(cls, plan: list[tuple[Union[int, float], int]]) -> SharedDataset:
+        """
+        Load the cases of a plan (through the field registry) and copy their arrays into shared memory.
+
+        Parameters
+        ----------
+        plan: list of tuple
+            The (St, ID_MACH) pairs of the cases.
+
+        Returns
+        -------
+        SharedDataset
+            The dataset, owned by the current process.
+        """
+        plan = list(dict.fromkeys(plan))
+        if not plan:
+            raise ValueError("plan must contain at least one (St, ID_MACH) pair")
+
+        specs, segments = [], []
+        try:
+            for St, ID_MACH in plan:
+                arrays = _get_case_arrays(get_field_registry().get_perturbation_field(St, ID_MACH))
+                layout, size = _get_layout(arrays)
+                segment = shared_memory.SharedMemory(name=f'{SEGMENT_PREFIX}_{os.getpid()}_{uuid.uuid4().hex[:12]}',
+                                                     create=True, size=max(size, 1))
+                segments.append(segment)
+                for name, (offset, shape, dtype) in layout.items():
+                    np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=offset)[...] = arrays[name]
+
+                factors = PerturbationField.convert_to_rans_reference(
+                    {quantity: 1.0 for quantity in PerturbationField.rans_quantities}, ID_MACH)
+                reference_values = {name: float(value) for name, value in get_reference_values(ID_MACH).items()}
+                specs.append(SharedCaseSpec(St, ID_MACH, segment.name, layout, reference_values, factors))
+        except BaseException:
+            _release(segments, owner=True)
+            raise
+
+        return cls(SharedDatasetSpec(tuple(specs)), segments, owner=True)
+
+    @classmethod
+    def attach(cls, spec: SharedDatasetSpec) -> SharedDataset:
+        """
+        Attach to the blocks of a dataset created by another process. The arrays are read-only views of the blocks.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the blocks no longer exist (the dataset was closed by its owner).
+        """
+        segments = []
+        try:
+            for case in spec.cases:
+                segments.append(_open_segment(case.segment))
+        except BaseException:
+            _release(segments, owner=False)
+            raise
+        return cls(spec, segments, owner=False)
+
+    def __getitem__(self, key: tuple[Union[int, float], int]) -> SharedCase:
+        if key not in self.__cases:
+            raise KeyError(f"case {key} is not in the shared dataset - available cases are {list(self.__cases)}")
+        return self.__cases[key]
+
+    def __iter__(self):
+        return iter(self.__cases.values())
+
+    def __len__(self) -> int:
+        return len(self.__cases)
+
+    def __enter__(self) -> SharedDataset:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the views of the dataset, and unlink the blocks if the process owns them. The arrays obtained from
+        the dataset must not be used afterwards.
+        """
+        self.__cases.clear()
+        self.__finalizer()
+
+
+def _get_case_arrays(perturbation_field: PerturbationField) -> dict[str, np.ndarray]:
+    """
+    Return the arrays of a case stored in shared memory.
+    """
+    mean = perturbation_field.get_converted_rans_values()
+    amplitude = perturbation_field.convert_to_rans_reference(perturbation_field.compute_complex_amplitude(),
+                                                             perturbation_field.ID_MACH)
+    return {'x_grid': np.asarray(perturbation_field.x_grid, dtype=float),
+            'r_grid': np.asarray(get_r_grid(), dtype=float),
+            'rans_values': np.stack([perturbation_field.rans_values[quantity].to_numpy()
+                                     for quantity in RansField.quantities]),
+            'mean': np.stack([mean[quantity].to_numpy() for quantity in PerturbationField.rans_quantities]),
+            'amplitude': np.stack([amplitude[quantity].to_numpy() for quantity in PerturbationField.rans_quantities])}
+
+
+def _get_layout(arrays: dict[str, np.ndarray]) -> tuple[dict, int]:
+    """
+    Return the offset, shape and dtype of every array in the block, aligned on 64 bytes, and the size of the block.
+    """
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = (offset, array.shape, array.dtype.str)
+        offset += -(-array.nbytes // 64) * 64
+    return layout, offset
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing block without making the current process responsible for unlinking it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before Python 3.13, opening a block registers it to the resource tracker, which is shared with the parent: the
+    # registration is skipped so that the tracker keeps the parent responsible for the block
+    with _register_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _release(segments: list[shared_memory.SharedMemory], owner: bool) -> None:
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # Views of the block are still referenced: the mapping is released with them
+            pass
+        if owner:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+    segments.clear()
+
+
+def cleanup_stale_segments(directory: Path = Path('/dev/shm')) -> list[str]:
+    """
+    Remove the blocks of the datasets whose owner process no longer exists (POSIX systems exposing the blocks in
+    `/dev/shm`, e.g. Linux).
+
+    Returns
+    -------
+    list[str]
+        Names of the removed blocks.
+    """
+    removed = []
+    for path in Path(directory).glob(f'{SEGMENT_PREFIX}_*'):
+        try:
+            pid = int(path.name.split('_')[-2])
+        except ValueError:
+            continue
+        if not _is_running(pid):
+            path.unlink(missing_ok=True)
+            removed.append(path.name)
+    return removed
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_attached: Optional[SharedDataset] = None
+
+
+def attach_dataset(spec: SharedDatasetSpec) -> None:
+    """
+    Attach the current process to a shared dataset, e.g. as the initializer of a process pool. The dataset is then
+    returned by `get_attached_dataset`.
+    """
+    global _attached
+    if _attached is not None:
+        _attached.close()
+    _attached = SharedDataset.attach(spec)
+
+
+def get_attached_dataset() -> SharedDataset:
+    """
+    Return the dataset attached by `attach_dataset`.
+    """
+    if _attached is None:
+        raise ValueError("no shared dataset attached to this process - call attach_dataset first")
+    return _attached
+
+
+@atexit.register
+def _close_attached() -> None:
+    if _attached is not None:
+        _attached.close()
@@ -0,0 +1,141 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+from matplotlib import cm, colors, style, ticker
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.Field.perturbation_field import PerturbationField
+from src.Field.post_process import PostProcess
+from src.toolbox.fig_parameters import FIELD_TITLES, RANS_FIGSIZE, get_contour_levels
+from src.toolbox.path_directories import DIR_OUT
+
+
+def export_phase_animation(post_process: PostProcess, name_value: str, n_frames: int = 100,
+                           x_min: Union[int, float] = 0, x_max: Union[int, float] = 10,
+                           r_min: Union[int, float] = 0, r_max: Union[int, float] = 5,
+                           out_dir: Optional[Path] = None, jobs: Optional[int] = None, gif: bool = False,
+                           fps: int = 20, dpi: int = 150) -> list[Path]:
+    """
+    Export the animation of the total field over one period as numbered PNG frames (and optionally a GIF).
+    All the phases are computed in one vectorized evaluation and the colour levels are fixed over the whole
+    period. The frames are rendered headlessly (Agg) by a pool of processes, each one reusing its figure, axes and
+    colorbar for all its frames.
+
+    Parameters
+    ----------
+    post_process: PostProcess
+        The post-processing object providing the case, the Strouhal number and epsilon.
+    name_value: str
+        The quantity of the total field to animate.
+    n_frames: int, optional
+        Number of frames over one period. Default is 100.
+    x_min: int or float, optional
+        Minimum value of x for the frames. Default is 0.
+    x_max: int or float, optional
+        Maximum value of x for the frames. Default is 10.
+    r_min: int or float, optional
+        Minimum value of r for the frames. Default is 0.
+    r_max: int or float, optional
+        Maximum value of r for the frames. Default is 5.
+    out_dir: Path, optional
+        Directory of the frames. Default is `Output/animations/St<St>_case<ID_MACH>_<name_value>`.
+    jobs: int, optional
+        Number of rendering processes. Default is the number of CPUs; 1 renders in the current process.
+    gif: bool, optional
+        If True, the frames are also assembled into `animation.gif` in `out_dir`.
+    fps: int, optional
+        Frames per second of the GIF. Default is 20.
+    dpi: int, optional
+        Resolution of the frames. Default is 150.
+
+    Returns
+    -------
+    list[Path]
+        Paths of the frames, followed by the path of the GIF if requested.
+
+    Raises
+    ------
+    ValueError
+        If the quantity is not available for the total field or if `n_frames` or `jobs` is not a positive integer.
+    """
+    if name_value not in PerturbationField.rans_quantities:
+        raise ValueError(f"quantity not valid - choose among {PerturbationField.rans_quantities}")
+    if not isinstance(n_frames, int) or n_frames <= 0:
+        raise ValueError("n_frames must be a positive integer")
+    if jobs is not None and (not isinstance(jobs, int) or jobs <= 0):
+        raise ValueError("jobs must be a positive integer")
+
+    if out_dir is None:
+        out_dir = DIR_OUT / 'animations' / f'St{int(10 * post_process.St):02d}_case{post_process.ID_MACH}_{name_value}'
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    ts = np.linspace(0, 100, n_frames, endpoint=False)
+    x_slice, r_slice = post_process.get_window(x_min=x_min, x_max=x_max, r_min=r_min, r_max=r_max)
+    total = post_process.perturbation_field.compute_total_fields(ts, post_process.epsilon)[name_value]
+    frames = np.ascontiguousarray(total[:, x_slice, r_slice].transpose(0, 2, 1))
+    levels = get_contour_levels(frames)
+    x_sub = post_process.x_grid[x_slice]
+    r_sub = post_process.r_grid[r_slice]
+    title = FIELD_TITLES['total'][name_value]
+
+    jobs = os.cpu_count() if jobs is None else jobs
+    chunks = [chunk for chunk in np.array_split(np.arange(n_frames), min(jobs, n_frames)) if len(chunk)]
+    tasks = [(frames[chunk], ts[chunk], chunk[0], x_sub, r_sub, levels, title, out_dir, dpi) for chunk in chunks]
+
+    if jobs == 1:
+        paths = [path for task in tasks for path in _render_frames(*task)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            paths = [path for rendered in executor.map(_render_frames, *zip(*tasks)) for path in rendered]
+
+    if gif:
+        paths.append(_assemble_gif(paths, out_dir / 'animation.gif', fps))
+
+    return paths
+
+
+def _render_frames(frames: np.ndarray, ts: np.ndarray, first_index: int, x: np.ndarray, r: np.ndarray,
+                   levels: np.ndarray, title: str, out_dir: Path, dpi: int) -> list[Path]:
+    """
+    Render a chunk of frames with the Agg backend. The figure, axes, ticks and colorbar are built once and only
+    the filled contour is replaced between two frames.
+    """
+    with style.context("ggplot"):
+        fig = Figure(figsize=RANS_FIGSIZE, layout="constrained")
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.set_xlabel("x/D")
+        ax.set_ylabel("r/D")
+        ax.xaxis.set_major_locator(ticker.MultipleLocator(1))
+        ax.yaxis.set_major_locator(ticker.MultipleLocator(1))
+        mappable = cm.ScalarMappable(norm=colors.Normalize(levels[0], levels[-1]), cmap="jet")
+        cbar = fig.colorbar(mappable, ax=ax)
+        cbar.locator = ticker.MaxNLocator(nbins=5)
+        cbar.update_ticks()
+
+        paths = []
+        for k, (frame, t) in enumerate(zip(frames, ts)):
+            cs = ax.contourf(x, r, frame, levels=levels, cmap="jet")
+            ax.set_title(f"{title} - t = {t:.1f} %T")
+            path = out_dir / f'frame_{first_index + k:04d}.png'
+            fig.savefig(path, dpi=dpi)
+            cs.remove()
+            paths.append(path)
+
+    return paths
+
+
+def _assemble_gif(frame_paths: list[Path], gif_path: Path, fps: int) -> Path:
+    """
+    Assemble the PNG frames into a looping GIF.
+    """
+    from PIL import Image
+
+    images = [Image.open(path).convert("P", palette=Image.Palette.ADAPTIVE) for path in frame_paths]
+    images[0].save(gif_path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+    return gif_path
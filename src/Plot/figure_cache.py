@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from src.toolbox.path_directories import DIR_OUT, get_case_files
+
+
+class FigureCache:
+    """
+    Content-addressed cache of rendered figures. The key of a figure is the hash of its plot parameters and of the
+    identity (size and modification time) of the data files it is computed from, so that any change of the data
+    invalidates the cached images. A hit returns the stored file without loading the data nor calling matplotlib.
+    The total size of the cache is capped, the least recently used figures being evicted first.
+
+    Attributes
+    ----------
+    directory : Path
+        Directory where the figures are stored.
+    max_bytes : int
+        Maximum total size of the cached figures.
+    hits : int
+        Number of figures served from the cache.
+    misses : int
+        Number of figures rendered.
+
+    Methods
+    -------
+    plot_field(St, ID_MACH, field, name_value, t=0, epsilon=0.01, x_min=0, x_max=10, r_min=0, r_max=5, fmt='png')
+        Returns the path of the figure drawn by `PostProcess.plot_field`, rendering it only on a miss.
+    plot_line(St, ID_MACH, field, name_value, x_idxs, t=0, epsilon=0.01, fmt='png')
+        Returns the path of the figure drawn by `PostProcess.plot_line`, rendering it only on a miss.
+    get_key(params: dict, data_files: list[Path]) -> str
+        Computes the key of a figure.
+    clear()
+        Removes every cached figure.
+    """
+
+    formats = ('png', 'svg')
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = 500 * 1024 ** 2) -> None:
+        """
+        Parameters
+        ----------
+        directory: Path, optional
+            Directory where the figures are stored. Default is `Output/figure_cache`.
+        max_bytes: int, optional
+            Maximum total size of the cached figures. Default is 500 MB.
+        """
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+
+        self.directory = Path(DIR_OUT / 'figure_cache' if directory is None else directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__post_processes = {}
+
+    def plot_field(self, St: Union[int, float], ID_MACH: int, field: str, name_value: str, t: Union[int, float] = 0,
+                   epsilon: Union[int, float] = 0.01, x_min: Union[int, float] = 0, x_max: Union[int, float] = 10,
+                   r_min: Union[int, float] = 0, r_max: Union[int, float] = 5, fmt: str = 'png') -> Path:
+        """
+        Return the path of the filled contour drawn by `PostProcess.plot_field` for these parameters.
+
+        Returns
+        -------
+        Path
+            Path of the cached figure.
+        """
+        params = {'plot': 'field', 'St': St, 'ID_MACH': ID_MACH, 'field': field, 'name_value': name_value,
+                  'x_min': x_min, 'x_max': x_max, 'r_min': r_min, 'r_max': r_max}
+        if field == 'total':
+            params.update(t=t, epsilon=epsilon)
+        return self.__get_or_render(params, fmt, lambda post_process: post_process.plot_field(
+            field, name_value, x_min=x_min, x_max=x_max, r_min=r_min, r_max=r_max, show=False))
+
+    def plot_line(self, St: Union[int, float], ID_MACH: int, field: str, name_value: str,
+                  x_idxs: Union[int, list[int]], t: Union[int, float] = 0, epsilon: Union[int, float] = 0.01,
+                  fmt: str = 'png') -> Path:
+        """
+        Return the path of the lines drawn by `PostProcess.plot_line` for these parameters.
+
+        Returns
+        -------
+        Path
+            Path of the cached figure.
+        """
+        params = {'plot': 'line', 'St': St, 'ID_MACH': ID_MACH, 'field': field, 'name_value': name_value,
+                  'x_idxs': [x_idxs] if isinstance(x_idxs, int) else list(x_idxs)}
+        if field == 'total':
+            params.update(t=t, epsilon=epsilon)
+        return self.__get_or_render(params, fmt, lambda post_process: post_process.plot_line(
+            field, name_value, x_idxs, show=False))
+
+    @staticmethod
+    def get_key(params: dict, data_files: list[Path]) -> str:
+        """
+        Compute the key of a figure from its plot parameters and the identity of its data files.
+
+        Parameters
+        ----------
+        params: dict
+            JSON-serializable plot parameters.
+        data_files: list of Path
+            Data files read to compute the plotted field.
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest.
+        """
+        identity = []
+        for file in data_files:
+            stat = os.stat(file)
+            identity.append([str(file), stat.st_size, stat.st_mtime_ns])
+        payload = json.dumps({'params': params, 'data': identity}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def clear(self) -> None:
+        """
+        Remove every cached figure.
+        """
+        for file in self.__cached_files():
+            file.unlink(missing_ok=True)
+
+    def __get_or_render(self, params, fmt, render):
+        """
+        Return the cached figure for `params` or render it with `render(post_process)` and store it.
+        """
+        if fmt not in self.formats:
+            raise ValueError(f"fmt must be a string in {list(self.formats)}")
+
+        key = self.get_key(params, get_case_files(params['St'], params['ID_MACH']))
+        path = self.directory / f'{key}.{fmt}'
+        if path.exists():
+            self.hits += 1
+            os.utime(path)
+            return path
+
+        self.misses += 1
+        from matplotlib import pyplot as plt
+
+        fig = render(self.__get_post_process(params))
+        tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp')
+        fig.savefig(tmp_path, format=fmt)
+        plt.close(fig)
+        os.replace(tmp_path, path)
+        self.__evict(keep=path)
+        return path
+
+    def __get_post_process(self, params):
+        """
+        Return a PostProcess object of the case, shared between the misses of this cache.
+        """
+        from src.Field.post_process import PostProcess
+
+        case = (params['St'], params['ID_MACH'])
+        if case not in self.__post_processes:
+            self.__post_processes[case] = PostProcess(*case)
+        post_process = self.__post_processes[case]
+        post_process.t = params.get('t', 0)
+        post_process.epsilon = params.get('epsilon', 0.01)
+        return post_process
+
+    def __cached_files(self):
+        """
+        Return the cached figures.
+        """
+        return [file for fmt in self.formats for file in self.directory.glob(f'*.{fmt}')]
+
+    def __evict(self, keep):
+        """
+        Remove the least recently used figures, except `keep`, until the size of the cache is below `max_bytes`.
+        """
+        files = [(file.stat(), file) for file in self.__cached_files()]
+        total_size = sum(stat.st_size for stat, _ in files)
+        for stat, file in sorted(files, key=lambda item: item[0].st_mtime_ns):
+            if total_size <= self.max_bytes:
+                break
+            if file == keep:
+                continue
+            file.unlink(missing_ok=True)
+            total_size -= stat.st_size
@@ -0,0 +1,155 @@
+from typing import Union
+
+import numpy as np
+
+
+class FieldPyramid:
+    """
+    Multi-resolution pyramid of a field regridded on a uniform raster. The base level samples the field at the
+    finest spacing of its (x, r) grid and every other level halves the resolution of the previous one by averaging
+    2 x 2 blocks of cells. A view is rendered from the coarsest level that still has at least as many cells as output
+    pixels, so that its cost depends on the size of the figure rather than on the size of the grid.
+
+    Attributes
+    ----------
+    levels : list of np.ndarray
+        Rasters of shape (nr, nx) from the finest to the coarsest level, r being along the first axis as expected by
+        `imshow`.
+    extent : tuple of float
+        Edges (x_min, x_max, r_min, r_max) of the raster, common to all the levels.
+
+    Methods
+    -------
+    get_view(x_min, x_max, r_min, r_max, width_px, height_px) -> tuple[np.ndarray, tuple]
+        Returns the part of the appropriate level covering the window and its extent.
+    """
+
+    def __init__(self, x_grid: np.ndarray, r_grid: np.ndarray, values: np.ndarray, max_cells: int = 4096,
+                 min_cells: int = 16) -> None:
+        """
+        Parameters
+        ----------
+        x_grid: np.ndarray
+            Increasing x-coordinates of the field.
+        r_grid: np.ndarray
+            Increasing r-coordinates of the field.
+        values: np.ndarray
+            Field of shape (nx, nr).
+        max_cells: int, optional
+            Maximum number of cells of the base level along each axis. Default is 4096.
+        min_cells: int, optional
+            Levels are built until one of the axes has less than `min_cells` cells. Default is 16.
+        """
+        x_grid = np.asarray(x_grid, dtype=float)
+        r_grid = np.asarray(r_grid, dtype=float)
+        values = np.asarray(values, dtype=float)
+
+        n_levels = 1
+        n_x, n_r = (self.__base_cells(grid, max_cells) for grid in (x_grid, r_grid))
+        while min(n_x, n_r) >= 2 ** n_levels * min_cells:
+            n_levels += 1
+        # The base dimensions are multiples of 2^(n_levels - 1) so that all the levels cover the same extent
+        block = 2 ** (n_levels - 1)
+        n_x, n_r = (-(-n // block) * block for n in (n_x, n_r))
+
+        x_centres = self.__cell_centres(x_grid, n_x)
+        r_centres = self.__cell_centres(r_grid, n_r)
+        i_x, w_x = self.__locate(x_grid, x_centres)
+        i_r, w_r = self.__locate(r_grid, r_centres)
+        w_x, w_r = w_x[None, :], w_r[:, None]
+        i_x, i_r = i_x[None, :], i_r[:, None]
+        base = ((1 - w_x) * (1 - w_r) * values[i_x, i_r] + w_x * (1 - w_r) * values[i_x + 1, i_r]
+                + (1 - w_x) * w_r * values[i_x, i_r + 1] + w_x * w_r * values[i_x + 1, i_r + 1])
+
+        self.levels = [base]
+        for _ in range(n_levels - 1):
+            previous = self.levels[-1]
+            n_r_level, n_x_level = previous.shape
+            self.levels.append(previous.reshape(n_r_level // 2, 2, n_x_level // 2, 2).mean(axis=(1, 3)))
+        self.extent = (x_grid[0], x_grid[-1], r_grid[0], r_grid[-1])
+
+    def get_view(self, x_min: Union[int, float], x_max: Union[int, float], r_min: Union[int, float],
+                 r_max: Union[int, float], width_px: int, height_px: int) -> tuple[np.ndarray, tuple]:
+        """
+        Return the raster covering the window at a resolution matching the output size.
+
+        Parameters
+        ----------
+        x_min, x_max, r_min, r_max: int or float
+            Limits of the displayed window.
+        width_px: int
+            Width of the axes in pixels.
+        height_px: int
+            Height of the axes in pixels.
+
+        Returns
+        -------
+        tuple[np.ndarray, tuple]
+            The raster of shape (nr, nx) and its extent (x_min, x_max, r_min, r_max), to be given to `imshow`.
+        """
+        x_0, x_1, r_0, r_1 = self.extent
+        for level in reversed(self.levels):
+            n_r, n_x = level.shape
+            dx, dr = (x_1 - x_0) / n_x, (r_1 - r_0) / n_r
+            if (x_max - x_min) / dx >= width_px and (r_max - r_min) / dr >= height_px:
+                break
+
+        i_x_min = int(np.clip(np.floor((x_min - x_0) / dx), 0, n_x - 1))
+        i_x_max = int(np.clip(np.ceil((x_max - x_0) / dx), i_x_min + 1, n_x))
+        i_r_min = int(np.clip(np.floor((r_min - r_0) / dr), 0, n_r - 1))
+        i_r_max = int(np.clip(np.ceil((r_max - r_0) / dr), i_r_min + 1, n_r))
+        view = level[i_r_min: i_r_max, i_x_min: i_x_max]
+        extent = (x_0 + i_x_min * dx, x_0 + i_x_max * dx, r_0 + i_r_min * dr, r_0 + i_r_max * dr)
+        return view, extent
+
+    @staticmethod
+    def __base_cells(grid, max_cells):
+        """
+        Return the number of cells needed to resolve the finest spacing of the grid.
+        """
+        return int(min(np.ceil((grid[-1] - grid[0]) / np.diff(grid).min()), max_cells))
+
+    @staticmethod
+    def __cell_centres(grid, n_cells):
+        """
+        Return the centres of `n_cells` uniform cells covering the grid.
+        """
+        edges = np.linspace(grid[0], grid[-1], n_cells + 1)
+        return 0.5 * (edges[1:] + edges[:-1])
+
+    @staticmethod
+    def __locate(grid, coord):
+        """
+        Return the index of the cell containing each coordinate and the relative position inside the cell.
+        """
+        idx = np.clip(np.searchsorted(grid, coord, side='right') - 1, 0, len(grid) - 2)
+        weight = (coord - grid[idx]) / (grid[idx + 1] - grid[idx])
+        return idx, weight
+
+
+def draw_raster(ax, pyramid: FieldPyramid, x_min: Union[int, float], x_max: Union[int, float],
+                r_min: Union[int, float], r_max: Union[int, float], **kwargs):
+    """
+    Draw the window of a field pyramid on matplotlib axes with `imshow`, at the resolution of the axes.
+
+    Parameters
+    ----------
+    ax: matplotlib.axes.Axes
+        The axes to draw on.
+    pyramid: FieldPyramid
+        The pyramid of the field.
+    x_min, x_max, r_min, r_max: int or float
+        Limits of the displayed window.
+    kwargs
+        Keyword arguments given to `imshow` (cmap, vmin, vmax...).
+
+    Returns
+    -------
+    matplotlib.image.AxesImage
+    """
+    bbox = ax.get_window_extent()
+    view, extent = pyramid.get_view(x_min, x_max, r_min, r_max, int(bbox.width), int(bbox.height))
+    image = ax.imshow(view, extent=extent, origin='lower', aspect='auto', interpolation='nearest', **kwargs)
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(r_min, r_max)
+    return image
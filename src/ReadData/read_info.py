@@ -1,10 +1,13 @@
-import pandas as pd
-
+from src.toolbox.lazy_import import LazyModule
 from src.toolbox.path_directories import DIR_DATA
+from src.toolbox.tracing import record_bytes_read, traced
+
+pd = LazyModule('pandas')
 
 path_info = DIR_DATA / 'info.dat'
 
 
+@traced('ReadData.get_reference_values')
 def get_reference_values(ID_MACH):
     """Retrieve Reference Values for every RANS fields
 
@@ -26,5 +29,6 @@ def get_reference_values(ID_MACH):
     df = pd.read_csv(path_info,
                        delimiter=r'\s+',
                        comment='#', names=header, skiprows=1)
+    record_bytes_read(path_info)
     df.index = df.index + 1
     return df.loc[ID_MACH]
@@ -1,10 +1,13 @@
-import pandas as pd
-
+from src.toolbox.lazy_import import LazyModule
 from src.toolbox.path_directories import DIR_DATA
+from src.toolbox.tracing import record_bytes_read, traced
+
+pd = LazyModule('pandas')
 
 path_mach = DIR_DATA / 'Mach.dat'
 
 
+@traced('ReadData.get_mach_reference')
 def get_mach_reference(ID):
     """Retrieve all the Mach numbers
 
@@ -18,6 +21,7 @@ def get_mach_reference(ID):
 
     """
     mach_df = pd.read_csv(path_mach, delimiter=r'\s+', header=None, names=['ID', 'Ma'])
+    record_bytes_read(path_mach)
     mach_df.set_index('ID', inplace=True)
 
     return mach_df.loc[ID]
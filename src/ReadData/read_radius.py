@@ -1,9 +1,11 @@
 import numpy as np
 
 from src.toolbox.path_directories import DIR_DATA
+from src.toolbox.tracing import record_bytes_read, traced
 
 rans_69pt_file = DIR_DATA / 'RANS69pt.dat'
 
+@traced('ReadData.get_r_grid')
 def get_r_grid():
     """
 
@@ -11,4 +13,5 @@ def get_r_grid():
     -------
     ndarray: containing the 69 points along r from the RANS69pt.dat
     """
+    record_bytes_read(rans_69pt_file)
     return np.loadtxt(rans_69pt_file)
@@ -0,0 +1,297 @@
+"""
+Thin client of the local field query server (see `src.Server.server`). `FieldClient` wraps the HTTP endpoints and
+`RemotePostProcess` gives the data of a case in the shapes of `PostProcess`: `get_fields_stats` and `extract_path`
+take the same arguments as their local counterparts, and `get_field_in_window` returns the window of
+`PostProcess.get_value_in_field` for a field and quantity named instead of a DataFrame.
+
+Examples
+--------
+>>> client = FieldClient('http://127.0.0.1:8765')
+>>> post_process = RemotePostProcess(client, 0.4, 1, t=25)
+>>> x, r, ux = post_process.get_field_in_window('total', 'ux', x_min=0, x_max=5)
+>>> post_process.extract_path(LinePath.lipline(), fields=('total',), quantities=['ux'])
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Optional, Union
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import numpy as np
+
+from src.Field.path_extraction import LinePath
+from src.Field.perturbation_field import PerturbationField
+from src.toolbox.lazy_import import LazyModule
+
+pd = LazyModule('pandas')
+
+
+class FieldClient:
+    """
+    Client of the field query server. The client holds no state other than the URL and can be used from several
+    threads at once.
+
+    Attributes
+    ----------
+    url : str
+        Base URL of the server.
+    timeout : float
+        Timeout of the requests in seconds.
+    dtype : str
+        Floating type of the returned arrays ('float32' halves the size of the payloads).
+
+    Methods
+    -------
+    get_health() -> dict
+        Returns the status of the server.
+    get_stats(St, ID_MACH, quantity=None) -> dict
+        Returns the statistics of the RANS values of a case.
+    get_window(St, ID_MACH, field, quantity, t=0, epsilon=0.01, x_min=0, x_max=10, r_min=0, r_max=3)
+        Returns the values of a field in a window of the domain.
+    get_lines(St, ID_MACH, field, quantity, x_idxs, t=0, epsilon=0.01)
+        Returns the radial profiles of a field at x stations.
+    probe(St, ID_MACH, field, quantity, x, r, t=0, epsilon=0.01) -> np.ndarray
+        Returns the values of a field at points of the domain.
+    get_total_fields(St, ID_MACH, quantity, ts, epsilon=0.01, x_min=None, x_max=None, r_min=None, r_max=None)
+        Returns the total field at several phases in a window of the domain.
+    """
+
+    def __init__(self, url: str = 'http://127.0.0.1:8765', timeout: float = 60, dtype: str = 'float64') -> None:
+        """
+        Parameters
+        ----------
+        url: str, optional
+            Base URL of the server. Default is the default address of `FieldServer`.
+        timeout: float, optional
+            Timeout of the requests in seconds. Default is 60.
+        dtype: str, optional
+            Floating type of the returned arrays. Default is 'float64'.
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.dtype = dtype
+
+    def get_health(self) -> dict:
+        """
+        Return the status of the server and the number of requests served.
+        """
+        return json.loads(self.__request('health', {}))
+
+    def get_stats(self, St: Union[int, float], ID_MACH: int, quantity: Optional[str] = None) -> dict[str, pd.DataFrame]:
+        """
+        Return the statistics (count, mean, std, min, quartiles, max) of the RANS values of a case, one DataFrame
+        per quantity as `PostProcess.get_fields_stats`.
+        """
+        params = {'St': St, 'case': ID_MACH}
+        if quantity is not None:
+            params['quantity'] = quantity
+        stats = json.loads(self.__request('stats', params))
+        return {name: pd.DataFrame(value).rename(columns=int) for name, value in stats.items()}
+
+    def get_window(self, St: Union[int, float], ID_MACH: int, field: str, quantity: str, t: Union[int, float] = 0,
+                   epsilon: Union[int, float] = 0.01, x_min: Union[int, float] = 0, x_max: Union[int, float] = 10,
+                   r_min: Union[int, float] = 0, r_max: Union[int, float] = 3
+                   ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the values of a field ('rans', 'pse' or 'total') in a window of the domain.
+
+        Returns
+        -------
+        tuple
+            The x (nx',) and r (nr',) grids of the window and the values (nx', nr').
+        """
+        arrays = self.__request_arrays('window', {'St': St, 'case': ID_MACH, 'field': field, 'quantity': quantity,
+                                                  't': t, 'epsilon': epsilon, 'x_min': x_min, 'x_max': x_max,
+                                                  'r_min': r_min, 'r_max': r_max})
+        return arrays['x'], arrays['r'], arrays['values']
+
+    def get_lines(self, St: Union[int, float], ID_MACH: int, field: str, quantity: str, x_idxs: Union[int, list[int]],
+                  t: Union[int, float] = 0, epsilon: Union[int, float] = 0.01
+                  ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the radial profiles of a field at the x stations of indices `x_idxs`.
+
+        Returns
+        -------
+        tuple
+            The x (n_idx,) of the stations, the r grid (nr,) and the values (n_idx, nr).
+        """
+        x_idxs = [x_idxs] if isinstance(x_idxs, int) else x_idxs
+        arrays = self.__request_arrays('line', {'St': St, 'case': ID_MACH, 'field': field, 'quantity': quantity,
+                                                'x_idx': _join(x_idxs), 't': t, 'epsilon': epsilon})
+        return arrays['x'], arrays['r'], arrays['values']
+
+    def probe(self, St: Union[int, float], ID_MACH: int, field: str, quantity: str, x: Union[list, np.ndarray],
+              r: Union[list, np.ndarray], t: Union[int, float] = 0, epsilon: Union[int, float] = 0.01) -> np.ndarray:
+        """
+        Return the values of a field at the points (x, r), bilinearly interpolated.
+        """
+        arrays = self.__request_arrays('probe', {'St': St, 'case': ID_MACH, 'field': field, 'quantity': quantity,
+                                                 'x': _join(np.atleast_1d(x)), 'r': _join(np.atleast_1d(r)),
+                                                 't': t, 'epsilon': epsilon})
+        return arrays['values']
+
+    def get_total_fields(self, St: Union[int, float], ID_MACH: int, quantity: str, ts: Union[int, float, list],
+                         epsilon: Union[int, float] = 0.01, x_min: Optional[Union[int, float]] = None,
+                         x_max: Optional[Union[int, float]] = None, r_min: Optional[Union[int, float]] = None,
+                         r_max: Optional[Union[int, float]] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the total field at several phases in a window of the domain, the whole domain if no bound is given.
+
+        Returns
+        -------
+        tuple
+            The x (nx',) and r (nr',) grids of the window and the values (n_t, nx', nr').
+        """
+        window = {'x_min': x_min, 'x_max': x_max, 'r_min': r_min, 'r_max': r_max}
+        arrays = self.__request_arrays('total', {'St': St, 'case': ID_MACH, 'quantity': quantity,
+                                                 'ts': _join(np.atleast_1d(ts)), 'epsilon': epsilon,
+                                                 **{name: bound for name, bound in window.items() if bound is not None}})
+        return arrays['x'], arrays['r'], arrays['values']
+
+    def __request_arrays(self, endpoint: str, params: dict) -> dict[str, np.ndarray]:
+        with np.load(io.BytesIO(self.__request(endpoint, {**params, 'dtype': self.dtype}))) as payload:
+            return {name: payload[name] for name in payload.files}
+
+    def __request(self, endpoint: str, params: dict) -> bytes:
+        url = f'{self.url}/{endpoint}?{urlencode(params)}'
+        try:
+            with urlopen(url, timeout=self.timeout) as response:
+                return response.read()
+        except HTTPError as error:
+            # The errors of the request are raised with the type of the local PostProcess methods, the failures of the
+            # server as RuntimeError
+            message = json.loads(error.read() or b'{}')
+            if error.code >= 500:
+                raise RuntimeError(f"{message.get('type', 'error')} on the server: {message.get('error', error)}"
+                                   ) from None
+            exception = FileNotFoundError if message.get('type') == 'FileNotFoundError' else ValueError
+            raise exception(message.get('error', str(error))) from None
+
+
+class RemotePostProcess:
+    """
+    Data accessors of `PostProcess` for a case served by a field query server.
+
+    Attributes
+    ----------
+    client : FieldClient
+        The client of the server.
+    St : float
+        The Strouhal number of the case.
+    ID_MACH : int
+        The identifier of the Mach number case.
+    t : float
+        Percentage of the period used for the total field.
+    epsilon : float
+        Amplitude of the perturbation in the total field.
+
+    Methods
+    -------
+    get_fields_stats(quantity: Optional[str] = None) -> Union[pd.DataFrame, dict[str, pd.DataFrame]]
+        Returns the statistics of the RANS values.
+    get_field_in_window(field, name_value, x_min=0, x_max=10, r_min=0, r_max=3)
+        Returns the x, r and values of a field in a window of the domain, as `PostProcess.get_value_in_field`.
+    get_lines(field, name_value, x_idxs)
+        Returns the radial profiles of a field at x stations, the data of `PostProcess.plot_line`.
+    extract_path(path, fields=('rans', 'total'), quantities=None, ts=None) -> dict[str, dict[str, np.ndarray]]
+        Returns the values of the fields along a path.
+    compute_total_fields(ts, quantities=None) -> dict[str, np.ndarray]
+        Returns the total fields at several phases.
+    """
+
+    def __init__(self, client: FieldClient, St: Union[int, float], ID_MACH: int, t: Union[int, float] = 0,
+                 epsilon: Union[int, float] = 0.01) -> None:
+        """
+        Parameters
+        ----------
+        client: FieldClient
+            The client of the server.
+        St: int or float
+            The Strouhal number.
+        ID_MACH: int
+            The identifier of the Mach number case.
+        t: int or float, optional
+            Percentage of the period (0 to 100) used for the total field. Default is 0.
+        epsilon: int or float, optional
+            Amplitude of the perturbation in the total field. Default is 0.01.
+        """
+        if not 0 <= t <= 100:
+            raise ValueError("t should be a percentage between 0 and 100.")
+        if epsilon < 0:
+            raise ValueError("epsilon should be a positive float or integer.")
+
+        self.client = client
+        self.St = St
+        self.ID_MACH = ID_MACH
+        self.t = t
+        self.epsilon = epsilon
+
+    def get_fields_stats(self, quantity: Optional[str] = None) -> Union[pd.DataFrame, dict[str, pd.DataFrame]]:
+        """
+        Return the statistics of the RANS values, for one quantity or all of them.
+        """
+        stats = self.client.get_stats(self.St, self.ID_MACH, quantity)
+        return stats[quantity] if quantity else stats
+
+    def get_field_in_window(self, field: str, name_value: str, x_min: Union[int, float] = 0,
+                            x_max: Union[int, float] = 10, r_min: Union[int, float] = 0, r_max: Union[int, float] = 3
+                            ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the x and r grids and the values (as an array) of a field quantity in the desired domain, the window
+        of `PostProcess.get_value_in_field` for that field quantity.
+        """
+        return self.client.get_window(self.St, self.ID_MACH, field, name_value, self.t, self.epsilon,
+                                      x_min, x_max, r_min, r_max)
+
+    def get_lines(self, field: str, name_value: str, x_idxs: Union[int, list[int]]
+                  ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the radial profiles of a field quantity at the x stations of indices `x_idxs`.
+        """
+        return self.client.get_lines(self.St, self.ID_MACH, field, name_value, x_idxs, self.t, self.epsilon)
+
+    def extract_path(self, path: LinePath, fields: tuple[str, ...] = ('rans', 'total'),
+                     quantities: Optional[list[str]] = None,
+                     ts: Optional[Union[int, float, list]] = None) -> dict[str, dict[str, np.ndarray]]:
+        """
+        Return the values of the requested fields along a path, with the shapes of `PostProcess.extract_path`:
+        (n_points,) for 'rans' and 'pse' (the stored PSE quantities, e.g. 'abs(ux)') and (n_t, n_points) for 'total'.
+        Without `quantities`, every quantity of each field is extracted: `PerturbationField.rans_quantities` for
+        'rans' and 'total' and the stored PSE quantities for 'pse'.
+        """
+        ts = np.atleast_1d(self.t if ts is None else ts)
+
+        extracted = {}
+        for field in fields:
+            field_quantities = _get_default_quantities(field) if quantities is None else quantities
+            if field == 'total':
+                extracted[field] = {quantity: np.stack([self.client.probe(self.St, self.ID_MACH, field, quantity,
+                                                                          path.x, path.r, t, self.epsilon)
+                                                        for t in ts])
+                                    for quantity in field_quantities}
+            else:
+                extracted[field] = {quantity: self.client.probe(self.St, self.ID_MACH, field, quantity, path.x, path.r)
+                                    for quantity in field_quantities}
+        return extracted
+
+    def compute_total_fields(self, ts: Union[int, float, list], quantities: Optional[list[str]] = None
+                             ) -> dict[str, np.ndarray]:
+        """
+        Return the total fields (n_t, nx, nr) of the case at several phases, on the whole domain.
+        """
+        quantities = PerturbationField.rans_quantities if quantities is None else quantities
+        return {quantity: self.client.get_total_fields(self.St, self.ID_MACH, quantity, ts, self.epsilon)[2]
+                for quantity in quantities}
+
+
+def _get_default_quantities(field: str) -> list[str]:
+    # The server serves the stored PSE quantities (e.g. 'Re(ux)'), not the complex amplitude of `PostProcess`
+    return PerturbationField.pse_quantities[2:] if field == 'pse' else PerturbationField.rans_quantities
+
+
+def _join(values) -> str:
+    return ','.join(str(value) for value in values)
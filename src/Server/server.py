@@ -0,0 +1,341 @@
+"""
+Local field query server. The datasets are loaded once in the server process (through the field registry) and the
+derived arrays (total fields at given phases) are kept in a bounded cache, so that several notebooks share one copy
+of the data instead of parsing and interpolating it each.
+
+The HTTP API only uses GET requests; the arrays are returned as uncompressed NumPy `.npz` payloads (compact binary,
+read with `np.load`) and the statistics as JSON. Every request takes the `St` and `case` parameters:
+
+- /health                                               -> JSON
+- /stats     [quantity]                                 -> JSON, statistics of the RANS values
+- /window    field, quantity, [t, epsilon, x_min, x_max, r_min, r_max, dtype]  -> npz x, r, values (nx', nr')
+- /line      field, quantity, x_idx=i,j,..., [t, epsilon, dtype]              -> npz x, r, values (n_idx, nr)
+- /probe     field, quantity, x=..., r=..., [t, epsilon, dtype]               -> npz values (n_points,)
+- /total     quantity, ts=..., [epsilon, x_min, x_max, r_min, r_max, dtype]   -> npz t, x, r, values (n_t, nx', nr')
+
+The windows follow `PostProcess.get_window`; /total returns the whole domain when no window bound is given.
+
+Usage
+-----
+python -m src.Server.server [--host 127.0.0.1] [--port 8765]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from src.Field.path_extraction import LinePath, PathExtractor
+from src.Field.perturbation_field import PerturbationField
+from src.Field.post_process import PostProcess
+from src.Field.rans_field import RansField
+
+FIELDS = ('rans', 'pse', 'total')
+
+
+class FieldServer:
+    """
+    Threaded HTTP server answering field queries, see the module documentation for the API.
+
+    Attributes
+    ----------
+    host : str
+        Address the server is bound to.
+    port : int
+        Port of the server (the port chosen by the system if 0 was requested).
+    url : str
+        Base URL of the server.
+    requests : int
+        Number of requests served.
+
+    Methods
+    -------
+    start()
+        Serves the requests in a background thread.
+    serve_forever()
+        Serves the requests in the current thread.
+    stop()
+        Stops the server.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, max_cached_totals: int = 64) -> None:
+        """
+        Parameters
+        ----------
+        host: str, optional
+            Address to bind. Default is the loopback interface.
+        port: int, optional
+            Port to bind, 0 letting the system choose a free one. Default is 8765.
+        max_cached_totals: int, optional
+            Maximum number of total fields (one per case, phase and epsilon) kept in memory. Default is 64.
+        """
+        self.requests = 0
+        self.__post_processes = {}
+        self.__totals = OrderedDict()
+        self.__max_cached_totals = max_cached_totals
+        self.__lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+
+        handler = type('FieldRequestHandler', (_FieldRequestHandler,), {'field_server': self})
+        self.__http_server = ThreadingHTTPServer((host, port), handler)
+        self.__http_server.daemon_threads = True
+        self.host, self.port = self.__http_server.server_address[:2]
+        self.url = f'http://{self.host}:{self.port}'
+
+    def start(self) -> FieldServer:
+        """
+        Serve the requests in a background thread.
+        """
+        self.__thread = threading.Thread(target=self.__http_server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """
+        Serve the requests in the current thread, until interrupted.
+        """
+        self.__http_server.serve_forever()
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        self.__http_server.shutdown()
+        self.__http_server.server_close()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __enter__(self) -> FieldServer:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def get_post_process(self, St: Union[int, float], ID_MACH: int) -> PostProcess:
+        """
+        Return the PostProcess object of a case, created on the first request. Its fields come from the field
+        registry, which loads a case once even if several requests for it arrive at the same time.
+        """
+        key = (St, ID_MACH)
+        with self.__lock:
+            post_process = self.__post_processes.get(key)
+        if post_process is None:
+            post_process = PostProcess(St, ID_MACH)
+            with self.__lock:
+                post_process = self.__post_processes.setdefault(key, post_process)
+        return post_process
+
+    def get_field(self, St: Union[int, float], ID_MACH: int, field: str, quantity: str, t: float = 0,
+                  epsilon: float = 0.01) -> np.ndarray:
+        """
+        Return the values (nx, nr) of a quantity of the RANS, PSE or total field of a case.
+
+        Raises
+        ------
+        ValueError
+            If the field or the quantity is not valid.
+        """
+        perturbation_field = self.get_post_process(St, ID_MACH).perturbation_field
+        match field:
+            case 'rans':
+                _check_quantity(quantity, RansField.quantities)
+                return perturbation_field.rans_values[quantity].to_numpy()
+            case 'pse':
+                _check_quantity(quantity, PerturbationField.pse_quantities[2:])
+                return perturbation_field.values[quantity].to_numpy()
+            case 'total':
+                _check_quantity(quantity, PerturbationField.rans_quantities)
+                return self.get_total_fields(St, ID_MACH, [t], epsilon)[quantity][0]
+            case _:
+                raise ValueError(f"field must be a string in {list(FIELDS)}")
+
+    def get_total_fields(self, St: Union[int, float], ID_MACH: int, ts: list[float],
+                         epsilon: float) -> dict[str, np.ndarray]:
+        """
+        Return the total fields (n_t, nx, nr) of a case at several phases. The total field of every phase is kept in a
+        bounded cache, the least recently used being dropped first, and only the missing phases are computed.
+        """
+        totals = {}
+        with self.__lock:
+            for t in ts:
+                key = (St, ID_MACH, t, epsilon)
+                if key in self.__totals:
+                    self.__totals.move_to_end(key)
+                    totals[t] = self.__totals[key]
+
+        missing = [t for t in dict.fromkeys(ts) if t not in totals]
+        if missing:
+            # The PostProcess objects are shared by the requests: the phases are passed explicitly instead of
+            # modifying their `t` and `epsilon` attributes
+            computed = self.get_post_process(St, ID_MACH).perturbation_field.compute_total_fields(missing, epsilon)
+            with self.__lock:
+                for k, t in enumerate(missing):
+                    totals[t] = {quantity: values[k] for quantity, values in computed.items()}
+                    self.__totals[(St, ID_MACH, t, epsilon)] = totals[t]
+                while len(self.__totals) > self.__max_cached_totals:
+                    self.__totals.popitem(last=False)
+
+        return {quantity: np.stack([totals[t][quantity] for t in ts]) for quantity in PerturbationField.rans_quantities}
+
+    def count_request(self) -> None:
+        """
+        Count a request served.
+        """
+        with self.__lock:
+            self.requests += 1
+
+
+class _FieldRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the requests, dispatching the path of the URL to the `_handle_<path>` methods.
+    """
+    field_server: FieldServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handler = getattr(self, f'_handle_{url.path.strip("/")}', None)
+        self.field_server.count_request()
+        if handler is None:
+            self.__send_json({'error': f'unknown endpoint {url.path}'}, status=404)
+            return
+        try:
+            handler(params)
+        except FileNotFoundError as error:
+            self.__send_json({'error': str(error), 'type': 'FileNotFoundError'}, status=404)
+        except (KeyError, TypeError, ValueError) as error:
+            self.__send_json({'error': str(error), 'type': 'ValueError'}, status=400)
+        except Exception as error:
+            # Any other failure (e.g. MemoryError on a large request) is answered too, instead of dropping the
+            # connection
+            self.__send_json({'error': str(error), 'type': type(error).__name__}, status=500)
+
+    def log_message(self, format, *args) -> None:
+        # The requests are not logged on stderr
+        pass
+
+    def _handle_health(self, params: dict) -> None:
+        self.__send_json({'status': 'ok', 'requests': self.field_server.requests})
+
+    def _handle_stats(self, params: dict) -> None:
+        post_process = self.field_server.get_post_process(*_get_case(params))
+        stats = post_process.get_fields_stats()
+        quantities = [params['quantity']] if 'quantity' in params else list(stats)
+        self.__send_json({quantity: stats[quantity].to_dict() for quantity in quantities})
+
+    def _handle_window(self, params: dict) -> None:
+        St, ID_MACH = _get_case(params)
+        post_process = self.field_server.get_post_process(St, ID_MACH)
+        x_slice, r_slice = post_process.get_window(**_get_window(params))
+        values = self.field_server.get_field(St, ID_MACH, params.get('field', 'total'), params['quantity'],
+                                             float(params.get('t', 0)), float(params.get('epsilon', 0.01)))
+        self.__send_arrays(params, x=post_process.x_grid[x_slice], r=post_process.r_grid[r_slice],
+                           values=values[x_slice, r_slice])
+
+    def _handle_line(self, params: dict) -> None:
+        St, ID_MACH = _get_case(params)
+        post_process = self.field_server.get_post_process(St, ID_MACH)
+        x_idxs = _get_list(params, 'x_idx', int)
+        if any(not 0 <= x_idx < len(post_process.x_grid) for x_idx in x_idxs):
+            raise ValueError(f"x_idx must be integers in [0, {len(post_process.x_grid) - 1}]")
+        values = self.field_server.get_field(St, ID_MACH, params.get('field', 'total'), params['quantity'],
+                                             float(params.get('t', 0)), float(params.get('epsilon', 0.01)))
+        self.__send_arrays(params, x=post_process.x_grid[x_idxs], r=post_process.r_grid, values=values[x_idxs])
+
+    def _handle_probe(self, params: dict) -> None:
+        St, ID_MACH = _get_case(params)
+        post_process = self.field_server.get_post_process(St, ID_MACH)
+        x, r = _get_list(params, 'x', float), _get_list(params, 'r', float)
+        if len(x) != len(r) or not x:
+            raise ValueError("x and r must have the same number of points")
+        # A path needs two points: a single probe is duplicated
+        path = LinePath(x + x[-1:], r + r[-1:])
+        extractor = PathExtractor(path, post_process.x_grid, post_process.r_grid)
+        values = self.field_server.get_field(St, ID_MACH, params.get('field', 'total'), params['quantity'],
+                                             float(params.get('t', 0)), float(params.get('epsilon', 0.01)))
+        self.__send_arrays(params, values=extractor(values)[:len(x)])
+
+    def _handle_total(self, params: dict) -> None:
+        St, ID_MACH = _get_case(params)
+        post_process = self.field_server.get_post_process(St, ID_MACH)
+        _check_quantity(params['quantity'], PerturbationField.rans_quantities)
+        ts = _get_list(params, 'ts', float)
+        if any(not 0 <= t <= 100 for t in ts):
+            raise ValueError("ts should be percentages between 0 and 100.")
+        # Without window, the whole domain is returned
+        window = _get_window(params)
+        x_slice, r_slice = (post_process.get_window(**window) if any(name in params for name in window)
+                            else (slice(None), slice(None)))
+        totals = self.field_server.get_total_fields(St, ID_MACH, ts, float(params.get('epsilon', 0.01)))
+        self.__send_arrays(params, t=np.asarray(ts), x=post_process.x_grid[x_slice], r=post_process.r_grid[r_slice],
+                           values=totals[params['quantity']][:, x_slice, r_slice])
+
+    def __send_arrays(self, params: dict, **arrays) -> None:
+        dtype = np.dtype(params.get('dtype', 'float64'))
+        if dtype.kind != 'f':
+            raise ValueError("dtype must be a floating type, e.g. float32 or float64")
+        # The complex arrays stay complex, with the precision of dtype
+        arrays = {name: np.asarray(array) for name, array in arrays.items()}
+        arrays = {name: array.astype(np.result_type(dtype, np.complex64) if np.iscomplexobj(array) else dtype,
+                                     copy=False)
+                  for name, array in arrays.items()}
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        self.__send(buffer.getvalue(), 'application/octet-stream')
+
+    def __send_json(self, payload: dict, status: int = 200) -> None:
+        self.__send(json.dumps(payload).encode(), 'application/json', status)
+
+    def __send(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _get_case(params: dict) -> tuple[float, int]:
+    St = float(params['St'])
+    return int(St) if St.is_integer() else St, int(params['case'])
+
+
+def _get_window(params: dict) -> dict[str, float]:
+    defaults = {'x_min': 0, 'x_max': 10, 'r_min': 0, 'r_max': 3}
+    return {name: float(params.get(name, default)) for name, default in defaults.items()}
+
+
+def _get_list(params: dict, name: str, convert) -> list:
+    return [convert(value) for value in params[name].split(',') if value]
+
+
+def _check_quantity(quantity: str, quantities: list[str]) -> None:
+    if quantity not in quantities:
+        raise ValueError(f"quantity not valid - choose among {quantities}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = FieldServer(args.host, args.port)
+    print(f"Serving the fields on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Command-line interface of the pipeline, for batch jobs (cluster scripts) without notebooks or plot windows.
+
+Every subcommand works on a selection of Strouhal numbers and cases and spreads the (St, case) pairs over `--jobs`
+processes:
+
+- ingest:  read the native files of each case and store the PSE grid, the raw perturbation frames, the stability data
+           and the interpolated RANS values in one NumPy archive, fast to reload with `np.load`;
+- compute: total fields over a grid of phases and amplitudes, stored as arrays of shape (n_t, nx, nr);
+
+  both store compressed files (`.jtz`, read with `src.toolbox.compression.load_compressed`) with `--rel-error` or
+  `--abs-error`, the largest error of the stored fields;
+- export:  RANS, PSE or total fields and statistics as CSV files;
+- render:  figures of the fields, drawn headlessly and saved as PNG;
+
+  the total fields are exported and rendered for every phase of --t and amplitude of --epsilon.
+
+Usage
+-----
+jet-turbulent ingest [--St 0.4 1.0] [--cases 1 3-5] [--jobs 4]
+jet-turbulent compute --n-phases 20 --epsilon 0.01 0.05 [--St all] [--cases all] [--jobs 4] [--rel-error 1e-3]
+jet-turbulent export --field total --t 25 --stats [--quantities ux ur]
+jet-turbulent render --field total --quantities ux ur --x-max 8 --r-max 2 [--raster]
+
+Without installation: python -m src.cli <subcommand> ...
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+QUANTITIES = ['rho', 'ux', 'ur', 'ut', 'p']
+
+
+def parse_cases(selectors: list[str]) -> list[int]:
+    """
+    Return the case IDs selected by a list of IDs, ranges ('3-5') or 'all'.
+    """
+    from src.toolbox.path_directories import get_case_number
+
+    cases = set()
+    for selector in selectors:
+        if selector == 'all':
+            cases.update(range(1, get_case_number() + 1))
+        elif '-' in selector:
+            first, last = selector.split('-')
+            cases.update(range(int(first), int(last) + 1))
+        else:
+            cases.add(int(selector))
+    if not cases or min(cases) <= 0:
+        raise ValueError("the case IDs must be positive integers")
+    return sorted(cases)
+
+
+def parse_strouhal(selectors: list[str]) -> list[float]:
+    """
+    Return the Strouhal numbers selected by a list of values or 'all' (every `St<XX>` directory of the data).
+    """
+    from src.toolbox.path_directories import DIR_STABILITY
+
+    strouhal = set()
+    for selector in selectors:
+        if selector == 'all':
+            strouhal.update(int(directory.name[2:]) / 10 for directory in DIR_STABILITY.glob('St[0-9][0-9]'))
+        else:
+            strouhal.add(float(selector))
+    if not strouhal:
+        raise ValueError(f"no Strouhal number found in {DIR_STABILITY}")
+    return sorted(strouhal)
+
+
+def get_case_dir(out_dir: Path, St: float, ID_MACH: int) -> Path:
+    """
+    Return the output directory of a case, e.g. `<out_dir>/St04/case_1`.
+    """
+    case_dir = Path(out_dir) / "St{:02d}".format(int(10 * St)) / f'case_{ID_MACH}'
+    case_dir.mkdir(parents=True, exist_ok=True)
+    return case_dir
+
+
+def ingest_case(St: float, ID_MACH: int, args: argparse.Namespace) -> list[Path]:
+    """
+    Store the grids, raw perturbation frames, stability data and interpolated RANS values of a case in
+    `fields.npz` (`fields.jtz` if compressed). The arrays are named '<group>/<quantity>', e.g. 'pse/Re(ux)' or
+    'rans/ux'.
+    """
+    from src.Field.perturbation_field import PerturbationField
+    from src.ReadData.read_radius import get_r_grid
+
+    perturbation_field = PerturbationField(St, ID_MACH)
+    stability_data = perturbation_field.get_stability_data()
+    arrays = {'x': perturbation_field.x_grid, 'r': get_r_grid()}
+    arrays.update({f'pse/{quantity}': value.to_numpy() for quantity, value in perturbation_field.values.items()})
+    arrays.update({f'rans/{quantity}': value.to_numpy() for quantity, value in perturbation_field.rans_values.items()})
+    arrays.update({f'stability/{quantity}': stability_data[quantity].to_numpy() for quantity in stability_data})
+
+    # The grids, 1-D, are kept exact when the fields are compressed
+    return [save_arrays(get_case_dir(args.out, St, ID_MACH) / 'fields', arrays, args,
+                        metadata={'St': St, 'ID_MACH': ID_MACH})]
+
+
+def compute_case(St: float, ID_MACH: int, args: argparse.Namespace) -> list[Path]:
+    """
+    Compute the total fields of a case over the grid of phases for every epsilon and store them in
+    `total_eps<epsilon>.npz` (`.jtz` if compressed), one array of shape (n_t, nx, nr) per quantity along with the
+    phases `t`.
+    """
+    from src.Field.perturbation_field import PerturbationField
+
+    perturbation_field = PerturbationField(St, ID_MACH)
+    ts = get_phases(args)
+    paths = []
+    for epsilon in args.epsilon:
+        total_fields = perturbation_field.compute_total_fields(ts, epsilon)
+        arrays = {'t': ts, **{quantity: total_fields[quantity] for quantity in args.quantities}}
+        paths.append(save_arrays(get_case_dir(args.out, St, ID_MACH) / f'total_eps{epsilon:g}', arrays, args,
+                                 metadata={'St': St, 'ID_MACH': ID_MACH, 'epsilon': epsilon}))
+    return paths
+
+
+def save_arrays(path: Path, arrays: dict[str, np.ndarray], args: argparse.Namespace, metadata: dict) -> Path:
+    """
+    Store arrays in `<path>.npz`, or in the compressed `<path>.jtz` when an error bound is given (`--abs-error`,
+    `--rel-error`), see `src.toolbox.compression`.
+    """
+    if args.abs_error is None and args.rel_error is None:
+        path = path.with_name(f'{path.name}.npz')
+        np.savez(path, **arrays)
+        return path
+
+    from src.toolbox.compression import save_compressed
+
+    return save_compressed(path.with_name(f'{path.name}.jtz'), arrays, args.abs_error, args.rel_error, args.codec,
+                           metadata=metadata)
+
+
+def export_case(St: float, ID_MACH: int, args: argparse.Namespace) -> list[Path]:
+    """
+    Export the selected field of a case as one CSV file per quantity (rows along x, columns along r) and, if
+    requested, the statistics of the RANS values. The total field is exported for every phase and epsilon, see
+    `get_field_name`.
+    """
+    import pandas as pd
+
+    from src.Field.post_process import PostProcess
+
+    post_process = PostProcess(St, ID_MACH)
+    case_dir = get_case_dir(args.out, St, ID_MACH)
+    match args.field:
+        case 'rans':
+            fields = [(get_field_name('rans', quantity), post_process.perturbation_field.rans_values[quantity])
+                      for quantity in args.quantities]
+        case 'pse':
+            amplitude = post_process.perturbation_field.compute_complex_amplitude()
+            fields = [(get_field_name('pse', quantity), amplitude[quantity]) for quantity in args.quantities]
+        case 'total':
+            fields = []
+            for epsilon in args.epsilon:
+                total_fields = post_process.perturbation_field.compute_total_fields(args.t, epsilon)
+                fields.extend((get_field_name('total', quantity, t, epsilon),
+                               pd.DataFrame(total_fields[quantity][k]))
+                              for quantity in args.quantities for k, t in enumerate(args.t))
+    paths = []
+    for name, value in fields:
+        path = case_dir / f'{name}.csv'
+        frame = value.copy()
+        frame.index, frame.columns = post_process.x_grid, post_process.r_grid
+        frame.rename_axis(index='x', columns='r').to_csv(path)
+        paths.append(path)
+
+    if args.stats:
+        for quantity, stats in post_process.get_fields_stats().items():
+            path = case_dir / f'stats_{quantity}.csv'
+            stats.to_csv(path)
+            paths.append(path)
+    return paths
+
+
+def render_case(St: float, ID_MACH: int, args: argparse.Namespace) -> list[Path]:
+    """
+    Render the selected field of a case for every quantity with the Agg backend and save the figures as PNG. The
+    total field is rendered for every phase and epsilon, see `get_field_name`.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+
+    from src.Field.post_process import PostProcess
+
+    post_process = PostProcess(St, ID_MACH)
+    case_dir = get_case_dir(args.out, St, ID_MACH)
+    # Only the total field depends on the phase and the amplitude
+    phases = [(t, epsilon) for epsilon in args.epsilon for t in args.t] if args.field == 'total' else [(None, None)]
+    paths = []
+    for t, epsilon in phases:
+        if t is not None:
+            post_process.t, post_process.epsilon = t, epsilon
+        for quantity in args.quantities:
+            name_value = f'abs({quantity})' if args.field == 'pse' else quantity
+            fig = post_process.plot_field(args.field, name_value, x_min=args.x_min, x_max=args.x_max,
+                                          r_min=args.r_min, r_max=args.r_max, show=False, raster=args.raster)
+            path = case_dir / f'{get_field_name(args.field, quantity, t, epsilon)}.png'
+            fig.savefig(path, dpi=args.dpi)
+            plt.close(fig)
+            paths.append(path)
+    return paths
+
+
+def get_field_name(field: str, quantity: str, t: Optional[float] = None, epsilon: Optional[float] = None) -> str:
+    """
+    Return the name of the exported files of a field, e.g. 'rans_ux', or 'total_ux_t25_eps0.01' for a total field
+    at the phase t and the amplitude epsilon.
+    """
+    if field != 'total':
+        return f'{field}_{quantity}'
+    return f'{field}_{quantity}_t{t:g}_eps{epsilon:g}'
+
+
+def get_phases(args: argparse.Namespace) -> np.ndarray:
+    """
+    Return the phases (in percentage of the period) given by --t, or --n-phases phases spread over a period.
+    """
+    if args.n_phases is not None:
+        return np.linspace(0, 100, args.n_phases, endpoint=False)
+    return np.asarray(args.t, dtype=float)
+
+
+def run_tasks(task: Callable, pairs: list[tuple[float, int]], args: argparse.Namespace) -> tuple[list[Path], int]:
+    """
+    Run a task on every (St, case) pair, in the current process if `--jobs 1` and in a pool of processes otherwise.
+    A failed pair is reported and does not stop the other ones.
+
+    Returns
+    -------
+    tuple[list[Path], int]
+        The files written and the number of failed pairs.
+
+    Raises
+    ------
+    ValueError
+        If the number of processes is not a positive integer.
+    """
+    if not isinstance(args.jobs, int) or args.jobs < 1:
+        raise ValueError("jobs must be a positive integer")
+    paths = []
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) if args.jobs != 1 else nullcontext() as executor:
+        if executor is None:
+            results = ((pair, _call(task, *pair, args)) for pair in pairs)
+        else:
+            futures = [(pair, executor.submit(_call, task, *pair, args)) for pair in pairs]
+            results = ((pair, _get_result(future)) for pair, future in futures)
+
+        for (St, ID_MACH), (task_paths, error) in results:
+            if error is not None:
+                failures += 1
+                print(f"St {St} case {ID_MACH}: failed - {error}", file=sys.stderr)
+                continue
+            paths.extend(task_paths)
+            if args.verbose:
+                print(f"St {St} case {ID_MACH}: {len(task_paths)} file(s) written")
+
+    print(f"{len(paths)} file(s) written to {args.out} - {failures} failed task(s)")
+    return paths, failures
+
+
+def _call(task: Callable, St: float, ID_MACH: int, args: argparse.Namespace) -> tuple[list[Path], Optional[str]]:
+    try:
+        return task(St, ID_MACH, args), None
+    except Exception as error:
+        return [], f"{type(error).__name__}: {error}"
+
+
+def _get_result(future: Future) -> tuple[list[Path], Optional[str]]:
+    # The errors of the pool itself (e.g. a worker killed by the system, BrokenProcessPool) fail the pair too
+    try:
+        return future.result()
+    except Exception as error:
+        return [], f"{type(error).__name__}: {error}"
+
+
+def positive_int(value: str) -> int:
+    """
+    Return a strictly positive integer given on the command line.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def get_parser() -> argparse.ArgumentParser:
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--St', nargs='+', default=['all'],
+                           help="Strouhal numbers, or 'all' for every St directory of the data (default)")
+    selection.add_argument('--cases', nargs='+', default=['all'],
+                           help="case IDs, ranges such as 3-5, or 'all' (default)")
+    selection.add_argument('--jobs', '-j', type=positive_int, default=1, help='number of processes (default 1)')
+    selection.add_argument('--data', type=Path, default=None,
+                           help='data directory (default: JET_TURBULENT_DATA or, from the repository, its Data '
+                                'directory; required by an installed package)')
+    selection.add_argument('--out', type=Path, default=None,
+                           help='output directory (default: Output/cli/<command> of the repository or, for an '
+                                'installed package, of the working directory)')
+    selection.add_argument('--verbose', '-v', action='store_true')
+
+    storage = argparse.ArgumentParser(add_help=False)
+    storage.add_argument('--abs-error', type=float, default=None,
+                         help='store the fields compressed (.jtz) with this largest absolute error')
+    storage.add_argument('--rel-error', type=float, default=None,
+                         help='store the fields compressed (.jtz) with this largest error relative to the largest '
+                              'magnitude of each field')
+    storage.add_argument('--codec', choices=['zlib', 'lzma'], default='zlib',
+                         help='lossless stage of the compression (default zlib)')
+
+    phases = argparse.ArgumentParser(add_help=False)
+    phases.add_argument('--t', type=float, nargs='+', default=[0], help='phases in percentage of the period')
+    phases.add_argument('--epsilon', type=float, nargs='+', default=[0.01], help='amplitudes of the perturbation')
+    phases.add_argument('--quantities', nargs='+', choices=QUANTITIES, default=QUANTITIES)
+
+    parser = argparse.ArgumentParser(prog='jet-turbulent', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('ingest', parents=[selection, storage],
+                          help='store the fields of each case as a NumPy archive')
+
+    compute = subparsers.add_parser('compute', parents=[selection, phases, storage],
+                                     help='compute the total fields over a grid of phases and epsilons')
+    compute.add_argument('--n-phases', type=positive_int, default=None,
+                         help='number of phases over a period (overrides --t)')
+
+    export = subparsers.add_parser('export', parents=[selection, phases], help='export fields and statistics as CSV')
+    export.add_argument('--field', choices=['rans', 'pse', 'total'], default='total')
+    export.add_argument('--stats', action='store_true', help='also export the statistics of the RANS values')
+
+    render = subparsers.add_parser('render', parents=[selection, phases], help='save figures of the fields as PNG')
+    render.add_argument('--field', choices=['rans', 'pse', 'total'], default='total')
+    render.add_argument('--x-min', type=float, default=0)
+    render.add_argument('--x-max', type=float, default=10)
+    render.add_argument('--r-min', type=float, default=0)
+    render.add_argument('--r-max', type=float, default=5)
+    render.add_argument('--dpi', type=int, default=150)
+    render.add_argument('--raster', action='store_true', help='draw an image instead of a filled contour')
+
+    return parser
+
+
+TASKS = {'ingest': ingest_case, 'compute': compute_case, 'export': export_case, 'render': render_case}
+
+
+def main(argv=None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.data is not None:
+        # Set before the pipeline modules are imported, and inherited by the worker processes
+        os.environ['JET_TURBULENT_DATA'] = str(args.data.resolve())
+
+    from src.toolbox.path_directories import DIR_OUT, IS_INSTALLED
+
+    if IS_INSTALLED and 'JET_TURBULENT_DATA' not in os.environ:
+        parser.error("the installed package has no data directory: give it with --data or JET_TURBULENT_DATA")
+
+    args.out = Path(args.out) if args.out is not None else DIR_OUT / 'cli' / args.command
+    try:
+        pairs = [(St, ID_MACH) for St in parse_strouhal(args.St) for ID_MACH in parse_cases(args.cases)]
+    except ValueError as error:
+        raise SystemExit(str(error))
+
+    _, failures = run_tasks(TASKS[args.command], pairs, args)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,8 @@
 from scipy.io import savemat
 
-from Field.perturbation_field import PerturbationField
+from src.Field.perturbation_field import PerturbationField
 from src.Field.post_process import PostProcess
-from toolbox.path_directories import DIR_OUT
+from src.toolbox.path_directories import DIR_OUT
 
 # Instanciation d'un objet PostProcess
 postpross_04_001 = PostProcess(0.4, 1, epsilon=0.01, t=0)
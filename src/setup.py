@@ -1,10 +1,14 @@
-from distutils.core import setup
+from setuptools import setup
 
 setup(
     name='Turbulent_Jet',
-    packages=['toolbox', 'ReadData', 'Field'],
+    # The modules import each other through the `src` package, which is this directory
+    packages=['src', 'src.toolbox', 'src.ReadData', 'src.Field', 'src.Plot', 'src.Benchmark', 'src.Server',
+              'src.Analysis'],
     version='',
-    package_dir={'': 'src'},
+    package_dir={'src': '.'},
+    install_requires=['numpy', 'pandas', 'scipy', 'matplotlib', 'psutil'],
+    entry_points={'console_scripts': ['jet-turbulent = src.cli:main']},
     url='',
     license='',
     author='melti',
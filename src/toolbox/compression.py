@@ -0,0 +1,370 @@
+"""
+Error-bounded lossy compression of fields (mean flows, complex PSE amplitudes, total fields) for storage and
+transfer.
+
+Each array is compressed in two stages:
+
+1. quantization: the values are rounded to a uniform grid of step 2 * bound, so that every decoded value is within
+   `bound` of the original one. The bound is absolute (`abs_error`) or relative to the largest magnitude of the array
+   (`rel_error`); the real and imaginary parts of a complex array are quantized with bound / sqrt(2), which bounds
+   the error on the modulus. The integers are stored on 8, 16 or 32 bits depending on the number of levels;
+2. lossless coding: the integers are replaced by their residuals to the 2-D Lorenzo predictor
+   q[i - 1, j] + q[i, j - 1] - q[i - 1, j - 1] over the last two axes (small for smooth fields), their bytes are
+   shuffled (the most significant bytes, mostly zero, are stored together) and the result is compressed with zlib or
+   lzma of the standard library.
+
+The decoding is vectorized: the inverse of the predictor is a cumulative sum over the last two axes. The grids and
+other 1-D arrays (phases, stability data) are stored losslessly. Non-finite values are kept exactly.
+
+The compressed arrays of a file (`.jtz`) follow a JSON header describing them, so that one array can be read without
+decoding the others.
+
+Usage
+-----
+python -m src.toolbox.compression FIELDS.npz [--out FIELDS.jtz] [--rel-error 1e-3 | --abs-error 1e-4] [--codec lzma]
+
+compresses the arrays of a NumPy archive (e.g. written by `jet-turbulent ingest` or `compute`) and reports the
+compression ratio and the actual errors.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import lzma
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from src.toolbox.lazy_import import LazyModule
+
+pd = LazyModule('pandas')
+
+CODECS = ('zlib', 'lzma')
+
+MAGIC = b'JTZ1'
+
+# The quantization step is slightly smaller than twice the bound, so that the round-off of the decoding (and of the
+# cast back to single precision) cannot exceed the bound: by this number of machine epsilons of the largest magnitude
+_ROUND_OFF_MARGIN = 4
+
+_INTEGER_TYPES = (np.uint8, np.uint16, np.uint32)
+
+
+def compress_arrays(arrays: dict[str, np.ndarray], abs_error: Optional[float] = None,
+                    rel_error: Optional[float] = None, codec: str = 'zlib', level: Optional[int] = None,
+                    metadata: Optional[dict] = None, lossless: tuple = ()) -> bytes:
+    """
+    Compress arrays with an error bound.
+
+    Parameters
+    ----------
+    arrays: dict[str, np.ndarray]
+        Arrays by name, real or complex.
+    abs_error: float, optional
+        Largest absolute error of the decoded values of the arrays of 2 dimensions or more.
+    rel_error: float, optional
+        Largest error relative to the largest magnitude of each array. With both bounds, the smallest one applies;
+        with none, the arrays are stored losslessly.
+    codec: str, optional
+        Lossless stage, 'zlib' or 'lzma'. Default is 'zlib', faster to decode; 'lzma' is about 10% smaller.
+    level: int, optional
+        Compression level of the codec (0 to 9). Default is the default of the codec.
+    metadata: dict, optional
+        JSON-serializable description stored in the header (case, St, epsilon...).
+    lossless: tuple of str, optional
+        Arrays stored losslessly in addition to the 1-D arrays, e.g. grids stored as 2-D fields.
+
+    Returns
+    -------
+    bytes
+        The compressed arrays.
+
+    Raises
+    ------
+    ValueError
+        If a bound is negative, the codec is not valid or a lossless array is not among the arrays.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"codec must be among {CODECS}")
+    unknown = [name for name in lossless if name not in arrays]
+    if unknown:
+        raise ValueError(f"the lossless arrays {unknown} are not in the arrays - arrays are {list(arrays)}")
+    for bound in (abs_error, rel_error):
+        if bound is not None and (not isinstance(bound, (int, float)) or bound < 0):
+            raise ValueError("the error bounds must be positive numbers")
+
+    header = {'codec': codec, 'metadata': metadata or {}, 'arrays': {}}
+    payloads = []
+    offset = 0
+    for name, values in arrays.items():
+        values = np.asarray(values)
+        bound = _get_bound(values, abs_error, rel_error) if values.ndim >= 2 and name not in lossless else 0.0
+        description = {'shape': list(values.shape), 'dtype': values.dtype.str, 'bound': bound, 'components': []}
+
+        finite = np.isfinite(values) if np.issubdtype(values.dtype, np.inexact) else None
+        if finite is not None and not finite.all():
+            index = np.flatnonzero(~finite)
+            raw = np.concatenate([index.astype('<i8').view(np.uint8), values.ravel()[index].view(np.uint8)])
+            payloads.append(_compress(raw.tobytes(), codec, level))
+            description['nonfinite'] = {'count': len(index), 'start': offset, 'size': len(payloads[-1])}
+            offset += len(payloads[-1])
+            values = np.where(finite, values, 0)
+
+        if np.iscomplexobj(values):
+            parts = [('real', values.real), ('imag', values.imag)]
+            part_bound = bound / np.sqrt(2)
+        else:
+            parts = [('value', values)]
+            part_bound = bound
+        for part, part_values in parts:
+            component, payload = _encode_component(part_values, part_bound, codec, level)
+            component.update(part=part, start=offset, size=len(payload))
+            description['components'].append(component)
+            payloads.append(payload)
+            offset += len(payload)
+        header['arrays'][name] = description
+
+    encoded_header = json.dumps(header).encode()
+    return MAGIC + struct.pack('<Q', len(encoded_header)) + encoded_header + b''.join(payloads)
+
+
+def decompress_arrays(data: bytes, names: Optional[list[str]] = None) -> dict[str, np.ndarray]:
+    """
+    Decode compressed arrays.
+
+    Parameters
+    ----------
+    data: bytes
+        Output of `compress_arrays`.
+    names: list of str, optional
+        Arrays to decode. Default is all of them.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The decoded arrays, of their original shapes and types.
+    """
+    header, start = _read_header(data)
+    names = list(header['arrays']) if names is None else names
+    arrays = {}
+    for name in names:
+        if name not in header['arrays']:
+            raise ValueError(f"'{name}' is not in the compressed arrays - arrays are {list(header['arrays'])}")
+        description = header['arrays'][name]
+        shape, dtype = tuple(description['shape']), np.dtype(description['dtype'])
+        parts = {component['part']: _decode_component(
+            data[start + component['start']:start + component['start'] + component['size']], component, shape,
+            header['codec']) for component in description['components']}
+        values = (parts['real'] + 1j * parts['imag']) if 'real' in parts else parts['value']
+        values = values.astype(dtype, copy=False)
+
+        nonfinite = description.get('nonfinite')
+        if nonfinite:
+            raw = _decompress(data[start + nonfinite['start']:start + nonfinite['start'] + nonfinite['size']],
+                              header['codec'])
+            count = nonfinite['count']
+            index = np.frombuffer(raw[:8 * count], dtype='<i8')
+            values = np.array(values)
+            values.ravel()[index] = np.frombuffer(raw[8 * count:], dtype=dtype)
+        arrays[name] = values
+    return arrays
+
+
+def get_compressed_info(data: bytes) -> dict:
+    """
+    Return the header of compressed arrays: codec, metadata, and shape, type, error bound and compressed size of
+    every array.
+    """
+    header, _ = _read_header(data)
+    for description in header['arrays'].values():
+        description['compressed_bytes'] = sum(component['size'] for component in description['components']) + \
+            description.get('nonfinite', {}).get('size', 0)
+    return header
+
+
+def save_compressed(path: Union[str, Path], arrays: dict[str, np.ndarray], abs_error: Optional[float] = None,
+                    rel_error: Optional[float] = None, codec: str = 'zlib', level: Optional[int] = None,
+                    metadata: Optional[dict] = None, lossless: tuple = ()) -> Path:
+    """
+    Compress arrays (see `compress_arrays`) into a `.jtz` file, written atomically.
+    """
+    path = Path(path)
+    data = compress_arrays(arrays, abs_error, rel_error, codec, level, metadata, lossless)
+    tmp_path = path.with_name(f'{path.name}.tmp')
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return path
+
+
+def load_compressed(path: Union[str, Path], names: Optional[list[str]] = None) -> dict[str, np.ndarray]:
+    """
+    Decode the arrays of a `.jtz` file (see `decompress_arrays`).
+    """
+    return decompress_arrays(Path(path).read_bytes(), names)
+
+
+def verify_compression(arrays: dict[str, np.ndarray], data: Union[bytes, str, Path]) -> pd.DataFrame:
+    """
+    Compare original arrays with their compressed version.
+
+    Parameters
+    ----------
+    arrays: dict[str, np.ndarray]
+        The original arrays.
+    data: bytes or path
+        The compressed arrays, or the path of the `.jtz` file.
+
+    Returns
+    -------
+    pd.DataFrame
+        For every array: error bound, largest absolute error, largest error relative to the largest magnitude, root
+        mean square error, original and compressed sizes in bytes, compression ratio and whether the bound is met.
+    """
+    data = data if isinstance(data, bytes) else Path(data).read_bytes()
+    info = get_compressed_info(data)
+    decoded = decompress_arrays(data, list(arrays))
+    rows = {}
+    for name, original in arrays.items():
+        original = np.asarray(original)
+        finite = np.isfinite(original) if np.issubdtype(original.dtype, np.inexact) else np.ones(original.shape, bool)
+        error = np.abs(decoded[name][finite].astype(complex) - original[finite]) if original.size else np.zeros(0)
+        scale = np.abs(original[finite]).max() if error.size else 0
+        description = info['arrays'][name]
+        max_error = float(error.max()) if error.size else 0.0
+        rows[name] = {'bound': description['bound'],
+                      'max_abs_error': max_error,
+                      'max_rel_error': max_error / scale if scale > 0 else 0.0,
+                      'rmse': float(np.sqrt(np.mean(error ** 2))) if error.size else 0.0,
+                      'raw_bytes': original.nbytes,
+                      'compressed_bytes': description['compressed_bytes'],
+                      'ratio': original.nbytes / max(description['compressed_bytes'], 1),
+                      'within_bound': bool(max_error <= description['bound'] or max_error == 0)}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def _get_bound(values: np.ndarray, abs_error: Optional[float], rel_error: Optional[float]) -> float:
+    if not np.issubdtype(values.dtype, np.inexact):
+        return 0.0
+    bounds = [] if abs_error is None else [float(abs_error)]
+    if rel_error is not None:
+        finite = np.abs(values[np.isfinite(values)])
+        bounds.append(float(rel_error) * (float(finite.max()) if finite.size else 0.0))
+    return min(bounds) if bounds else 0.0
+
+
+def _encode_component(values: np.ndarray, bound: float, codec: str, level: Optional[int]) -> tuple[dict, bytes]:
+    """
+    Return the description and payload of a real array: quantized with the bound, or raw if the bound is zero or the
+    values need more than 32 bits.
+    """
+    if bound > 0 and values.size:
+        minimum, maximum = float(values.min()), float(values.max())
+        round_off = _ROUND_OFF_MARGIN * float(np.finfo(values.dtype).eps) * max(abs(minimum), abs(maximum))
+        step = 2 * (bound - round_off)
+        n_levels = int(np.ceil((maximum - minimum) / step)) + 1 if step > 0 else np.inf
+        integer_type = next((dtype for dtype in _INTEGER_TYPES if n_levels <= np.iinfo(dtype).max), None)
+        if integer_type is not None:
+            quantized = np.rint((values - minimum) / step).astype(integer_type)
+            residuals = _predict(quantized)
+            payload = _compress(_shuffle(residuals), codec, level)
+            return {'encoding': 'quantized', 'offset': minimum, 'step': step,
+                    'integer_dtype': np.dtype(integer_type).str}, payload
+    raw = np.ascontiguousarray(values)
+    return {'encoding': 'raw', 'raw_dtype': raw.dtype.str}, _compress(_shuffle(raw), codec, level)
+
+
+def _decode_component(payload: bytes, component: dict, shape: tuple, codec: str) -> np.ndarray:
+    if component['encoding'] == 'raw':
+        return _unshuffle(_decompress(payload, codec), np.dtype(component['raw_dtype']), shape)
+    integer_type = np.dtype(component['integer_dtype'])
+    quantized = _reconstruct(_unshuffle(_decompress(payload, codec), integer_type, shape))
+    return component['offset'] + quantized * component['step']
+
+
+def _predict(quantized: np.ndarray) -> np.ndarray:
+    """
+    Return the residuals of the 2-D Lorenzo predictor over the last two axes (1-D for a 1-D array), in modular
+    arithmetic of the integer type.
+    """
+    residuals = quantized
+    for axis in range(max(quantized.ndim - 2, 0), quantized.ndim):
+        residuals = np.diff(residuals, axis=axis, prepend=np.zeros_like(residuals.take([0], axis=axis)))
+    return residuals
+
+
+def _reconstruct(residuals: np.ndarray) -> np.ndarray:
+    """
+    Inverse of `_predict`: cumulative sums over the last two axes, wrapping in the integer type.
+    """
+    quantized = residuals
+    for axis in range(max(residuals.ndim - 2, 0), residuals.ndim):
+        quantized = np.cumsum(quantized, axis=axis, dtype=residuals.dtype)
+    return quantized
+
+
+def _shuffle(values: np.ndarray) -> bytes:
+    """
+    Return the bytes of an array grouped by significance: all the first bytes, then all the second bytes...
+    """
+    values = np.ascontiguousarray(values)
+    return values.reshape(-1).view(np.uint8).reshape(-1, values.dtype.itemsize).T.tobytes()
+
+
+def _unshuffle(data: bytes, dtype: np.dtype, shape: tuple) -> np.ndarray:
+    grouped = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(grouped.T).view(dtype).reshape(shape)
+
+
+def _compress(data: bytes, codec: str, level: Optional[int]) -> bytes:
+    if codec == 'zlib':
+        return zlib.compress(data, 6 if level is None else level)
+    return lzma.compress(data, preset=6 if level is None else level)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    return zlib.decompress(data) if codec == 'zlib' else lzma.decompress(data)
+
+
+def _read_header(data: bytes) -> tuple[dict, int]:
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("the data are not compressed arrays (wrong magic number)")
+    (length,) = struct.unpack('<Q', data[len(MAGIC):len(MAGIC) + 8])
+    start = len(MAGIC) + 8
+    return json.loads(data[start:start + length]), start + length
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compress the arrays of a NumPy archive with an error bound and "
+                                                 "report the actual errors.")
+    parser.add_argument('input', type=Path, help='NumPy archive (.npz)')
+    parser.add_argument('--out', type=Path, default=None, help='compressed file (default: the input with .jtz)')
+    parser.add_argument('--abs-error', type=float, default=None, help='largest absolute error')
+    parser.add_argument('--rel-error', type=float, default=None,
+                        help='largest error relative to the largest magnitude of each array (default 1e-3)')
+    parser.add_argument('--codec', choices=CODECS, default='zlib')
+    parser.add_argument('--level', type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.abs_error is None and args.rel_error is None:
+        args.rel_error = 1e-3
+
+    with np.load(args.input) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    out = args.out if args.out is not None else args.input.with_suffix('.jtz')
+    save_compressed(out, arrays, args.abs_error, args.rel_error, args.codec, args.level,
+                    metadata={'source': args.input.name})
+
+    report = verify_compression(arrays, out)
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 200):
+        print(report)
+    raw_bytes, compressed_bytes = args.input.stat().st_size, out.stat().st_size
+    print(f"{args.input.name}: {raw_bytes} bytes -> {out.name}: {compressed_bytes} bytes "
+          f"(ratio {raw_bytes / max(compressed_bytes, 1):.1f})")
+    return 0 if report['within_bound'].all() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Small dependency graph of memoized computations. The inputs are set with `set`, the nodes are functions of inputs
+and other nodes, computed on demand and kept until one of their ancestors changes: setting an input invalidates
+exactly the nodes depending on it, directly or not, and nothing else.
+
+Examples
+--------
+>>> graph = ComputeGraph()
+>>> graph.add_input('t', 0)
+>>> graph.add_node('phase', lambda t: np.exp(-2j * np.pi * t / 100), ['t'])
+>>> graph.get('phase')
+>>> graph.set('t', 25)
+>>> graph.get_log()
+['phase']
+"""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import numpy as np
+
+from src.toolbox.tracing import span
+
+_MISSING = object()
+
+
+class ComputeGraph:
+    """
+    Dependency graph of inputs and memoized nodes.
+
+    Attributes
+    ----------
+    computations : dict[str, int]
+        Number of times each node was computed.
+
+    Methods
+    -------
+    add_input(name: str, value: Any)
+        Adds an input.
+    add_node(name: str, function: Callable, dependencies: list[str] = ())
+        Adds a node computed by `function(*values of the dependencies)`.
+    set(name: str, value: Any) -> list[str]
+        Sets an input and invalidates the nodes depending on it.
+    get(name: str) -> Any
+        Returns the value of an input or a node, computing the stale nodes it depends on.
+    invalidate(name: str) -> list[str]
+        Invalidates a node and the nodes depending on it.
+    is_valid(name: str) -> bool
+        Returns True if the node holds an up-to-date value.
+    get_log(reset: bool = True) -> list[str]
+        Returns the nodes computed since the last reset of the log, in the order of computation.
+    describe() -> str
+        Returns a description of the nodes, their dependencies, state and number of computations.
+    """
+
+    def __init__(self) -> None:
+        self.computations = {}
+        self.__inputs = {}
+        self.__functions = {}
+        self.__dependencies = {}
+        self.__dependents = {}
+        self.__values = {}
+        self.__log = []
+
+    def add_input(self, name: str, value: Any) -> None:
+        """
+        Add an input of the graph.
+        """
+        self.__check_new(name)
+        self.__inputs[name] = value
+        self.__dependents[name] = []
+
+    def add_node(self, name: str, function: Callable, dependencies: list[str] = ()) -> None:
+        """
+        Add a node computed by `function(*values of the dependencies)`.
+
+        Raises
+        ------
+        ValueError
+            If the name is already used or a dependency is unknown.
+        """
+        self.__check_new(name)
+        for dependency in dependencies:
+            if dependency not in self.__dependents:
+                raise ValueError(f"unknown dependency '{dependency}' of '{name}'")
+        self.__functions[name] = function
+        self.__dependencies[name] = list(dependencies)
+        self.__dependents[name] = []
+        self.computations[name] = 0
+        for dependency in dependencies:
+            self.__dependents[dependency].append(name)
+
+    def set(self, name: str, value: Any) -> list[str]:
+        """
+        Set an input. The nodes depending on it are invalidated if the value changed.
+
+        Returns
+        -------
+        list[str]
+            The invalidated nodes.
+        """
+        if name not in self.__inputs:
+            raise ValueError(f"'{name}' is not an input of the graph - inputs are {list(self.__inputs)}")
+        if _is_same(self.__inputs[name], value):
+            return []
+        self.__inputs[name] = value
+        return self.__invalidate_dependents(name)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the value of an input or a node, computing the node and its stale ancestors if needed.
+        """
+        if name in self.__inputs:
+            return self.__inputs[name]
+        if name not in self.__functions:
+            raise ValueError(f"'{name}' is not a node of the graph")
+
+        value = self.__values.get(name, _MISSING)
+        if value is _MISSING:
+            arguments = [self.get(dependency) for dependency in self.__dependencies[name]]
+            with span(f'ComputeGraph.{name}'):
+                value = self.__functions[name](*arguments)
+            self.__values[name] = value
+            self.computations[name] += 1
+            self.__log.append(name)
+        return value
+
+    __getitem__ = get
+
+    def invalidate(self, name: str) -> list[str]:
+        """
+        Invalidate a node and the nodes depending on it.
+
+        Returns
+        -------
+        list[str]
+            The invalidated nodes.
+        """
+        invalidated = [name] if self.__values.pop(name, _MISSING) is not _MISSING else []
+        return invalidated + self.__invalidate_dependents(name)
+
+    def is_valid(self, name: str) -> bool:
+        """
+        Return True if the node holds an up-to-date value (always True for an input).
+        """
+        return name in self.__inputs or name in self.__values
+
+    def get_log(self, reset: bool = True) -> list[str]:
+        """
+        Return the nodes computed since the last reset of the log, in the order of computation.
+        """
+        log = list(self.__log)
+        if reset:
+            self.__log.clear()
+        return log
+
+    def describe(self) -> str:
+        """
+        Return a description of the inputs and nodes: dependencies, state and number of computations.
+        """
+        lines = [f"{name} = {value!r}" for name, value in self.__inputs.items()]
+        for name, dependencies in self.__dependencies.items():
+            state = 'valid' if name in self.__values else 'stale'
+            lines.append(f"{name} <- {', '.join(dependencies) or '-'} [{state}, computed {self.computations[name]}x]")
+        return '\n'.join(lines)
+
+    def __invalidate_dependents(self, name: str) -> list[str]:
+        invalidated = []
+        stack = list(self.__dependents[name])
+        while stack:
+            dependent = stack.pop()
+            if self.__values.pop(dependent, _MISSING) is not _MISSING:
+                invalidated.append(dependent)
+                # The dependents of a stale node are already stale
+                stack.extend(self.__dependents[dependent])
+        return invalidated
+
+    def __check_new(self, name: str) -> None:
+        if name in self.__dependents:
+            raise ValueError(f"'{name}' is already in the graph")
+
+
+def _is_same(value: Any, other: Any) -> bool:
+    """
+    Return True if two values of an input are equal, whatever their types (e.g. 30 and 30.0): arrays are compared
+    element-wise, and values which cannot be compared are only the same if they are the same object.
+    """
+    if isinstance(value, np.ndarray) or isinstance(other, np.ndarray):
+        return np.array_equal(value, other)
+    try:
+        return bool(value == other)
+    except (TypeError, ValueError):
+        return value is other
@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from src.Field.perturbation_field import PerturbationField
+from src.toolbox.lazy_import import LazyModule
+
+scipy_io = LazyModule('scipy.io')
+
+
+def get_stability_case_dirs(data_dir: Path, St: Union[int, float], ID_MACH: int) -> tuple[Path, Path]:
+    """
+    Return the directories of the perturbation field and of the wavenumber files of a case, following the layout
+    of the bundled data, e.g. `Stability/St04/Field/FrancCase_1` and `Stability/St04/alpha/FrancCase_1`.
+    """
+    dir_st = Path(data_dir) / 'Stability' / "St{:02d}".format(int(10 * St))
+    return dir_st / 'Field' / f'FrancCase_{ID_MACH}', dir_st / 'alpha' / f'FrancCase_{ID_MACH}'
+
+
+def write_mean_flow(data_dir: Path, ID_MACH: int, arr: np.ndarray) -> Path:
+    """
+    Write a RANS mean flow as `MeanFlow/mean_<ID_MACH>.mat`.
+
+    Parameters
+    ----------
+    data_dir: Path
+        Root of the dataset.
+    ID_MACH: int
+        Case ID.
+    arr: np.ndarray
+        Array of shape (nx, nr, 8) holding x/D, r/D, rho, ux, ur, ut, T and p as read by `RansField`.
+    """
+    path = Path(data_dir) / 'MeanFlow' / f'mean_{ID_MACH}.mat'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scipy_io.savemat(path, {'arr': arr})
+    return path
+
+
+def write_perturbation_field(data_dir: Path, St: Union[int, float], ID_MACH: int, x: np.ndarray, r: np.ndarray,
+                             values: dict[str, np.ndarray]) -> Path:
+    """
+    Write a PSE perturbation field as a Tecplot point file `pertpse_FrancCase_<ID_MACH>.dat`.
+
+    Parameters
+    ----------
+    data_dir: Path
+        Root of the dataset.
+    St: int or float
+        Strouhal number.
+    ID_MACH: int
+        Case ID.
+    x: np.ndarray
+        x-coordinates of the PSE grid (nx,).
+    r: np.ndarray
+        r-coordinates of the PSE grid (nr,).
+    values: dict[str, np.ndarray]
+        Arrays of shape (nx, nr) for every quantity of `PerturbationField.pse_quantities[2:]`.
+    """
+    dir_field, _ = get_stability_case_dirs(data_dir, St, ID_MACH)
+    path = dir_field / f'pertpse_FrancCase_{ID_MACH}.dat'
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    nx, nr = len(x), len(r)
+    columns = [np.repeat(x, nr), np.tile(r, nx)]
+    columns += [np.asarray(values[quantity]).ravel() for quantity in PerturbationField.pse_quantities[2:]]
+    header = (f'Title = "Perturbations du champ moyen, PSE linéaire Jet compressible - Rans Francisco n = 0, '
+              f'st = {St:7.4f}"\n'
+              f'Variables = {", ".join(PerturbationField.pse_quantities)}\n'
+              f'Zone T = "_FrancCase_{ID_MACH} perturbations PSE",I = {nr:3d}, J = {nx:3d}, F = point')
+    np.savetxt(path, np.column_stack(columns), fmt='%15.8E', header=header, comments='')
+    return path
+
+
+def write_stability_data(data_dir: Path, St: Union[int, float], ID_MACH: int,
+                         values: dict[str, np.ndarray]) -> Path:
+    """
+    Write the PSE wavenumber data as a Tecplot point file `vappse_FrancCase_<ID_MACH>.dat`.
+
+    Parameters
+    ----------
+    data_dir: Path
+        Root of the dataset.
+    St: int or float
+        Strouhal number.
+    ID_MACH: int
+        Case ID.
+    values: dict[str, np.ndarray]
+        Arrays of shape (nx,) for every quantity of `PerturbationField.stability_quantities`.
+    """
+    _, dir_alpha = get_stability_case_dirs(data_dir, St, ID_MACH)
+    path = dir_alpha / f'vappse_FrancCase_{ID_MACH}.dat'
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    columns = [np.asarray(values[quantity]) for quantity in PerturbationField.stability_quantities]
+    header = (f'Title = "Nombre d\'onde, PSE linéaire - Jet compressible - Rans Francisco n = 0, st = {St:7.4f}"\n'
+              f'Variables = {", ".join(PerturbationField.stability_quantities)}\n'
+              f'Zone T = "_FrancCase_{ID_MACH} nombre d\'onde PSE",I = {len(columns[0]):3d}, F = point')
+    np.savetxt(path, np.column_stack(columns), fmt='%25.16E', header=header, comments='')
+    return path
+
+
+def write_reference_values(data_dir: Path, reference_values: np.ndarray) -> Path:
+    """
+    Write `info.dat`, the reference values ux, rho, T and P of every case (one row per case, in the order of the
+    case IDs).
+    """
+    path = Path(data_dir) / 'info.dat'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savetxt(path, reference_values, fmt='%.16f', delimiter='   ',
+               header='      ux                      rho                   T                      P', comments='#')
+    return path
+
+
+def write_mach_numbers(data_dir: Path, mach_numbers: np.ndarray) -> Path:
+    """
+    Write `Mach.dat`, the Mach number of every case, preceded by its ID.
+    """
+    path = Path(data_dir) / 'Mach.dat'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as file:
+        file.writelines(f'{ID} {mach:.5f}\n' for ID, mach in enumerate(mach_numbers, start=1))
+    return path
+
+
+def write_r_grid(data_dir: Path, r: np.ndarray) -> Path:
+    """
+    Write `RANS69pt.dat`, the r grid shared by the RANS and PSE fields.
+    """
+    path = Path(data_dir) / 'RANS69pt.dat'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savetxt(path, r, fmt='%.16f  ')
+    return path
@@ -0,0 +1,323 @@
+"""
+Persistent cache of the derived products (RANS values interpolated on the PSE grid, fields converted to another
+reference, statistics...), shared by all the processes using the same directory.
+
+The key of a product is the hash of its name, of the content of its inputs (data files, arrays, parameters) and of
+the source code of the functions producing it, so that a change of the data or of the code invalidates it. The
+products are pickled and written atomically (temporary file and rename), the total size of the cache is capped and
+the least recently used products are evicted first.
+
+The pipeline uses the default cache, disabled unless the JET_TURBULENT_CACHE environment variable is set ('1' for
+`Output/derived_cache`, or a directory) or `set_default_cache` is called.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from src.toolbox.lazy_import import LazyModule
+from src.toolbox.path_directories import DIR_OUT
+
+pd = LazyModule('pandas')
+
+_file_digests = {}
+_file_digests_lock = threading.Lock()
+
+
+def hash_file(path: Path) -> str:
+    """
+    Return the SHA-256 digest of the content of a file. The digest is memoized for the size and modification time
+    of the file, so that a file is read once per process.
+    """
+    stat = os.stat(path)
+    identity = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+    with _file_digests_lock:
+        if identity in _file_digests:
+            return _file_digests[identity]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 ** 2), b''):
+            digest.update(chunk)
+    with _file_digests_lock:
+        _file_digests[identity] = digest.hexdigest()
+    return _file_digests[identity]
+
+
+def hash_inputs(inputs: Any) -> str:
+    """
+    Return the SHA-256 digest of the content of the inputs of a product: files (Path), arrays, DataFrames, Series,
+    and lists, tuples and dicts of them or of JSON-serializable values.
+    """
+    digest = hashlib.sha256()
+    _update_digest(digest, inputs)
+    return digest.hexdigest()
+
+
+def _update_digest(digest, value) -> None:
+    if isinstance(value, Path):
+        digest.update(b'file' + hash_file(value).encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'array{value.dtype.str}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(f'{type(value).__name__}'.encode())
+        _update_digest(digest, value.to_numpy())
+        _update_digest(digest, value.index.to_numpy())
+        if isinstance(value, pd.DataFrame):
+            _update_digest(digest, value.columns.to_numpy())
+    elif isinstance(value, dict):
+        digest.update(b'dict')
+        for key in sorted(value, key=str):
+            digest.update(str(key).encode())
+            _update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'list{len(value)}'.encode())
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_version(*producers: Callable) -> str:
+    """
+    Return a digest of the source code of the functions (or classes) producing a derived product. The bytecode is
+    used when the source is not available. The digests are memoized for the process.
+    """
+    digest = hashlib.sha256()
+    for producer in producers:
+        try:
+            digest.update(inspect.getsource(producer).encode())
+        except (OSError, TypeError):
+            digest.update(getattr(producer, '__code__', producer).__repr__().encode())
+            digest.update(getattr(getattr(producer, '__code__', None), 'co_code', b''))
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent cache of derived products.
+
+    Attributes
+    ----------
+    directory : Path
+        Directory where the products are stored.
+    max_bytes : int
+        Maximum total size of the cached products.
+    hits : int
+        Number of products read from the cache.
+    misses : int
+        Number of products computed.
+    counters : dict[str, dict[str, int]]
+        Hits and misses of each product name.
+
+    Methods
+    -------
+    get_or_compute(name: str, inputs: Any, compute: Callable, version: str = '') -> Any
+        Returns the cached product or computes and stores it.
+    get_key(name: str, inputs: Any, version: str = '') -> str
+        Computes the key of a product.
+    get_size() -> int
+        Returns the total size of the cached products.
+    clear()
+        Removes every cached product.
+    """
+
+    suffix = '.pkl'
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = 2 * 1024 ** 3) -> None:
+        """
+        Parameters
+        ----------
+        directory: Path, optional
+            Directory where the products are stored. Default is `Output/derived_cache`.
+        max_bytes: int, optional
+            Maximum total size of the cached products. Default is 2 GB.
+        """
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+
+        self.directory = Path(DIR_OUT / 'derived_cache' if directory is None else directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.counters = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def get_key(name: str, inputs: Any, version: str = '') -> str:
+        """
+        Compute the key of a product.
+
+        Parameters
+        ----------
+        name: str
+            Name of the product, e.g. 'rans_values'.
+        inputs: Any
+            Inputs of the product, hashed with `hash_inputs`.
+        version: str, optional
+            Version of the producing code, e.g. from `get_code_version`.
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest.
+        """
+        payload = json.dumps({'name': name, 'inputs': hash_inputs(inputs), 'version': version})
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_or_compute(self, name: str, inputs: Any, compute: Callable, version: str = '') -> Any:
+        """
+        Return the cached product or compute it with `compute()` and store it.
+
+        Parameters
+        ----------
+        name: str
+            Name of the product, e.g. 'rans_values'.
+        inputs: Any
+            Inputs of the product, hashed with `hash_inputs`.
+        compute: Callable
+            Function computing the product, called without argument on a miss. The product must be picklable.
+        version: str, optional
+            Version of the producing code, e.g. from `get_code_version`.
+
+        Returns
+        -------
+        Any
+            The product.
+        """
+        path = self.directory / f'{self.get_key(name, inputs, version)}{self.suffix}'
+        try:
+            with open(path, 'rb') as file:
+                product = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Missing (or, after a crash of another writer, unreadable) product
+            pass
+        else:
+            self.__count(name, hit=True)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            return product
+
+        self.__count(name, hit=False)
+        product = compute()
+        tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(product, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.__evict(keep=path)
+        return product
+
+    def get_size(self) -> int:
+        """
+        Return the total size of the cached products in bytes.
+        """
+        return sum(stat.st_size for stat, _ in self.__cached_files())
+
+    def clear(self) -> None:
+        """
+        Remove every cached product.
+        """
+        for _, file in self.__cached_files():
+            file.unlink(missing_ok=True)
+
+    def __count(self, name, hit):
+        with self.__lock:
+            counter = self.counters.setdefault(name, {'hits': 0, 'misses': 0})
+            if hit:
+                self.hits += 1
+                counter['hits'] += 1
+            else:
+                self.misses += 1
+                counter['misses'] += 1
+
+    def __cached_files(self):
+        """
+        Return the (stat, path) of the cached products, ignoring the files removed by another process meanwhile.
+        """
+        files = []
+        for file in self.directory.glob(f'*{self.suffix}'):
+            try:
+                files.append((file.stat(), file))
+            except FileNotFoundError:
+                pass
+        return files
+
+    def __evict(self, keep):
+        """
+        Remove the least recently used products, except `keep`, until the size of the cache is below `max_bytes`.
+        """
+        files = self.__cached_files()
+        total_size = sum(stat.st_size for stat, _ in files)
+        for stat, file in sorted(files, key=lambda item: item[0].st_mtime_ns):
+            if total_size <= self.max_bytes:
+                break
+            if file == keep:
+                continue
+            file.unlink(missing_ok=True)
+            total_size -= stat.st_size
+
+
+_default_cache: Optional[DiskCache] = None
+
+
+def get_default_cache() -> Optional[DiskCache]:
+    """
+    Return the cache used by the pipeline, or None if it is disabled.
+    """
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[DiskCache]) -> None:
+    """
+    Set the cache used by the pipeline, None disabling it.
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def cached_product(name: str, inputs: Any, compute: Callable, producers: tuple = ()) -> Any:
+    """
+    Return a product through the default cache, or compute it if the cache is disabled.
+
+    Parameters
+    ----------
+    name: str
+        Name of the product.
+    inputs: Any or Callable
+        Inputs of the product, or a function returning them. They are only evaluated and hashed when the cache is
+        enabled.
+    compute: Callable
+        Function computing the product, called without argument.
+    producers: tuple of Callable, optional
+        Functions whose source code versions the product.
+    """
+    cache = _default_cache
+    if cache is None:
+        return compute()
+    if callable(inputs):
+        inputs = inputs()
+    return cache.get_or_compute(name, inputs, compute, get_code_version(*producers))
+
+
+def _enable_from_environment() -> None:
+    setting = os.environ.get('JET_TURBULENT_CACHE', '')
+    if setting in ('', '0'):
+        return
+    set_default_cache(DiskCache(None if setting == '1' else Path(setting)))
+
+
+_enable_from_environment()
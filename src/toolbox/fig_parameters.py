@@ -1,2 +1,35 @@
+import numpy as np
+
 RANS_FIGSIZE = (5,2)
-DEFAULT_FIGSIZE = (12, 6)
\ No newline at end of file
+DEFAULT_FIGSIZE = (12, 6)
+
+FIELD_TITLES = {
+    'total': {
+        'ux': r"$\tilde{U}_x$", 'ur': r"$\tilde{U}_r$", 'ut': r"$\tilde{U}_\theta$",
+        'rho': r"$\tilde{\rho}$", 'p': r"$\tilde{p}$", 'T': r"$\tilde{T}$"
+    },
+    'rans': {
+        'ux': r"$U_x$", 'ur': r"$U_r$", 'ut': r"$U_\theta$", 'rho': r"$\rho$",
+        'p': r"$p$", 'T': r"$T$"
+    },
+    'pse': {
+        'Re(ux)': r"$\Re(u_x')$", 'Im(ux)': r"$\Im(u_x')$", 'abs(ux)': r"$|u_x'|$",
+        'Re(ur)': r"$\Re(u_r')$", 'Im(ur)': r"$\Im(u_r')$", 'abs(ur)': r"$|u_r'|$",
+        'Re(ut)': r"$\Re(u_\theta')$", 'Im(ut)': r"$\Im(u_\theta')$", 'abs(ut)': r"$|u_\theta'|$",
+        'Re(rho)': r"$\Re(\rho')$", 'Im(rho)': r"$\Im(\rho')$", 'abs(rho)': r"$|\rho'|$",
+        'Re(p)': r"$\Re(p')$", 'Im(p)': r"$\Im(p')$", 'abs(p)': r"$|p'|$",
+        'Re(T)': r"$\Re(T')$", 'Im(T)': r"$\Im(T')$", 'abs(T)': r"$|T'|$"
+    }
+}
+
+
+def get_contour_levels(values: np.ndarray, n_levels: int = 101) -> np.ndarray:
+    """
+    Return `n_levels` increasing colour levels spanning the values. A constant field (e.g. a quantity vanishing in
+    the window) gets a small symmetric range around its value, so that `contourf` can still draw it.
+    """
+    low, high = np.min(values), np.max(values)
+    if not high > low:
+        half_range = 1e-6 * max(abs(low), 1.0)
+        low, high = low - half_range, high + half_range
+    return np.linspace(low, high, n_levels)
@@ -0,0 +1,26 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Proxy of a module which is only imported on the first access to one of its attributes. It keeps heavy
+    dependencies (pandas, scipy, matplotlib) out of the import time of the package when they are not used.
+
+    Attributes
+    ----------
+    name : str
+        Full name of the proxied module, e.g. 'matplotlib.pyplot'.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.__module = None
+
+    def __getattr__(self, attribute):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.name)
+        return getattr(self.__module, attribute)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__module is not None else 'not loaded'
+        return f"<LazyModule '{self.name}' ({state})>"
@@ -0,0 +1,280 @@
+"""
+Memory accounting of the pipeline.
+
+- `get_memory_report` measures the resident footprint of the loaded objects (raw perturbation frames, interpolated
+  RANS values, converted copies, total fields...) by walking their NumPy buffers. A buffer referenced by several
+  objects (views) is counted once, and buffers holding the same data are reported as duplicate copies.
+- `MemoryMonitor` samples the resident set size (RSS) of the process with psutil in a background thread and records
+  the peak RSS of each stage.
+
+Examples
+--------
+>>> monitor = MemoryMonitor()
+>>> with monitor.stage('load'):
+...     post_process = PostProcess(0.4, 1)
+>>> with monitor.stage('total field'):
+...     total_field = post_process.perturbation_field.compute_total_field(25)
+>>> print(monitor.get_summary())
+>>> print(post_process.get_memory_report().get_summary())
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+from src.toolbox.lazy_import import LazyModule
+
+psutil = LazyModule('psutil')
+pd = LazyModule('pandas')
+
+
+def get_rss() -> int:
+    """
+    Return the resident set size of the current process in bytes.
+    """
+    return psutil.Process().memory_info().rss
+
+
+def _format_bytes(n_bytes: int) -> str:
+    return f"{n_bytes / 1024 ** 2:.2f} MiB"
+
+
+def iter_arrays(obj, seen: Optional[set] = None):
+    """
+    Yield the NumPy arrays held by an object: arrays, DataFrames, Series, dicts, lists, tuples and the attributes
+    of the other objects. A DataFrame whose values cannot be viewed as one array is yielded as (empty array, size).
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        yield obj
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        # The blocks of a DataFrame are not public: a single-dtype frame exposes its block as a view, the other
+        # ones are copied by `to_numpy`, in which case the buffers are only sized
+        values = obj.to_numpy(copy=False)
+        if values.base is not None or isinstance(obj, pd.Series):
+            yield values
+        else:
+            yield np.empty(0), int(obj.memory_usage(deep=True, index=False).sum())
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from iter_arrays(value, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for value in obj:
+            yield from iter_arrays(value, seen)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        yield from iter_arrays(vars(obj), seen)
+
+
+def get_buffer(array: np.ndarray) -> np.ndarray:
+    """
+    Return the array owning the memory of `array`.
+    """
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+class MemoryReport:
+    """
+    Resident footprint of a set of named objects.
+
+    Attributes
+    ----------
+    entries : dict[str, dict]
+        For each object, the number of buffers, the bytes of its buffers (`nbytes`) and the bytes of the buffers it
+        does not share with a previous object (`own_nbytes`).
+    duplicates : list[list[str]]
+        Groups of buffers holding identical data, each described as '<object>: <quantity>'.
+    total : int
+        Bytes of the distinct buffers of all the objects.
+    rss : int
+        Resident set size of the process when the report was made.
+
+    Methods
+    -------
+    get_duplicated_bytes() -> int
+        Returns the bytes that could be saved by keeping a single copy of each duplicated buffer.
+
+    get_summary() -> str
+        Returns a plain-text table of the objects followed by the duplicate copies.
+    """
+
+    def __init__(self, objects: dict[str, object], find_duplicates: bool = True) -> None:
+        """
+        Parameters
+        ----------
+        objects: dict[str, object]
+            The objects to measure, by name.
+        find_duplicates: bool, optional
+            If True, the content of the buffers is hashed to find the duplicate copies. Default is True.
+        """
+        self.entries = {}
+        self.duplicates = []
+        self.rss = get_rss()
+
+        counted = set()
+        contents = {}
+        for name, obj in objects.items():
+            for quantity, value in self.__iter_named_values(obj):
+                entry = self.entries.setdefault(name, {'buffers': 0, 'nbytes': 0, 'own_nbytes': 0})
+                for array in iter_arrays(value):
+                    if isinstance(array, tuple):
+                        array, nbytes = array
+                        buffer_key = (id(value), nbytes)
+                    else:
+                        buffer = get_buffer(array)
+                        nbytes = buffer.nbytes
+                        buffer_key = (buffer.__array_interface__['data'][0], nbytes)
+                    if nbytes == 0:
+                        continue
+                    entry['buffers'] += 1
+                    entry['nbytes'] += nbytes
+                    if buffer_key in counted:
+                        continue
+                    counted.add(buffer_key)
+                    entry['own_nbytes'] += nbytes
+                    if find_duplicates and array.size:
+                        content_key = (array.dtype.str, array.shape,
+                                       hashlib.blake2b(np.ascontiguousarray(array).data, digest_size=16).digest())
+                        contents.setdefault(content_key, []).append((f'{name}: {quantity}', nbytes))
+
+        self.total = sum(entry['own_nbytes'] for entry in self.entries.values())
+        self.__duplicate_sizes = []
+        for copies in contents.values():
+            if len(copies) > 1:
+                self.duplicates.append([label for label, _ in copies])
+                self.__duplicate_sizes.append(sum(nbytes for _, nbytes in copies[1:]))
+
+    def get_duplicated_bytes(self) -> int:
+        """
+        Returns the bytes that could be saved by keeping a single copy of each duplicated buffer.
+        """
+        return sum(self.__duplicate_sizes)
+
+    def get_summary(self) -> str:
+        """
+        Returns a plain-text table of the objects followed by the duplicate copies.
+        """
+        lines = [f"{'object':<30}{'buffers':>9}{'size (MiB)':>13}{'own (MiB)':>12}"]
+        for name, entry in self.entries.items():
+            lines.append(f"{name:<30}{entry['buffers']:>9}{entry['nbytes'] / 1024 ** 2:>13.2f}"
+                         f"{entry['own_nbytes'] / 1024 ** 2:>12.2f}")
+        lines.append(f"{'total':<30}{'':>9}{'':>13}{self.total / 1024 ** 2:>12.2f}")
+        lines.append(f"process RSS: {_format_bytes(self.rss)}")
+        if self.duplicates:
+            lines.append(f"duplicate copies ({_format_bytes(self.get_duplicated_bytes())} could be saved):")
+            lines.extend(f"  {' = '.join(copies)}" for copies in self.duplicates)
+        return '\n'.join(lines)
+
+    @staticmethod
+    def __iter_named_values(obj):
+        if isinstance(obj, dict):
+            yield from ((str(key), value) for key, value in obj.items())
+        else:
+            yield type(obj).__name__, obj
+
+
+def get_memory_report(objects: dict[str, object], find_duplicates: bool = True) -> MemoryReport:
+    """
+    Measure the resident footprint of named objects, see `MemoryReport`.
+    """
+    return MemoryReport(objects, find_duplicates)
+
+
+class MemoryMonitor:
+    """
+    Sampler of the resident set size of the process recording the peak RSS of each stage.
+
+    Attributes
+    ----------
+    interval : float
+        Sampling period in seconds.
+    stats : dict[str, dict]
+        For each stage, the number of calls, the RSS at the start and at the end of the last call and the largest
+        increase of the peak RSS above the start RSS over all the calls.
+
+    Methods
+    -------
+    stage(name: str)
+        Context manager recording the enclosed block as a stage.
+
+    get_summary() -> str
+        Returns a plain-text table of the stages.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Parameters
+        ----------
+        interval: float, optional
+            Sampling period in seconds. Default is 5 ms.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.stats = {}
+        self.__process = psutil.Process()
+        self.__open_stages = []
+        self.__lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Record the enclosed block as a stage. Stages can be nested, each one keeping its own peak.
+        """
+        record = {'name': name, 'start': self.__process.memory_info().rss}
+        record['peak'] = record['start']
+        with self.__lock:
+            self.__open_stages.append(record)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__sample, daemon=True)
+                self.__thread.start()
+        try:
+            yield record
+        finally:
+            end = self.__process.memory_info().rss
+            with self.__lock:
+                self.__open_stages.remove(record)
+                thread = self.__thread if not self.__open_stages else None
+                if thread is not None:
+                    self.__thread = None
+            if thread is not None:
+                thread.join()
+            stats = self.stats.setdefault(name, {'calls': 0, 'peak_increase': 0})
+            stats['calls'] += 1
+            stats['start'] = record['start']
+            stats['end'] = end
+            stats['peak'] = max(record['peak'], end)
+            stats['peak_increase'] = max(stats['peak_increase'], stats['peak'] - record['start'])
+
+    def get_summary(self) -> str:
+        """
+        Returns a plain-text table of the stages: RSS at the start and at the end of the last call, peak RSS and
+        largest increase of the peak above the start RSS.
+        """
+        lines = [f"{'stage':<30}{'calls':>7}{'start (MiB)':>13}{'end (MiB)':>11}{'peak (MiB)':>12}{'+peak (MiB)':>13}"]
+        for name, stats in self.stats.items():
+            lines.append(f"{name:<30}{stats['calls']:>7}{stats['start'] / 1024 ** 2:>13.2f}"
+                         f"{stats['end'] / 1024 ** 2:>11.2f}{stats['peak'] / 1024 ** 2:>12.2f}"
+                         f"{stats['peak_increase'] / 1024 ** 2:>13.2f}")
+        return '\n'.join(lines)
+
+    def __sample(self) -> None:
+        while True:
+            rss = self.__process.memory_info().rss
+            with self.__lock:
+                if not self.__open_stages:
+                    return
+                for record in self.__open_stages:
+                    record['peak'] = max(record['peak'], rss)
+            time.sleep(self.interval)
@@ -1,7 +1,13 @@
+import os
+from functools import lru_cache
 from pathlib import Path
 
-BASE_DIR = Path(__file__).resolve().parents[2]  # Points to the Jet_Turbulent directory
-DIR_DATA = BASE_DIR / 'Data'
+# An installed package (`pip install .`, not editable) is not next to the Data directory: its data directory must be
+# given with JET_TURBULENT_DATA (`--data` of the command line) and its outputs go to the working directory
+IS_INSTALLED = any(part in ('site-packages', 'dist-packages') for part in Path(__file__).resolve().parts)
+BASE_DIR = Path.cwd() if IS_INSTALLED else Path(__file__).resolve().parents[2]  # Points to the Jet_Turbulent directory
+# The data directory can be redirected (e.g. to a synthetic or scaled dataset) with the JET_TURBULENT_DATA variable
+DIR_DATA = Path(os.environ.get('JET_TURBULENT_DATA', BASE_DIR / 'Data'))
 DIR_MEAN = DIR_DATA / 'MeanFlow'
 DIR_STABILITY = DIR_DATA / 'Stability'
 
@@ -9,5 +15,87 @@ DIR_STABILITY = DIR_DATA / 'Stability'
 DIR_STABILITY_ALPHA = DIR_STABILITY / 'alpha'
 DIR_OUT = BASE_DIR / 'Output'
 
-CASE_NUMBER = (len(list(DIR_MEAN.glob('*'))))
-RANS_FILES = {i: f'mean_{i}.mat' for i in range(1,CASE_NUMBER+1)}
+
+@lru_cache(maxsize=None)
+def get_case_number():
+    """
+    Return the number of RANS cases, i.e. the highest ID of the `mean_<ID>.mat` files of the MeanFlow directory, so
+    that a dataset holding only some of the cases keeps their IDs. The directory is only scanned on the first call.
+    """
+    return max((int(file.stem.split('_')[-1]) for file in DIR_MEAN.glob('mean_*.mat')), default=0)
+
+
+@lru_cache(maxsize=None)
+def get_rans_files():
+    """
+    Return the name of the mean flow file of every case, indexed by the case ID.
+    """
+    return {i: f'mean_{i}.mat' for i in range(1, get_case_number() + 1)}
+
+
+def __getattr__(name):
+    # CASE_NUMBER and RANS_FILES are kept as lazy module attributes so that importing the package does not scan
+    # the data directory.
+    if name == 'CASE_NUMBER':
+        return get_case_number()
+    if name == 'RANS_FILES':
+        return get_rans_files()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def find_case_file(directory, ID_MACH):
+    """
+    Locates a file associated with the specified Mach case ID within a given directory.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory where files are searched for the Mach case ID.
+    ID_MACH : int
+        Case selected based on the Mach reference.
+
+    Returns
+    -------
+    Path
+        Path to the file corresponding to the selected Mach case.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no file for the specified Mach case is found within the directory.
+    """
+    wanted_file = None
+    for file in directory.glob('*/*'):
+        # The case ID is the last '_' separated part of the name, e.g. pertpse_FrancCase_10, so that case 1 does not
+        # match the files of cases 11, 21...
+        if file.stem.split('_')[-1] == str(ID_MACH):
+            wanted_file = file
+
+    if wanted_file is None:
+        raise FileNotFoundError('File not found - Case might be available')
+
+    return wanted_file
+
+
+def get_case_files(St, ID_MACH):
+    """
+    Return every data file read to build the fields of a case, i.e. the mean flow, the PSE perturbation and
+    wavenumber files and the shared reference files.
+
+    Parameters
+    ----------
+    St : float
+        Strouhal number.
+    ID_MACH : int
+        Case selected based on the Mach reference.
+
+    Returns
+    -------
+    list of Path
+    """
+    dir_st = DIR_STABILITY / "St{:02d}".format(int(10 * St))
+    return [DIR_MEAN / get_rans_files()[ID_MACH],
+            find_case_file(dir_st / 'Field', ID_MACH),
+            find_case_file(dir_st / 'alpha', ID_MACH),
+            DIR_DATA / 'info.dat',
+            DIR_DATA / 'RANS69pt.dat']
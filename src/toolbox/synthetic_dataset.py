@@ -0,0 +1,244 @@
+"""
+Generator of synthetic datasets in the native on-disk formats (mean_<ID>.mat, Tecplot pertpse/vappse files,
+info.dat, Mach.dat and RANS69pt.dat), used to stress-test the readers and the computations at production sizes.
+
+The fields follow simple but physically consistent models of a subsonic round jet:
+
+- mean flow: tanh shear layer spreading linearly from the lip, potential core of length ~6D followed by a 1/x decay
+  of the centreline velocity, radial velocity obtained from the continuity equation, adiabatic temperature from the
+  Crocco-Busemann relation and constant (ambient) pressure;
+- PSE: axisymmetric wave packet whose wavenumber follows a constant convection velocity and whose growth rate
+  vanishes at the end of the potential core, with shape functions centred on the shear layer.
+
+Usage
+-----
+python -m src.toolbox.synthetic_dataset OUT_DIR [--cases 10] [--St 0.4 1.0] [--nx 201] [--nr 69]
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from src.Field.perturbation_field import PerturbationField
+from src.toolbox import data_writers
+from src.toolbox.dimless_reference_values import T_0, c_0, gamma, p_0, r, rho_0
+
+
+def generate_synthetic_dataset(data_dir: Path, n_cases: int = 10, St_list: tuple = (0.4, 1.0), nx: int = 201,
+                               nr: int = 69, x_max: Union[int, float] = 20, r_max: Union[int, float] = 20,
+                               rans_refinement: int = 5, seed: int = 0) -> Path:
+    """
+    Write a synthetic dataset.
+
+    Parameters
+    ----------
+    data_dir: Path
+        Root of the dataset, to be used through the JET_TURBULENT_DATA environment variable.
+    n_cases: int, optional
+        Number of Mach cases. Default is 10.
+    St_list: tuple of float, optional
+        Strouhal numbers of the PSE fields. Default is (0.4, 1.0).
+    nx: int, optional
+        Number of nodes of the regular PSE grid along x. Default is 201.
+    nr: int, optional
+        Number of nodes of the r grid shared by RANS and PSE. Default is 69.
+    x_max: int or float, optional
+        Length of the domain. Default is 20.
+    r_max: int or float, optional
+        Height of the domain. Default is 20.
+    rans_refinement: int, optional
+        The RANS grid has `rans_refinement` times more nodes than the PSE grid on the first half of the domain, so that
+        every `rans_refinement`-th RANS node lies on a PSE node, and is stretched on the second half. Default is 5.
+    seed: int, optional
+        Seed of the random spread of the Mach numbers. Default is 0.
+
+    Returns
+    -------
+    Path
+        The root of the dataset.
+    """
+    if not isinstance(n_cases, int) or n_cases <= 0:
+        raise ValueError("n_cases must be a positive integer")
+    if nx < 2 or nr < 2 or rans_refinement < 1:
+        raise ValueError("nx and nr must be greater than 1 and rans_refinement must be positive")
+
+    data_dir = Path(data_dir)
+    rng = np.random.default_rng(seed)
+    mach_numbers = rng.permutation(np.linspace(0.973, 0.996, n_cases))
+
+    x_pse = np.linspace(0, x_max, nx)
+    r_grid = get_stretched_r_grid(nr, r_max)
+    x_rans = get_rans_x_grid(x_pse, rans_refinement)
+    data_writers.write_r_grid(data_dir, r_grid)
+
+    reference_values = np.zeros((n_cases, 4))
+    for ID_MACH, mach in enumerate(mach_numbers, start=1):
+        arr = get_mean_flow(x_rans, r_grid, mach)
+        data_writers.write_mean_flow(data_dir, ID_MACH, arr)
+        # Dimensional values at x = r = 0: ux, rho, T, P
+        reference_values[ID_MACH - 1] = (arr[0, 0, 3] * c_0, arr[0, 0, 2] * rho_0,
+                                         arr[0, 0, 6] * (gamma - 1) * T_0, arr[0, 0, 7] * gamma * p_0)
+
+        for St in St_list:
+            stability = get_stability_data(x_pse, St)
+            values = get_perturbation_field(x_pse, r_grid, stability)
+            data_writers.write_stability_data(data_dir, St, ID_MACH, stability)
+            data_writers.write_perturbation_field(data_dir, St, ID_MACH, x_pse, r_grid, values)
+
+    data_writers.write_reference_values(data_dir, reference_values)
+    data_writers.write_mach_numbers(data_dir, reference_values[:, 0] / np.sqrt(gamma * r * reference_values[:, 2]))
+    return data_dir
+
+
+def get_stretched_r_grid(nr: int, r_max: Union[int, float]) -> np.ndarray:
+    """
+    Return an r grid starting at 0, refined around the axis and the lip (r = 0.5) and geometrically stretched
+    towards `r_max`, similar to `RANS69pt.dat`.
+    """
+    n_inner = max(nr // 2, 2)
+    inner = np.linspace(0, 1, n_inner)
+    n_outer = nr - n_inner
+    if n_outer == 0:
+        return inner * r_max
+    # Geometric stretching of the outer part, whose first cell matches the inner spacing
+    dr = inner[1]
+    ratio = _solve_stretching_ratio(dr, r_max - 1, n_outer)
+    outer = 1 + dr * np.cumsum(ratio ** np.arange(n_outer))
+    outer[-1] = r_max
+    return np.concatenate((inner, outer))
+
+
+def get_rans_x_grid(x_pse: np.ndarray, refinement: int) -> np.ndarray:
+    """
+    Return a RANS x grid `refinement` times finer than the PSE grid on the first half of the domain and stretched on
+    the second half.
+    """
+    dx = (x_pse[1] - x_pse[0]) / refinement
+    x_split = x_pse[len(x_pse) // 2]
+    uniform = np.arange(0, x_split + dx / 2, dx)
+    n_stretched = max(int(np.ceil(0.15 * len(uniform))), 2)
+    ratio = _solve_stretching_ratio(dx, x_pse[-1] - x_split, n_stretched)
+    stretched = x_split + dx * np.cumsum(ratio ** np.arange(n_stretched))
+    stretched[-1] = x_pse[-1]
+    return np.concatenate((uniform, stretched))
+
+
+def get_mean_flow(x: np.ndarray, r_grid: np.ndarray, mach: float) -> np.ndarray:
+    """
+    Return the synthetic mean flow of a case as the `arr` array of shape (nx, nr, 8) of the mean_<ID>.mat files.
+    All the quantities are dimensionless as in the RANS files (velocities by c_0, T by (gamma - 1) T_0, p by
+    gamma p_0 and rho by rho_0).
+    """
+    X, R = np.meshgrid(x, r_grid, indexing='ij')
+    core_length = 6.0
+    jet_velocity = mach * np.sqrt(1 / (1 + (gamma - 1) / 2 * mach ** 2))
+    # Smooth transition between the potential core and the 1/x decay
+    centreline = jet_velocity * (1 + (X / core_length) ** 4) ** -0.25
+    half_radius = 0.5 + 0.09 * X
+    thickness = 0.02 + 0.025 * X
+    ux = centreline * 0.5 * (1 - np.tanh((R - half_radius) / (2 * thickness)))
+
+    # Continuity (incompressible approximation): d(r ur)/dr = - r dux/dx
+    dux_dx = np.gradient(ux, x, axis=0)
+    flux = np.concatenate((np.zeros((len(x), 1)),
+                           np.cumsum(0.5 * (R[:, 1:] * dux_dx[:, 1:] + R[:, :-1] * dux_dx[:, :-1])
+                                     * np.diff(r_grid), axis=1)), axis=1)
+    ur = -flux / np.where(R == 0, 1, R)
+
+    # Adiabatic mean flow with a stagnation temperature equal to T_0 (Crocco-Busemann, Pr = 1)
+    T = (1 - (gamma - 1) / 2 * ux ** 2)
+    p = np.full_like(ux, 1 / gamma)
+    rho = 1 / T
+
+    return np.stack((X, R, rho, ux, ur, np.zeros_like(ux), T / (gamma - 1), p), axis=-1)
+
+
+def get_stability_data(x: np.ndarray, St: Union[int, float]) -> dict[str, np.ndarray]:
+    """
+    Return the synthetic wavenumber data of a wave packet at the Strouhal number St, for every quantity of
+    `PerturbationField.stability_quantities`.
+    """
+    omega = 2 * np.pi * St
+    convection_velocity = 0.6 + 0.02 * x
+    alpha_r = omega / convection_velocity
+    # Growth in the shear layer, neutral point at the end of the potential core, then slow decay
+    neutral_point = min(6.0, 2.4 / St)
+    alpha_i = -1.5 * (1 - x / neutral_point) * np.exp(-0.1 * x)
+    int_alpha_r = np.concatenate(([0], np.cumsum(0.5 * (alpha_r[1:] + alpha_r[:-1]) * np.diff(x))))
+    int_alpha_i = np.concatenate(([0], np.cumsum(0.5 * (alpha_i[1:] + alpha_i[:-1]) * np.diff(x))))
+
+    return {'x': x, 'Re(alpha)': alpha_r, 'Im(alpha)': alpha_i, 'abs(alpha)': np.hypot(alpha_r, alpha_i),
+            'Re(int(alpha))': int_alpha_r, 'Im(int(alpha))': int_alpha_i, 'C<sub>ph</sub>': omega / alpha_r,
+            'sigma': -alpha_i, 'N': -int_alpha_i}
+
+
+def get_perturbation_field(x: np.ndarray, r_grid: np.ndarray, stability: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Return the synthetic PSE shape functions (real part, imaginary part and modulus) of an axisymmetric mode.
+    The velocity is concentrated in the shear layer and the pressure decays exponentially away from it.
+    """
+    X, R = np.meshgrid(x, r_grid, indexing='ij')
+    half_radius = 0.5 + 0.09 * X
+    thickness = 0.02 + 0.025 * X
+    eta = (R - half_radius) / (3 * thickness)
+    alpha_r = stability['Re(alpha)'][:, None]
+    gaussian = np.exp(-eta ** 2)
+
+    shapes = {
+        'ux': 10 * gaussian * np.exp(1j * np.pi / 4 * np.tanh(eta)),
+        'ur': -5j * eta * gaussian * np.tanh(R / 0.05),
+        'ut': np.zeros_like(X, dtype=complex),
+        'p': 2 * np.exp(-alpha_r * np.abs(R - half_radius)) * np.exp(1j * np.pi / 2 * np.tanh(eta)),
+    }
+    shapes['rho'] = shapes['p'] * (1 + 0.2 * gaussian)
+
+    values = {}
+    for quantity, shape in shapes.items():
+        values[f'Re({quantity})'] = shape.real
+        values[f'Im({quantity})'] = shape.imag
+        values[f'abs({quantity})'] = np.abs(shape)
+    return {quantity: values[quantity] for quantity in PerturbationField.pse_quantities[2:]}
+
+
+def _solve_stretching_ratio(first_cell: float, length: float, n_cells: int) -> float:
+    """
+    Return the ratio q of a geometric progression of `n_cells` cells starting at `first_cell` and covering `length`.
+    """
+    if first_cell * n_cells >= length:
+        return 1.0
+    low, high = 1.0, 2.0
+    while first_cell * (high ** n_cells - 1) / (high - 1) < length:
+        high *= 2
+    for _ in range(100):
+        ratio = 0.5 * (low + high)
+        if first_cell * (ratio ** n_cells - 1) / (ratio - 1) < length:
+            low = ratio
+        else:
+            high = ratio
+    return 0.5 * (low + high)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('out_dir', type=Path)
+    parser.add_argument('--cases', type=int, default=10)
+    parser.add_argument('--St', type=float, nargs='+', default=[0.4, 1.0])
+    parser.add_argument('--nx', type=int, default=201, help='number of PSE nodes along x')
+    parser.add_argument('--nr', type=int, default=69, help='number of nodes along r')
+    parser.add_argument('--x-max', type=float, default=20)
+    parser.add_argument('--r-max', type=float, default=20)
+    parser.add_argument('--rans-refinement', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generate_synthetic_dataset(args.out_dir, n_cases=args.cases, St_list=tuple(args.St), nx=args.nx, nr=args.nr,
+                               x_max=args.x_max, r_max=args.r_max, rans_refinement=args.rans_refinement,
+                               seed=args.seed)
+    print(f"Synthetic dataset written to {args.out_dir} - use it with JET_TURBULENT_DATA={args.out_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
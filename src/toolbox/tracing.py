@@ -0,0 +1,214 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+# Opt-in instrumentation of the pipeline stages. When tracing is disabled, `traced` functions only pay for one
+# attribute lookup and `span` returns a shared null context.
+#
+# Tracing is enabled either with the `tracing()` context manager or with the JET_TURBULENT_TRACE environment
+# variable: '1' enables it for the whole process and a path ending with '.json' also exports the Chrome trace
+# to this path (and prints the summary) at exit.
+
+
+class _TraceState:
+    """
+    Recorded events of the process and stack of the open spans of each thread.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events = []
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def stack(self) -> list:
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+
+_state = _TraceState()
+_NULL_CONTEXT = nullcontext()
+
+
+def enable() -> None:
+    """
+    Enable the recording of the stages.
+    """
+    _state.enabled = True
+
+
+def disable() -> None:
+    """
+    Disable the recording of the stages. The events already recorded are kept.
+    """
+    _state.enabled = False
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def reset() -> None:
+    """
+    Remove every recorded event.
+    """
+    with _state.lock:
+        _state.events = []
+        _state.origin = time.perf_counter()
+
+
+@contextmanager
+def tracing(chrome_trace: Optional[Union[str, Path]] = None, summary: bool = False):
+    """
+    Record the stages executed inside the block.
+
+    Parameters
+    ----------
+    chrome_trace: str or Path, optional
+        If given, the events are exported to this file at the end of the block (Chrome trace / Perfetto format).
+    summary: bool, optional
+        If True, the summary of the stages is printed at the end of the block.
+
+    Examples
+    --------
+    >>> with tracing('trace.json', summary=True):
+    ...     PostProcess(0.4, 1).plot_field('total', 'ux')
+    """
+    was_enabled = _state.enabled
+    reset()
+    enable()
+    try:
+        yield _state
+    finally:
+        if not was_enabled:
+            disable()
+        if chrome_trace is not None:
+            export_chrome_trace(chrome_trace)
+        if summary:
+            print(get_summary())
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator recording each call of the function as a span named `name`.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _span(name, args):
+    event = {'name': name, 'args': dict(args, bytes_read=0), 'tid': threading.get_ident()}
+    stack = _state.stack()
+    stack.append(event)
+    start = time.perf_counter()
+    try:
+        yield event
+    finally:
+        end = time.perf_counter()
+        stack.pop()
+        event['ts'] = (start - _state.origin) * 1e6
+        event['dur'] = (end - start) * 1e6
+        if stack:
+            stack[-1]['args']['bytes_read'] += event['args']['bytes_read']
+        with _state.lock:
+            _state.events.append(event)
+
+
+def span(name: str, **args):
+    """
+    Context manager recording the enclosed block as a span named `name`, with optional arguments shown in the trace.
+    """
+    if not _state.enabled:
+        return _NULL_CONTEXT
+    return _span(name, args)
+
+
+def record_bytes_read(source: Union[int, str, Path]) -> None:
+    """
+    Add the number of bytes read (or the size of the file read) to the innermost open span.
+    """
+    if not _state.enabled:
+        return
+    stack = _state.stack()
+    if stack:
+        stack[-1]['args']['bytes_read'] += source if isinstance(source, int) else os.path.getsize(source)
+
+
+def get_events() -> list[dict]:
+    """
+    Return a copy of the recorded events.
+    """
+    with _state.lock:
+        return list(_state.events)
+
+
+def get_stats() -> dict[str, dict]:
+    """
+    Return, for each stage, the number of calls, the total and maximum wall times in seconds and the bytes read
+    (the time and bytes of nested spans are included in the enclosing one).
+    """
+    stats = {}
+    for event in get_events():
+        stage = stats.setdefault(event['name'], {'calls': 0, 'total': 0.0, 'max': 0.0, 'bytes_read': 0})
+        stage['calls'] += 1
+        stage['total'] += event['dur'] * 1e-6
+        stage['max'] = max(stage['max'], event['dur'] * 1e-6)
+        stage['bytes_read'] += event['args']['bytes_read']
+    return stats
+
+
+def get_summary() -> str:
+    """
+    Return a plain-text table of the stages sorted by total wall time.
+    """
+    lines = [f"{'stage':<45}{'calls':>7}{'total (ms)':>13}{'mean (ms)':>12}{'max (ms)':>11}{'read (MiB)':>12}"]
+    for name, stage in sorted(get_stats().items(), key=lambda item: -item[1]['total']):
+        lines.append(f"{name:<45}{stage['calls']:>7}{stage['total'] * 1e3:>13.2f}"
+                     f"{stage['total'] / stage['calls'] * 1e3:>12.2f}{stage['max'] * 1e3:>11.2f}"
+                     f"{stage['bytes_read'] / 1024 ** 2:>12.2f}")
+    return '\n'.join(lines)
+
+
+def export_chrome_trace(path: Union[str, Path]) -> Path:
+    """
+    Export the recorded events as a Chrome trace JSON file, readable by chrome://tracing and ui.perfetto.dev.
+    """
+    pid = os.getpid()
+    trace_events = [{'name': event['name'], 'cat': event['name'].split('.')[0], 'ph': 'X', 'ts': event['ts'],
+                     'dur': event['dur'], 'pid': pid, 'tid': event['tid'], 'args': event['args']}
+                    for event in get_events()]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}))
+    return path
+
+
+def _enable_from_environment() -> None:
+    setting = os.environ.get('JET_TURBULENT_TRACE', '')
+    if setting in ('', '0'):
+        return
+    enable()
+    if setting.endswith('.json'):
+        atexit.register(lambda: (export_chrome_trace(setting), print(get_summary())))
+
+
+_enable_from_environment()
@@ -0,0 +1,15 @@
+import matplotlib
+import pytest
+
+# The tests never open a window
+matplotlib.use('Agg')
+
+
+@pytest.fixture(scope='session')
+def perturbation_field():
+    """
+    Shared PerturbationField of the bundled case (St 0.4, case 1).
+    """
+    from src.Field.field_registry import get_field_registry
+
+    return get_field_registry().get_perturbation_field(0.4, 1)
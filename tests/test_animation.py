@@ -0,0 +1,48 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+from matplotlib import image
+
+from src.Field.perturbation_field import PerturbationField
+from src.Field.post_process import PostProcess
+from src.Plot.animation import export_phase_animation
+
+
+@pytest.fixture(scope='module')
+def post_process():
+    return PostProcess(0.4, 1, epsilon=0.05)
+
+
+def test_frames_are_numbered_images(post_process, tmp_path):
+    paths = export_phase_animation(post_process, 'ux', n_frames=5, x_max=4, r_max=2, out_dir=tmp_path, jobs=1,
+                                   dpi=40)
+    assert [path.name for path in paths] == [f'frame_{k:04d}.png' for k in range(5)]
+    frames = [image.imread(path) for path in paths]
+    assert all(frame.shape == frames[0].shape for frame in frames)
+    # The phase changes from a frame to the next one
+    assert not np.array_equal(frames[0], frames[1])
+
+
+def test_parallel_rendering_gives_the_same_frames(post_process, tmp_path):
+    serial = export_phase_animation(post_process, 'ur', n_frames=4, out_dir=tmp_path / 'serial', jobs=1, dpi=40)
+    parallel = export_phase_animation(post_process, 'ur', n_frames=4, out_dir=tmp_path / 'parallel', jobs=3,
+                                      dpi=40, gif=True)
+    assert parallel[-1].name == 'animation.gif' and parallel[-1].stat().st_size > 0
+    # A reused figure only differs from a new one by the anti-aliasing of a few pixels
+    for first, second in zip(serial, parallel[:-1]):
+        assert np.abs(image.imread(first) - image.imread(second)).mean() < 1e-3
+
+
+def test_constant_field_is_rendered(post_process, tmp_path):
+    shape = (len(post_process.x_grid), len(post_process.r_grid))
+    with mock.patch.object(PerturbationField, 'compute_total_fields',
+                           side_effect=lambda ts, epsilon: {'ut': np.zeros((len(ts),) + shape)}):
+        paths = export_phase_animation(post_process, 'ut', n_frames=3, out_dir=tmp_path, jobs=1, dpi=40)
+    assert len(paths) == 3
+
+
+@pytest.mark.parametrize('arguments', [{'name_value': 'T'}, {'n_frames': 0}, {'jobs': 0}, {'jobs': -2}])
+def test_invalid_arguments(post_process, tmp_path, arguments):
+    with pytest.raises(ValueError):
+        export_phase_animation(post_process, **{'name_value': 'ux', 'out_dir': tmp_path, **arguments})
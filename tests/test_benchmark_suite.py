@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+
+from src.Benchmark import benchmark_suite
+from src.Benchmark.benchmark_suite import STAGES, compare, measure, write_scaled_dataset
+from src.toolbox.path_directories import DIR_DATA
+
+
+def test_measure():
+    calls = []
+    result = measure(lambda: calls.append(np.ones(10 ** 5)), repeat=2)
+    # Two timed calls, one under tracemalloc and one under the memory monitor
+    assert len(calls) == 4
+    assert 0 <= result['min'] <= result['median']
+    assert result['peak_bytes'] >= 8 * 10 ** 5
+
+
+def test_refine_inserts_interpolated_nodes():
+    values = np.arange(12.).reshape(3, 4)
+    refined = benchmark_suite._refine(values, 0, 3)
+    assert refined.shape == (7, 4)
+    assert np.allclose(refined[::3], values)
+    assert np.allclose(refined[1], values[0] + (values[1] - values[0]) / 3)
+
+
+def test_scaled_dataset_is_benchmarked(tmp_path):
+    bundled = benchmark_suite._run_worker(DIR_DATA, 0.4, 1, repeat=1)
+    write_scaled_dataset(tmp_path, 0.4, 1, 2)
+    scaled = benchmark_suite._run_worker(tmp_path, 0.4, 1, repeat=1)
+    assert list(scaled['stages']) == STAGES
+    for grid, scaled_grid in zip(bundled['grid']['pse'], scaled['grid']['pse']):
+        assert scaled_grid == 2 * grid - 1
+
+
+def test_compare(tmp_path, capsys):
+    stages = {'plot_field': {'median': 1.0, 'peak_bytes': 100}}
+    for name, factor in (('old', 1), ('new', 2)):
+        results = {'datasets': {'bundled': {'stages': {stage: {key: factor * value for key, value in measures.items()}
+                                                        for stage, measures in stages.items()}}}}
+        (tmp_path / f'{name}.json').write_text(json.dumps(results))
+    compare(tmp_path / 'old.json', tmp_path / 'new.json')
+    assert 'time x  2.00   memory x  2.00' in capsys.readouterr().out
@@ -0,0 +1,66 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.Field.perturbation_field import PerturbationField
+from src.cli import main, run_tasks
+
+
+def fail_on_case_2(St, ID_MACH, args):
+    """
+    Task of the tests, failing with an error the tasks do not expect.
+    """
+    if ID_MACH == 2:
+        raise IndexError('malformed file')
+    return []
+
+
+def test_failed_case_does_not_stop_the_others(tmp_path, capsys):
+    assert main(['compute', '--St', '0.4', '--cases', '1', '999', '--t', '0', '50', '--out', str(tmp_path)]) == 1
+    assert 'case 999: failed' in capsys.readouterr().err
+    with np.load(tmp_path / 'St04' / 'case_1' / 'total_eps0.01.npz') as arrays:
+        assert arrays['ux'].shape[0] == 2
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_unexpected_errors_are_reported(jobs, capsys):
+    args = argparse.Namespace(jobs=jobs, verbose=False, out='-')
+    _, failures = run_tasks(fail_on_case_2, [(0.4, 1), (0.4, 2), (0.4, 3)], args)
+    assert failures == 1
+    assert 'case 2: failed - IndexError: malformed file' in capsys.readouterr().err
+
+
+def test_invalid_jobs_are_rejected(capsys):
+    with pytest.raises(SystemExit):
+        main(['ingest', '--jobs', '0'])
+    assert 'not a positive integer' in capsys.readouterr().err
+    with pytest.raises(ValueError):
+        run_tasks(fail_on_case_2, [], argparse.Namespace(jobs=0, verbose=False, out='-'))
+
+
+def test_total_field_is_exported_for_every_phase_and_epsilon(tmp_path):
+    assert main(['export', '--St', '0.4', '--cases', '1', '--t', '0', '50', '--epsilon', '0.01', '0.05',
+                 '--quantities', 'ux', '--out', str(tmp_path)]) == 0
+    case_dir = tmp_path / 'St04' / 'case_1'
+    assert sorted(path.name for path in case_dir.iterdir()) == [
+        'total_ux_t0_eps0.01.csv', 'total_ux_t0_eps0.05.csv', 'total_ux_t50_eps0.01.csv', 'total_ux_t50_eps0.05.csv']
+    perturbation_field = PerturbationField(0.4, 1)
+    frame = pd.read_csv(case_dir / 'total_ux_t50_eps0.05.csv', index_col=0)
+    assert np.allclose(frame.to_numpy(), perturbation_field.compute_total_field(50, 0.05)['ux'].to_numpy())
+
+
+def test_total_field_is_rendered_for_every_phase_and_epsilon(tmp_path):
+    assert main(['render', '--St', '0.4', '--cases', '1', '--t', '0', '50', '--epsilon', '0.01', '0.05',
+                 '--quantities', 'ux', '--dpi', '30', '--out', str(tmp_path)]) == 0
+    assert len(list((tmp_path / 'St04' / 'case_1').glob('total_ux_t*_eps*.png'))) == 4
+    assert main(['render', '--St', '0.4', '--cases', '1', '--t', '0', '50', '--field', 'rans', '--quantities', 'ux',
+                 '--dpi', '30', '--out', str(tmp_path)]) == 0
+    assert (tmp_path / 'St04' / 'case_1' / 'rans_ux.png').exists()
+
+
+def test_invalid_n_phases_are_rejected(capsys):
+    with pytest.raises(SystemExit):
+        main(['compute', '--n-phases', '0'])
+    assert 'not a positive integer' in capsys.readouterr().err
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.Analysis.comparison import CaseComparison, CaseStack, compare_cases, get_quadrature_weights
+from src.Field.field_registry import get_field_registry
+
+CASES = [1, 2, 3]
+
+
+@pytest.fixture(scope='module')
+def stack():
+    return CaseStack.load(0.4, CASES, ['ux', 'p'])
+
+
+def test_stacked_total_field_matches_the_cases(stack):
+    total = stack.get_field('total', t=25, epsilon=0.05)
+    for i_case, ID_MACH in enumerate(CASES):
+        expected = get_field_registry().get_perturbation_field(0.4, ID_MACH).compute_total_fields([25], 0.05)
+        for i_quantity, quantity in enumerate(stack.quantities):
+            assert np.allclose(total[i_case, i_quantity], expected[quantity][0])
+
+
+@pytest.mark.parametrize('weighting', ['area', 'points'])
+def test_norms_match_direct_sums(stack, weighting):
+    comparison = CaseComparison(stack, 'total', window=(0, 10, 0, 2), t=25, epsilon=0.05, weighting=weighting)
+    weights = comparison.weights
+    assert np.isclose(weights.sum(), 1)
+    for i_quantity, quantity in enumerate(stack.quantities):
+        values = comparison.values[:, i_quantity]
+        for a, ID_MACH_a in enumerate(CASES):
+            assert np.isclose(comparison.norms.loc[ID_MACH_a, quantity], np.sqrt((weights * values[a] ** 2).sum()))
+            for b, ID_MACH_b in enumerate(CASES):
+                difference = values[a] - values[b]
+                assert np.isclose(comparison.l2[quantity].loc[ID_MACH_a, ID_MACH_b],
+                                  np.sqrt((weights * difference ** 2).sum()), rtol=1e-6, atol=1e-12)
+                assert np.isclose(comparison.linf[quantity].loc[ID_MACH_a, ID_MACH_b], np.abs(difference).max())
+                anomaly_a = values[a] - (weights * values[a]).sum()
+                anomaly_b = values[b] - (weights * values[b]).sum()
+                correlation = (weights * anomaly_a * anomaly_b).sum() / np.sqrt(
+                    (weights * anomaly_a ** 2).sum() * (weights * anomaly_b ** 2).sum())
+                assert np.isclose(comparison.correlation[quantity].loc[ID_MACH_a, ID_MACH_b], correlation)
+    difference = comparison.get_difference(1, 3)['ux'].to_numpy()
+    assert np.allclose(difference, comparison.get_differences()[0, 2, 0])
+
+
+def test_pairwise_maxima_within_a_small_budget(stack):
+    comparison = CaseComparison(stack, 'mean', memory_budget=1024)
+    reference = CaseComparison(stack, 'mean')
+    for quantity in stack.quantities:
+        assert np.allclose(comparison.linf[quantity], reference.linf[quantity])
+
+
+def test_quadrature_weights_integrate_exactly():
+    x_grid, r_grid = np.linspace(0, 2, 5), np.array([0, 0.1, 0.5, 1.5, 3])
+    # Integral of r dr dx over [0, 2] x [0, 3], exact for the trapezoidal rule
+    assert np.isclose(get_quadrature_weights(x_grid, r_grid).sum(), 2 * 3 ** 2 / 2)
+
+
+def test_compare_cases_loads_the_stack_once():
+    comparisons = compare_cases(0.4, [1, 2], fields=['mean', 'amplitude'],
+                                windows={'core': (0, 10, 0, 1), 'jet': (0, 20, 0, 3)}, quantities=['ux'])
+    assert set(comparisons) == {(field, window) for field in ('mean', 'amplitude') for window in ('core', 'jet')}
+    assert len({id(comparison.stack) for comparison in comparisons.values()}) == 1
+
+
+def test_invalid_arguments(stack):
+    with pytest.raises(ValueError):
+        CaseComparison(CaseStack.load(0.4, [1, 1]), 'mean')
+    with pytest.raises(ValueError):
+        CaseComparison(stack, 'mean', weighting='volume')
+    with pytest.raises(ValueError):
+        stack.get_field('mode')
+    with pytest.raises(ValueError):
+        CaseStack.load(0.4, [1], ['T'])
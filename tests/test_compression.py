@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.toolbox.compression import (compress_arrays, decompress_arrays, get_compressed_info, load_compressed,
+                                     save_compressed)
+
+
+@pytest.fixture
+def arrays():
+    x = np.linspace(0, 10, 120)
+    r = np.linspace(0, 3, 50)
+    rng = np.random.default_rng(0)
+    smooth = np.sin(x)[:, None] * np.exp(-r ** 2)[None, :]
+    return {'x': x, 'r': r, 'ux': 1.5 + smooth + 1e-3 * rng.standard_normal(smooth.shape),
+            'amplitude': (smooth + 1j * smooth[::-1]).astype(np.complex128),
+            'rho': smooth.astype(np.float32), 'total': np.stack([smooth, 2 * smooth])}
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+@pytest.mark.parametrize('rel_error', [1e-2, 1e-4, 1e-7])
+def test_relative_error_bound(arrays, codec, rel_error):
+    decoded = decompress_arrays(compress_arrays(arrays, rel_error=rel_error, codec=codec))
+    for name, values in arrays.items():
+        assert decoded[name].shape == values.shape and decoded[name].dtype == values.dtype
+        if values.ndim == 1:
+            np.testing.assert_array_equal(decoded[name], values)
+        else:
+            assert np.abs(decoded[name] - values).max() <= rel_error * np.abs(values).max()
+
+
+def test_absolute_error_bound_and_ratio(arrays):
+    data = compress_arrays(arrays, abs_error=1e-3)
+    decoded = decompress_arrays(data)
+    for name in ('ux', 'amplitude', 'rho', 'total'):
+        assert np.abs(decoded[name] - arrays[name]).max() <= 1e-3
+    assert len(data) < sum(values.nbytes for values in arrays.values()) / 4
+
+
+def test_lossless_and_nonfinite_values(arrays):
+    arrays['ux'][3, 4] = np.nan
+    arrays['ux'][5, 6] = np.inf
+    decoded = decompress_arrays(compress_arrays(arrays, rel_error=1e-3, lossless=('total',)))
+    np.testing.assert_array_equal(decoded['total'], arrays['total'])
+    assert np.isnan(decoded['ux'][3, 4]) and decoded['ux'][5, 6] == np.inf
+
+
+def test_unknown_lossless_array(arrays):
+    with pytest.raises(ValueError):
+        compress_arrays(arrays, rel_error=1e-3, lossless=('pse/x',))
+
+
+def test_file_round_trip(arrays, tmp_path):
+    path = save_compressed(tmp_path / 'fields.jtz', arrays, rel_error=1e-3, metadata={'St': 0.4})
+    assert get_compressed_info(path.read_bytes())['metadata'] == {'St': 0.4}
+    decoded = load_compressed(path)
+    assert set(decoded) == set(arrays)
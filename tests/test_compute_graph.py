@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.Field.post_process import PostProcess
+from src.toolbox.compute_graph import ComputeGraph
+
+
+@pytest.fixture
+def graph():
+    graph = ComputeGraph()
+    graph.add_input('a', 1)
+    graph.add_input('b', 10)
+    graph.add_node('double', lambda a: 2 * a, ['a'])
+    graph.add_node('shift', lambda b: b + 1, ['b'])
+    graph.add_node('sum', lambda double, shift: double + shift, ['double', 'shift'])
+    return graph
+
+
+def test_nodes_are_memoized(graph):
+    assert graph.get('sum') == 13
+    assert graph.get('sum') == 13
+    assert graph.computations == {'double': 1, 'shift': 1, 'sum': 1}
+    assert graph.get_log() == ['double', 'shift', 'sum']
+
+
+def test_set_only_recomputes_the_dependents(graph):
+    graph.get('sum')
+    graph.get_log()
+    assert sorted(graph.set('a', 2)) == ['double', 'sum']
+    assert graph.is_valid('shift') and not graph.is_valid('sum')
+    assert graph.get('sum') == 15
+    assert graph.get_log() == ['double', 'sum']
+
+
+def test_setting_the_same_value_invalidates_nothing(graph):
+    graph.get('sum')
+    assert graph.set('a', 1) == []
+    assert graph.is_valid('sum')
+
+
+def test_equal_values_of_another_type_invalidate_nothing(graph):
+    graph.get('sum')
+    assert graph.set('a', 1.0) == []
+    graph.set('b', np.arange(3))
+    graph.get('sum')
+    assert graph.set('b', [0, 1, 2]) == []
+    assert graph.set('b', np.arange(3.)) == []
+    assert graph.is_valid('sum')
+    assert sorted(graph.set('b', np.arange(4))) == ['shift', 'sum']
+
+
+def test_post_process_keeps_the_total_field_for_an_equal_phase():
+    post_process = PostProcess(0.4, 1, t=30)
+    post_process.graph.get('total')
+    post_process.t = 30.0
+    post_process.epsilon = 0.01
+    post_process.graph.get('total')
+    assert post_process.graph.computations['total'] == 1
+
+
+def test_invalidate_a_node(graph):
+    graph.get('sum')
+    assert sorted(graph.invalidate('shift')) == ['shift', 'sum']
+    assert graph.is_valid('double')
+    graph.get('sum')
+    assert graph.computations == {'double': 1, 'shift': 2, 'sum': 2}
+
+
+def test_unknown_names_are_rejected(graph):
+    with pytest.raises(ValueError):
+        graph.add_node('product', lambda a, c: a * c, ['a', 'c'])
+    with pytest.raises(ValueError):
+        graph.set('double', 3)
+    with pytest.raises(ValueError):
+        graph.add_input('a', 0)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.Field.conversion import ConversionTable, convert_fields, get_base_quantity, get_conversion_table
+from src.Field.perturbation_field import PerturbationField
+from src.Field.rans_field import RansField
+from src.ReadData.read_info import get_reference_values
+from src.toolbox.dimless_reference_values import T_0, c_0, gamma, p_0, rho_0
+
+# Factors of the former RansField.dimensionalized
+DIMENSIONAL_FACTORS = {'ux': c_0, 'ur': c_0, 'ut': c_0, 'T': (gamma - 1) * T_0, 'p': gamma * p_0, 'rho': rho_0}
+
+
+def get_pse_scales(ID_MACH):
+    """
+    Scales of the former RansField.convert_to_pse_ref and PerturbationField.convert_to_rans_reference.
+    """
+    ref_values = get_reference_values(ID_MACH)
+    return {'ux': ref_values['ux'], 'ur': ref_values['ux'], 'ut': ref_values['ux'],
+            'p': ref_values['rho'] * ref_values['ux'] ** 2, 'rho': ref_values['rho']}
+
+
+def test_factors_match_the_former_conversions():
+    quantities = ('rho', 'ux', 'ur', 'ut', 'p')
+    table = ConversionTable((1, 4), quantities)
+    for i_case, ID_MACH in enumerate((1, 4)):
+        scales = get_pse_scales(ID_MACH)
+        for i_quantity, quantity in enumerate(quantities):
+            assert np.isclose(table.get_factors('dimensionless', 'dimensional')[i_case, i_quantity],
+                              DIMENSIONAL_FACTORS[quantity], rtol=1e-15)
+            assert np.isclose(table.get_factors('pse', 'dimensionless')[i_case, i_quantity],
+                              scales[quantity] / DIMENSIONAL_FACTORS[quantity], rtol=1e-14)
+            assert np.isclose(table.get_factors('dimensionless', 'pse')[i_case, i_quantity],
+                              DIMENSIONAL_FACTORS[quantity] / scales[quantity], rtol=1e-14)
+
+
+def test_field_conversions_match_the_former_ones(perturbation_field):
+    rans_values = RansField(1).values
+    dimensional = RansField.dimensionalized(rans_values)
+    assert list(dimensional) == [quantity for quantity in rans_values if quantity in DIMENSIONAL_FACTORS]
+    for quantity, value in dimensional.items():
+        assert np.array_equal(value.to_numpy(), rans_values[quantity].to_numpy() * DIMENSIONAL_FACTORS[quantity])
+
+    scales = get_pse_scales(1)
+    pse = RansField.convert_to_pse_ref(rans_values, 1)
+    assert 'T' not in pse
+    for quantity, value in pse.items():
+        expected = rans_values[quantity].to_numpy() * DIMENSIONAL_FACTORS[quantity] / scales[quantity]
+        assert np.allclose(value.to_numpy(), expected, rtol=1e-15, atol=0)
+
+    amplitude = perturbation_field.compute_complex_amplitude()
+    converted = PerturbationField.convert_to_rans_reference(amplitude, 1)
+    for name, value in converted.items():
+        quantity = get_base_quantity(name)
+        expected = amplitude[name].to_numpy() * (scales[quantity] / DIMENSIONAL_FACTORS[quantity])
+        assert np.array_equal(value.to_numpy(), expected)
+
+
+def test_stacked_and_in_place_conversions():
+    table = get_conversion_table((1, 2), ('ux', 'p'))
+    assert get_conversion_table((1, 2), ('ux', 'p')) is table
+    values = np.random.default_rng(0).standard_normal((2, 2, 4, 3))
+    converted = table.convert(values, 'pse', 'dimensional')
+    assert np.allclose(converted, values * table.get_factors('pse', 'dimensional')[:, :, None, None])
+    table.convert(values, 'pse', 'dimensional', inplace=True)
+    assert np.array_equal(values, converted)
+    with pytest.raises(TypeError):
+        table.convert(np.ones((2, 2), dtype=int), 'pse', 'dimensional', inplace=True)
+    with pytest.raises(ValueError):
+        table.convert(np.ones((3, 2)), 'pse', 'dimensional')
+
+
+def test_fields_without_frame_are_left_out():
+    fields = {'x': np.arange(3.), 'Re(ux)': pd.DataFrame(np.ones((2, 2))), 'T': np.ones(2), 'p': 2.0}
+    converted = convert_fields(fields, 'dimensionless', 'pse', ID_MACH=1)
+    assert list(converted) == ['Re(ux)', 'p']
+    assert isinstance(converted['Re(ux)'], pd.DataFrame) and np.isscalar(converted['p'])
+    assert get_base_quantity('Re(alpha)') is None and get_base_quantity('abs(rho)') == 'rho'
+
+
+def test_undefined_frames_are_rejected():
+    with pytest.raises(ValueError):
+        ConversionTable((1,), ('T',)).convert(np.ones((1, 2)), 'dimensionless', 'pse')
+    with pytest.raises(ValueError):
+        ConversionTable().convert(np.ones((6, 2)), 'dimensional', 'pse')
+    with pytest.raises(ValueError):
+        ConversionTable((1,), ('alpha',))
+    with pytest.raises(ValueError):
+        ConversionTable((1,), ('ux',)).get_factors('si', 'pse')
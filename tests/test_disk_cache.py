@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.Field.perturbation_field import PerturbationField
+from src.toolbox import disk_cache
+from src.toolbox.disk_cache import DiskCache, get_code_version, hash_inputs
+
+
+@pytest.fixture
+def default_cache(tmp_path):
+    cache = DiskCache(tmp_path / 'cache')
+    disk_cache.set_default_cache(cache)
+    yield cache
+    disk_cache.set_default_cache(None)
+
+
+def test_product_is_computed_once(tmp_path):
+    cache = DiskCache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(5)
+
+    for _ in range(2):
+        assert np.array_equal(cache.get_or_compute('product', {'x': np.ones(3)}, compute), np.arange(5))
+    assert len(calls) == 1
+    assert cache.counters['product'] == {'hits': 1, 'misses': 1}
+    # A new cache on the same directory (another process) reads the stored product
+    assert np.array_equal(DiskCache(tmp_path).get_or_compute('product', {'x': np.ones(3)}, compute), np.arange(5))
+    assert len(calls) == 1
+
+
+def test_inputs_and_version_change_the_key(tmp_path):
+    file = tmp_path / 'data.dat'
+    file.write_text('1 2 3\n')
+    key = DiskCache.get_key('product', [file, np.ones(3)])
+    assert DiskCache.get_key('product', [file, np.ones(3)], version='2') != key
+    assert DiskCache.get_key('product', [file, np.zeros(3)]) != key
+    file.write_text('1 2 4\n')
+    os.utime(file, ns=(0, 10 ** 9))
+    assert DiskCache.get_key('product', [file, np.ones(3)]) != key
+    assert hash_inputs(pd.Series([1.0], index=[0])) != hash_inputs(pd.Series([1.0], index=[1]))
+    assert get_code_version(hash_inputs) != get_code_version(DiskCache)
+
+
+def test_least_recently_used_products_are_evicted(tmp_path):
+    cache = DiskCache(tmp_path)
+    for name in ('first', 'second'):
+        cache.get_or_compute(name, [], lambda: np.zeros(1000))
+    cache.max_bytes = cache.get_size() + 100
+    # A hit on the oldest product makes the other one the least recently used
+    paths = sorted(tmp_path.glob('*.pkl'), key=lambda path: path.stat().st_mtime_ns)
+    os.utime(paths[0], ns=(paths[1].stat().st_mtime_ns + 10 ** 9,) * 2)
+    cache.get_or_compute('third', [], lambda: np.zeros(1000))
+    assert paths[0].exists() and not paths[1].exists()
+    assert cache.get_size() <= cache.max_bytes
+    cache.clear()
+    assert cache.get_size() == 0
+
+
+def test_pipeline_reuses_the_rans_values(default_cache):
+    first = PerturbationField(0.4, 1)
+    second = PerturbationField(0.4, 1)
+    assert default_cache.counters['rans_values'] == {'hits': 1, 'misses': 1}
+    for quantity, value in first.rans_values.items():
+        assert np.array_equal(value.to_numpy(), second.rans_values[quantity].to_numpy())
+
+
+def test_invalid_size(tmp_path):
+    with pytest.raises(ValueError):
+        DiskCache(tmp_path, max_bytes=0)
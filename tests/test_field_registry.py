@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.Field.field_registry import FieldRegistry
+from src.Field.post_process import PostProcess
+
+
+def test_post_processes_of_a_case_share_the_field():
+    post_process_0 = PostProcess(0.4, 1, t=0)
+    post_process_25 = PostProcess(0.4, 1, t=25, epsilon=0.05)
+    assert post_process_25.perturbation_field is post_process_0.perturbation_field
+    assert PostProcess(1.0, 1).perturbation_field is not post_process_0.perturbation_field
+
+
+def test_concurrent_requests_load_the_field_once():
+    registry = FieldRegistry()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        fields = list(executor.map(lambda _: registry.get_rans_field(1), range(8)))
+    assert all(field is fields[0] for field in fields)
+    assert (registry.misses, registry.hits) == (1, 7)
+
+
+def test_shared_arrays_are_read_only():
+    field = FieldRegistry().get_rans_field(1)
+    with pytest.raises(ValueError):
+        field.values['ux'].to_numpy()[0, 0] = 0
+
+
+def test_least_recently_used_fields_are_evicted():
+    registry = FieldRegistry()
+    first = registry.get_rans_field(1)
+    registry.get_rans_field(2)
+    nbytes = registry.get_stats()['entries'][('rans', 1)]
+    registry.set_max_bytes(2 * nbytes + nbytes // 2)
+    # Case 1 becomes the most recently used, case 2 is dropped when case 3 is loaded
+    assert registry.get_rans_field(1) is first
+    registry.get_rans_field(3)
+    assert list(registry.get_stats()['entries']) == [('rans', 1), ('rans', 3)]
+    assert registry.evictions == 1
+    registry.set_max_bytes(nbytes + 1)
+    assert list(registry.get_stats()['entries']) == [('rans', 3)]
+    registry.evict()
+    assert registry.get_stats()['nbytes'] == 0
+    with pytest.raises(ValueError):
+        registry.set_max_bytes(0)
@@ -0,0 +1,58 @@
+import os
+from unittest import mock
+
+import pytest
+
+from src.Plot import figure_cache
+from src.Plot.figure_cache import FigureCache
+from src.toolbox.path_directories import get_case_files
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    """
+    Extra data file of the case, so that the bundled data are never touched.
+    """
+    file = tmp_path / 'extra.dat'
+    file.write_text('0\n')
+    case_files = get_case_files(0.4, 1) + [file]
+    with mock.patch.object(figure_cache, 'get_case_files', return_value=case_files):
+        yield file
+
+
+def test_second_plot_is_a_hit(tmp_path, data_file):
+    cache = FigureCache(tmp_path / 'figures')
+    first = cache.plot_field(0.4, 1, 'rans', 'ux', x_max=4, r_max=2)
+    second = cache.plot_field(0.4, 1, 'rans', 'ux', x_max=4, r_max=2)
+    assert first == second and first.stat().st_size > 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Other parameters give another figure
+    assert cache.plot_field(0.4, 1, 'rans', 'ux', x_max=5, r_max=2) != first
+    assert cache.misses == 2
+
+
+def test_data_change_invalidates_the_figure(tmp_path, data_file):
+    cache = FigureCache(tmp_path / 'figures')
+    first = cache.plot_line(0.4, 1, 'rans', 'ux', 10)
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    second = cache.plot_line(0.4, 1, 'rans', 'ux', 10)
+    assert second != first
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_total_size_is_capped(tmp_path, data_file):
+    cache = FigureCache(tmp_path / 'figures')
+    first = cache.plot_line(0.4, 1, 'rans', 'ux', 10)
+    cache.max_bytes = first.stat().st_size + 1
+    second = cache.plot_line(0.4, 1, 'rans', 'ux', 20)
+    assert not first.exists() and second.exists()
+    cache.clear()
+    assert not second.exists()
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        FigureCache(tmp_path, max_bytes=0)
+    with pytest.raises(ValueError):
+        FigureCache(tmp_path).plot_field(0.4, 1, 'rans', 'ux', fmt='jpg')
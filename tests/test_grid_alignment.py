@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.Field.grid_alignment import align_axis
+
+SOURCE = np.linspace(0, 10, 101)
+
+
+@pytest.mark.parametrize('target, kind, index', [
+    (SOURCE.copy(), 'identical', slice(None)),
+    (SOURCE[10:90:4], 'strided', slice(10, 87, 4)),
+    (SOURCE[[0, 3, 4, 50, 100]], 'subset', np.array([0, 3, 4, 50, 100])),
+    (np.array([0.0, 0.05, 0.2]), 'partial', np.array([0, -1, 2])),
+    (np.array([0.05, 0.15]), 'none', None),
+])
+def test_align_axis_kinds(target, kind, index):
+    alignment = align_axis(SOURCE, target)
+    assert alignment.kind == kind
+    if isinstance(index, np.ndarray):
+        np.testing.assert_array_equal(alignment.index, index)
+    else:
+        assert alignment.index == index
+
+
+def test_align_axis_tolerance():
+    # The PSE files are written with 6 decimals
+    assert align_axis(SOURCE, SOURCE + 5e-7).kind == 'identical'
+    assert align_axis(SOURCE, SOURCE + 1e-4).kind == 'none'
+
+
+def test_strided_alignment_is_a_view():
+    alignment = align_axis(SOURCE, SOURCE[::2])
+    assert alignment.is_view
+    np.testing.assert_array_equal(SOURCE[alignment.index], SOURCE[::2])
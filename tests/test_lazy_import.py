@@ -0,0 +1,20 @@
+import json
+
+import pytest
+
+from src.Benchmark.import_time import DEFAULT_MODULES, measure_import_time
+from src.toolbox.lazy_import import LazyModule
+
+
+def test_module_is_imported_on_first_access():
+    module = LazyModule('json')
+    assert 'not loaded' in repr(module)
+    assert module.dumps([1]) == json.dumps([1])
+    assert 'not loaded' not in repr(module)
+    with pytest.raises(AttributeError):
+        module.missing_attribute
+
+
+@pytest.mark.parametrize('module', DEFAULT_MODULES)
+def test_import_leaves_heavy_dependencies_unloaded(module):
+    assert measure_import_time(module, repeat=1)['loaded'] == []
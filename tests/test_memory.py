@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src.Field.post_process import PostProcess
+from src.toolbox.memory import MemoryMonitor, get_memory_report
+
+
+def test_views_are_counted_once_and_copies_reported():
+    array = np.arange(10 ** 4, dtype=float)
+    report = get_memory_report({'first': {'a': array}, 'second': {'view': array[::2], 'copy': array.copy()}})
+    assert report.entries['first'] == {'buffers': 1, 'nbytes': array.nbytes, 'own_nbytes': array.nbytes}
+    # The view shares the buffer of `array`, the copy holds the same data
+    assert report.entries['second']['own_nbytes'] == array.nbytes
+    assert report.total == 2 * array.nbytes
+    assert report.duplicates == [['first: a', 'second: copy']]
+    assert report.get_duplicated_bytes() == array.nbytes
+    assert 'duplicate copies' in report.get_summary()
+
+
+def test_report_of_a_post_process():
+    post_process = PostProcess(0.4, 1, t=25)
+    report = post_process.get_memory_report()
+    assert {'raw perturbation', 'interpolated RANS', 'total field'} <= set(report.entries)
+    assert report.entries['total field']['nbytes'] > 0
+    assert report.total <= sum(entry['nbytes'] for entry in report.entries.values())
+
+
+def test_monitor_records_the_peak_of_each_stage():
+    monitor = MemoryMonitor()
+    with monitor.stage('outer'):
+        with monitor.stage('allocate'):
+            buffer = np.ones(50 * 1024 ** 2 // 8)
+            buffer[::512] = 2
+    assert monitor.stats['allocate']['calls'] == 1
+    assert monitor.stats['allocate']['peak_increase'] >= 40 * 1024 ** 2
+    assert monitor.stats['outer']['peak_increase'] >= monitor.stats['allocate']['peak_increase'] - 1024 ** 2
+    assert 'allocate' in monitor.get_summary()
+    with pytest.raises(ValueError):
+        MemoryMonitor(interval=0)
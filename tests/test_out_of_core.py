@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.Field.field_registry import get_field_registry
+from src.Field.out_of_core import evaluate_total_volume, get_chunk_shape
+
+TS = [0, 10, 35, 50, 80]
+
+
+@pytest.fixture(scope='module')
+def total_fields():
+    registry = get_field_registry()
+    return {ID_MACH: registry.get_perturbation_field(0.4, ID_MACH).compute_total_fields(TS, 0.05)
+            for ID_MACH in (1, 2)}
+
+
+def test_volume_matches_the_total_fields(tmp_path, total_fields):
+    # A small budget splits the volume into chunks of a few x stations
+    result = evaluate_total_volume(0.4, [1, 2], TS, epsilon=0.05, quantities=['ux', 'p'],
+                                   memory_budget=4 * 1024 ** 2, out_dir=tmp_path, percentiles=(50,))
+    assert result.chunk_shape[0] == len(TS) and result.chunk_shape[2] < total_fields[1]['ux'].shape[1]
+    for i_case, ID_MACH in enumerate((1, 2)):
+        for quantity in ('ux', 'p'):
+            expected = total_fields[ID_MACH][quantity]
+            assert np.allclose(result.volumes[quantity][i_case, :, 0], expected)
+            assert np.allclose(result.reductions['min'][quantity][i_case, 0], expected.min(axis=0))
+            assert np.allclose(result.reductions['mean'][quantity][i_case, 0], expected.mean(axis=0))
+            assert np.allclose(result.reductions['p50'][quantity][i_case, 0], np.percentile(expected, 50, axis=0))
+    assert not result.volumes['ux'].flags.writeable
+
+
+def test_axisymmetric_mode_does_not_depend_on_theta(tmp_path):
+    result = evaluate_total_volume(0.4, [1], [25], thetas=[0, 1, 2], quantities=['ur'], out_dir=tmp_path)
+    volume = result.volumes['ur'][0, 0]
+    assert np.allclose(volume[1], volume[0]) and np.allclose(volume[2], volume[0])
+
+
+def test_chunk_shape_respects_the_budget():
+    n_t, n_theta, n_x = get_chunk_shape(100, 4, 50, 20, 100 * 20 * 24 * 7, 24)
+    assert (n_t, n_theta, n_x) == (100, 1, 7)
+    assert get_chunk_shape(100, 4, 50, 20, 30 * 20 * 24, 24) == (30, 1, 1)
+    with pytest.raises(ValueError):
+        get_chunk_shape(100, 4, 50, 20, 10 * 24, 24)
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        evaluate_total_volume(0.4, [1], [120], out_dir=tmp_path)
+    with pytest.raises(ValueError):
+        evaluate_total_volume(0.4, [1], [0], reductions=('median',), out_dir=tmp_path)
+    with pytest.raises(ValueError):
+        evaluate_total_volume(0.4, [1], [0], memory_budget=1024, out_dir=tmp_path)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from src.Field.path_extraction import LinePath, PathExtractor, extract_along_path
+from src.Field.post_process import PostProcess
+
+
+def test_polyline_is_resampled_at_constant_arc_length():
+    path = LinePath([0, 3, 3], [0, 0, 4], ds=0.1)
+    assert path.s[-1] == pytest.approx(7)
+    np.testing.assert_allclose(np.diff(path.s), 0.1)
+    # The resampled points follow the polyline: the corner (3, 0) is at s = 3
+    np.testing.assert_allclose(np.interp(3, path.s, path.x), 3)
+    np.testing.assert_allclose(path.r[path.s <= 3], 0, atol=1e-12)
+    np.testing.assert_allclose(path.x[path.s >= 3], 3)
+    np.testing.assert_allclose(np.hypot(np.diff(path.x), np.diff(path.r)), 0.1, rtol=1e-9)
+
+
+def test_parametric_path_length():
+    path = LinePath.from_parametric(lambda u: (2 + np.cos(u), 1 + np.sin(u)), 0, np.pi, ds=0.01, n_eval=20000)
+    assert path.s[-1] == pytest.approx(np.pi, rel=1e-6)
+    np.testing.assert_allclose(np.hypot(path.x - 2, path.r - 1), 1, atol=1e-6)
+
+
+def test_jet_lines():
+    ray = LinePath.ray(30, 2)
+    assert (ray.x[-1], ray.r[-1]) == pytest.approx((np.sqrt(3), 1.5))
+    np.testing.assert_allclose(LinePath.lipline(1, 4).r, 0.5)
+    assert LinePath.centreline(0, 8, ds=0.5).s[-1] == pytest.approx(8)
+
+
+def test_invalid_paths():
+    with pytest.raises(ValueError):
+        LinePath([0], [0])
+    with pytest.raises(ValueError):
+        LinePath([0, 1], [0, 1], ds=0)
+
+
+def test_extractor_is_exact_for_a_bilinear_field():
+    x_grid, r_grid = np.linspace(0, 10, 51), np.linspace(0, 3, 31) ** 1.5 / np.sqrt(3)
+    values = 2 + 0.5 * x_grid[:, None] - r_grid[None, :] + 0.1 * x_grid[:, None] * r_grid[None, :]
+    path = LinePath.ray(20, 5, ds=0.03)
+    extracted = PathExtractor(path, x_grid, r_grid)(np.stack([values, -values]))
+    expected = 2 + 0.5 * path.x - path.r + 0.1 * path.x * path.r
+    np.testing.assert_allclose(extracted, np.stack([expected, -expected]), atol=1e-12)
+    with pytest.raises(ValueError):
+        PathExtractor(LinePath.lipline(0, 12), x_grid, r_grid)
+
+
+def test_extract_along_path_stacks_the_cases():
+    path = LinePath.lipline(0, 8)
+    extracted = extract_along_path(path, 0.4, [1, 2], fields=('rans', 'pse', 'total'), quantities=['ux', 'p'],
+                                   ts=[0, 50], epsilon=0.05)
+    assert extracted['rans']['ux'].shape == (2, len(path))
+    assert np.iscomplexobj(extracted['pse']['ux'])
+    assert extracted['total']['p'].shape == (2, 2, len(path))
+
+    local = PostProcess(0.4, 2, epsilon=0.05).extract_path(path, quantities=['ux', 'p'], ts=[0, 50])
+    for field in ('rans', 'pse', 'total'):
+        np.testing.assert_allclose(extracted[field]['ux'][1], local[field]['ux'], rtol=1e-12)
+
+
+def test_quantities_are_checked_per_field():
+    path = LinePath.lipline(0, 8)
+    extracted = extract_along_path(path, 0.4, 1, fields=('pse',), quantities=['abs(ux)', 'Re(p)'])
+    local = PostProcess(0.4, 1).extract_path(path, fields=('pse',), quantities=['abs(ux)', 'Re(p)'])
+    np.testing.assert_allclose(extracted['pse']['abs(ux)'][0], local['pse']['abs(ux)'])
+    assert extract_along_path(path, 0.4, 1, fields=('rans',), quantities=['T'])['rans']['T'].shape == (1, len(path))
+    for fields, quantities in ((('rans', 'pse'), ['T']), (('total',), ['abs(ux)']), (('stability',), ['ux'])):
+        with pytest.raises(ValueError):
+            extract_along_path(path, 0.4, 1, fields=fields, quantities=quantities)
+        with pytest.raises(ValueError):
+            PostProcess(0.4, 1).extract_path(path, fields=fields, quantities=quantities)
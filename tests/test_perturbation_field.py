@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('epsilon', [0, 0.01, 0.2])
+def test_compute_total_fields_matches_compute_total_field(perturbation_field, epsilon):
+    ts = [0, 12.5, 50, 99]
+    total_fields = perturbation_field.compute_total_fields(ts, epsilon)
+    for k, t in enumerate(ts):
+        total_field = perturbation_field.compute_total_field(t, epsilon)
+        for quantity, values in total_fields.items():
+            np.testing.assert_allclose(values[k], total_field[quantity].to_numpy(), rtol=1e-12, atol=1e-12)
+
+
+def test_compute_total_fields_rejects_invalid_phases(perturbation_field):
+    with pytest.raises(ValueError):
+        perturbation_field.compute_total_fields([0, 101])
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src.Analysis.comparison import CaseStack, get_quadrature_weights
+from src.Analysis.pod import ArraySnapshots, FieldSnapshots, compute_pod
+
+N_SNAPSHOTS, NX, NR = 40, 8, 6
+
+
+@pytest.fixture(scope='module')
+def snapshots():
+    # Rank-6 snapshots with decreasing energies plus a small noise, on a stretched r grid
+    rng = np.random.default_rng(0)
+    x_grid, r_grid = np.linspace(0, 4, NX), np.array([0, 0.1, 0.3, 0.6, 1.0, 2.0])
+    basis = rng.standard_normal((6, 2 * NX * NR))
+    amplitudes = rng.standard_normal((N_SNAPSHOTS, 6)) * 2.0 ** -np.arange(6)
+    values = 3 + amplitudes @ basis + 1e-6 * rng.standard_normal((N_SNAPSHOTS, 2 * NX * NR))
+    values = values.reshape(N_SNAPSHOTS, 2, NX, NR)
+    return ArraySnapshots({'ux': values[:, 0], 'p': values[:, 1]}, x_grid, r_grid)
+
+
+def dense_svd(snapshots, weights):
+    """
+    Singular values and left singular vectors of the weighted fluctuations, with a dense SVD.
+    """
+    values = snapshots.get_block(0, len(snapshots)).reshape(len(snapshots), -1)
+    anomalies = values - values.mean(axis=0)
+    w = np.broadcast_to(weights, (len(snapshots.quantities), *weights.shape)).ravel()
+    u, s, _ = np.linalg.svd(anomalies * np.sqrt(w), full_matrices=False)
+    return u, s, anomalies
+
+
+@pytest.mark.parametrize('weighting', ['area', 'points'])
+def test_exact_and_randomized_match_the_dense_svd(snapshots, weighting):
+    weights = get_quadrature_weights(snapshots.x_grid, snapshots.r_grid) if weighting == 'area' else np.ones((NX, NR))
+    u, s, anomalies = dense_svd(snapshots, weights)
+    energies = s[:5] ** 2 / N_SNAPSHOTS
+    for method in ('exact', 'randomized'):
+        pod = compute_pod(snapshots, n_modes=5, method=method, weighting=weighting, seed=0)
+        assert np.allclose(pod.energies, energies, rtol=1e-6)
+        # Same temporal coefficients up to the sign of each mode
+        for i in range(5):
+            assert np.isclose(abs(pod.coefficients[:, i] @ u[:, i]), s[i], rtol=1e-6)
+        # Orthonormal modes for the weighted inner product
+        modes = pod.modes.reshape(5, -1)
+        w = np.broadcast_to(pod.weights, pod.mean.shape).ravel()
+        assert np.allclose((modes * w) @ modes.T, np.eye(5), atol=1e-8)
+        assert np.allclose(pod.project(snapshots.get_block(0, N_SNAPSHOTS)), pod.coefficients, atol=1e-8)
+
+
+def test_streamed_blocks_give_the_same_decomposition(snapshots):
+    pod = compute_pod(snapshots, n_modes=6, weighting='points')
+    # Room for 3 snapshots per block only
+    streamed = compute_pod(snapshots, n_modes=6, weighting='points', memory_budget=6 * 8 * 4 * 2 * NX * NR)
+    assert np.allclose(streamed.energies, pod.energies)
+    assert np.allclose(np.abs(streamed.coefficients), np.abs(pod.coefficients))
+    # Six modes capture the snapshots up to the noise
+    block = snapshots.get_block(0, N_SNAPSHOTS)
+    assert np.allclose(pod.reconstruct(pod.coefficients), block, atol=1e-4)
+    assert np.isclose(pod.energy_fraction.sum(), 1, atol=1e-9)
+
+
+def test_field_snapshots_are_total_fields():
+    stack = CaseStack.load(0.4, [1, 2], ['ux', 'ur'])
+    field_snapshots = FieldSnapshots(stack, ts=[0, 25, 50], epsilon=0.05)
+    assert field_snapshots.labels[4] == (2, 25.0)
+    assert np.allclose(field_snapshots.get_block(4, 5)[0], stack.get_field('total', t=25, epsilon=0.05)[1])
+    pod = compute_pod(field_snapshots, n_modes=3, window=(0, 10, 0, 2))
+    assert pod.modes.shape[:2] == (3, 2) and pod.get_mode(0)['ux'].shape == pod.modes.shape[2:]
+
+
+def test_invalid_arguments(snapshots):
+    with pytest.raises(ValueError):
+        compute_pod(snapshots, method='svd')
+    with pytest.raises(ValueError):
+        compute_pod(snapshots, n_modes=N_SNAPSHOTS + 1)
+    with pytest.raises(ValueError):
+        compute_pod(snapshots, memory_budget=100)
+    with pytest.raises(ValueError):
+        ArraySnapshots({'ux': np.zeros((2, NX, NR)), 'p': np.zeros((3, NX, NR))}, snapshots.x_grid, snapshots.r_grid)
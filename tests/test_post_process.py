@@ -0,0 +1,48 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import pyplot as plt
+
+from src.Field.post_process import PostProcess
+
+
+@pytest.fixture
+def post_process():
+    yield PostProcess(0.4, 1, t=25, epsilon=0.05)
+    plt.close('all')
+
+
+def test_plot_panels_computes_each_field_once(post_process):
+    fig = post_process.plot_panels([('total', 'ux'), ('total', 'ux', [10, 50]), ('total', 'ur'), ('rans', 'ux')],
+                                   ncols=3, show=False)
+    assert post_process.graph.computations['total'] == 1
+    panels = [ax for ax in fig.axes if ax.get_label() != '<colorbar>']
+    assert len(panels) == 6 and sum(ax.get_visible() for ax in panels) == 4
+    # One colorbar per contour field and quantity
+    assert len(fig.axes) - len(panels) == 3
+    assert len(panels[1].get_lines()) == 2
+
+
+def test_plot_panels_shares_the_levels(post_process):
+    fig = post_process.plot_panels([('rans', 'ux'), ('rans', 'ux')], x_max=5, show=False)
+    first, second = (ax.collections[0] for ax in fig.axes[:2])
+    np.testing.assert_array_equal(first.levels, second.levels)
+    window = post_process.perturbation_field.rans_values['ux'].to_numpy()[post_process.get_window(x_max=5, r_max=5)]
+    assert first.levels[0] == pytest.approx(window.min()) and first.levels[-1] == pytest.approx(window.max())
+
+
+def test_plot_panels_draws_a_constant_window(post_process):
+    zeros = pd.DataFrame(np.zeros((len(post_process.x_grid), len(post_process.r_grid))))
+    with mock.patch.object(PostProcess, '_PostProcess__get_field', return_value=zeros):
+        fig = post_process.plot_panels([('total', 'ut')], show=False)
+    levels = fig.axes[0].collections[0].levels
+    assert np.all(np.diff(levels) > 0) and levels[0] < 0 < levels[-1]
+
+
+@pytest.mark.parametrize('panels, error', [([('total',)], TypeError), ([['total', 'ux']], TypeError),
+                                           ([('mean', 'ux')], ValueError)])
+def test_plot_panels_rejects_invalid_panels(post_process, panels, error):
+    with pytest.raises(error):
+        post_process.plot_panels(panels, show=False)
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.Field.field_registry import get_field_registry
+from src.Field.prefetch import CasePrefetcher
+
+PLAN = [(0.4, 3), (0.4, 4), (0.4, 5)]
+
+
+@pytest.fixture
+def registry():
+    registry = get_field_registry()
+    for St, ID_MACH in PLAN:
+        registry.evict(('perturbation', St, ID_MACH))
+    return registry
+
+
+def wait_for(registry, key, timeout=30):
+    start = time.perf_counter()
+    while key not in registry.get_stats()['entries']:
+        assert time.perf_counter() - start < timeout
+        time.sleep(0.01)
+
+
+def test_next_cases_are_loaded_ahead(registry):
+    cases = []
+    with CasePrefetcher(PLAN, depth=2, t=25, epsilon=0.05) as prefetcher:
+        for post_process in prefetcher:
+            if not cases:
+                # The two next cases are loaded while the caller works on the first one
+                wait_for(registry, ('perturbation', 0.4, 5))
+            cases.append((post_process.St, post_process.ID_MACH))
+            assert (post_process.t, post_process.epsilon) == (25, 0.05)
+            assert post_process.perturbation_field is registry.get_perturbation_field(0.4, post_process.ID_MACH)
+    assert cases == PLAN
+    assert prefetcher.wait_time >= 0
+
+
+def test_process_pool_registers_the_loaded_fields(registry):
+    with CasePrefetcher(PLAN[:2], depth=2, executor='process') as prefetcher:
+        post_processes = list(prefetcher)
+    assert [post_process.ID_MACH for post_process in post_processes] == [3, 4]
+    for post_process in post_processes:
+        assert post_process.perturbation_field is registry.get_perturbation_field(0.4, post_process.ID_MACH)
+    registry.evict(('perturbation', 0.4, 3))
+    expected = registry.get_perturbation_field(0.4, 3).rans_values['ux'].to_numpy()
+    assert np.array_equal(post_processes[0].perturbation_field.rans_values['ux'].to_numpy(), expected)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        CasePrefetcher(PLAN, depth=0)
+    with pytest.raises(ValueError):
+        CasePrefetcher(PLAN, executor='gpu')
+    with pytest.raises(ValueError):
+        CasePrefetcher(PLAN, max_bytes=0)
@@ -0,0 +1,63 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+from src.Field import post_process as post_process_module
+from src.Field.post_process import PostProcess
+from src.Plot.raster import FieldPyramid, draw_raster
+
+
+@pytest.fixture
+def pyramid():
+    # Non-uniform grid refined near r = 0, with a field linear in x and r
+    x_grid = np.linspace(0, 10, 101)
+    r_grid = np.linspace(0, 1, 41) ** 2 * 5
+    values = 2 * x_grid[:, None] + r_grid[None, :]
+    return FieldPyramid(x_grid, r_grid, values, max_cells=512)
+
+
+def test_levels_halve_the_resolution(pyramid):
+    assert len(pyramid.levels) > 2
+    for finer, coarser in zip(pyramid.levels, pyramid.levels[1:]):
+        assert finer.shape == (2 * coarser.shape[0], 2 * coarser.shape[1])
+        assert np.isclose(finer.mean(), coarser.mean())
+    assert pyramid.extent == (0, 10, 0, 5)
+
+
+def test_base_level_interpolates_the_field(pyramid):
+    n_r, n_x = pyramid.levels[0].shape
+    x_centres = (np.arange(n_x) + 0.5) * 10 / n_x
+    r_centres = (np.arange(n_r) + 0.5) * 5 / n_r
+    # Bilinear interpolation is exact for a linear field
+    assert np.allclose(pyramid.levels[0], 2 * x_centres[None, :] + r_centres[:, None])
+
+
+def test_view_matches_the_output_size(pyramid):
+    coarse, _ = pyramid.get_view(0, 10, 0, 5, 20, 20)
+    fine, _ = pyramid.get_view(0, 10, 0, 5, 200, 200)
+    assert fine.size > coarse.size
+    assert coarse.shape[0] >= 20 and coarse.shape[1] >= 20
+    view, (x_min, x_max, r_min, r_max) = pyramid.get_view(2, 4, 1, 2, 50, 50)
+    assert x_min <= 2 and x_max >= 4 and r_min <= 1 and r_max >= 2
+    assert view.shape[1] < pyramid.levels[0].shape[1]
+
+
+def test_draw_raster(pyramid):
+    fig, ax = plt.subplots()
+    image = draw_raster(ax, pyramid, 2, 4, 1, 2, cmap='jet')
+    assert ax.get_xlim() == (2, 4) and ax.get_ylim() == (1, 2)
+    assert image.get_array().shape[1] > 0
+    plt.close(fig)
+
+
+def test_pyramids_are_reused_and_evicted():
+    post_process = PostProcess(0.4, 1)
+    post_process.max_cached_pyramids = 2
+    with mock.patch.object(post_process_module, 'FieldPyramid', wraps=FieldPyramid) as constructor:
+        for name_value in ('ux', 'ur', 'ux', 'ut', 'ur'):
+            post_process.plot_field('rans', name_value, show=False, raster=True)
+            plt.close('all')
+    # 'ux' is reused, 'ur' is evicted by 'ut' and built again
+    assert constructor.call_count == 4
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.Field.regridding import get_regridder
+
+SOURCE_X = np.linspace(0, 10, 41) ** 1.2 / 10 ** 0.2
+SOURCE_R = np.linspace(0, 3, 31)
+TARGET_X = np.linspace(0.1, 9.9, 57)
+TARGET_R = np.linspace(0.05, 2.95, 23)
+
+
+def _evaluate(function, x, r):
+    return function(*np.meshgrid(x, r, indexing='ij'))
+
+
+def test_linear_regridder_is_exact_for_a_linear_field():
+    function = lambda x, r: 2 * x - 3 * r + 1  # noqa: E731
+    regridder = get_regridder(SOURCE_X, SOURCE_R, TARGET_X, TARGET_R)
+    regridded = regridder(_evaluate(function, SOURCE_X, SOURCE_R))
+    assert regridded.shape == (len(TARGET_X), len(TARGET_R))
+    np.testing.assert_allclose(regridded, _evaluate(function, TARGET_X, TARGET_R), atol=1e-10)
+
+
+@pytest.mark.parametrize('method', ['quadratic', 'cubic'])
+def test_polynomial_regridders_are_exact_for_a_quadratic_field(method):
+    function = lambda x, r: x ** 2 - x * r + 0.5 * r ** 2  # noqa: E731
+    regridder = get_regridder(SOURCE_X, SOURCE_R, TARGET_X, TARGET_R, method=method)
+    np.testing.assert_allclose(regridder(_evaluate(function, SOURCE_X, SOURCE_R)),
+                               _evaluate(function, TARGET_X, TARGET_R), atol=1e-9)
+
+
+def test_higher_orders_are_more_accurate_on_a_smooth_field():
+    function = lambda x, r: np.sin(0.5 * x) * np.exp(-r ** 2)  # noqa: E731
+    exact = _evaluate(function, TARGET_X, TARGET_R)
+    errors = {method: np.abs(get_regridder(SOURCE_X, SOURCE_R, TARGET_X, TARGET_R, method=method)(
+        _evaluate(function, SOURCE_X, SOURCE_R)) - exact).max() for method in ('linear', 'quadratic', 'cubic')}
+    assert errors['linear'] < 1e-2
+    assert errors['cubic'] < errors['quadratic'] < errors['linear'] / 4
+
+
+def test_regridder_stacks_quantities_and_fills_outside():
+    values = np.stack([_evaluate(lambda x, r: x + r, SOURCE_X, SOURCE_R),
+                       _evaluate(lambda x, r: x * r, SOURCE_X, SOURCE_R)])
+    target_x = np.array([5.0, 12.0])
+    regridded = get_regridder(SOURCE_X, SOURCE_R, target_x, SOURCE_R, fill='nan')(values)
+    assert regridded.shape == (2, 2, len(SOURCE_R))
+    np.testing.assert_allclose(regridded[0, 0], 5 + SOURCE_R, atol=1e-10)
+    assert np.isnan(regridded[:, 1]).all()
+
+
+def test_regridder_is_cached():
+    assert get_regridder(SOURCE_X, SOURCE_R, TARGET_X, TARGET_R) is \
+        get_regridder(SOURCE_X.copy(), SOURCE_R.copy(), TARGET_X, TARGET_R)
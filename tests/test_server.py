@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from src.Field.path_extraction import LinePath
+from src.Field.post_process import PostProcess
+from src.Server.client import FieldClient, RemotePostProcess
+from src.Server.server import FieldServer
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = FieldServer(port=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope='module')
+def remote(server):
+    return RemotePostProcess(FieldClient(server.url), 0.4, 1, t=25, epsilon=0.05)
+
+
+def test_server_binds_a_free_port(server):
+    assert server.port != 0
+    assert FieldClient(server.url).get_health()['status'] == 'ok'
+
+
+def test_window_round_trip(remote):
+    post_process = PostProcess(0.4, 1, t=25, epsilon=0.05)
+    x, r, values = remote.get_field_in_window('total', 'ux', x_max=5, r_max=2)
+    total = post_process.perturbation_field.compute_total_field(25, 0.05)['ux']
+    x_local, r_local, values_local = post_process.get_value_in_field(total, x_max=5, r_max=2)
+    np.testing.assert_array_equal(x, x_local)
+    np.testing.assert_array_equal(r, r_local)
+    np.testing.assert_allclose(values, values_local.to_numpy(), rtol=1e-12)
+
+
+def test_stats_round_trip(remote):
+    local = PostProcess(0.4, 1).get_fields_stats('ux')
+    np.testing.assert_allclose(remote.get_fields_stats('ux').to_numpy(), local.to_numpy())
+
+
+def test_extract_path_round_trip(remote):
+    path = LinePath.lipline()
+    local = PostProcess(0.4, 1, t=25, epsilon=0.05).extract_path(path, fields=('rans', 'total'), quantities=['ux'])
+    served = remote.extract_path(path, fields=('rans', 'total'), quantities=['ux'])
+    for field in ('rans', 'total'):
+        np.testing.assert_allclose(served[field]['ux'], local[field]['ux'], rtol=1e-10)
+    assert 'abs(ux)' in remote.extract_path(path, fields=('pse',))['pse']
+
+
+def test_errors_are_raised_on_the_client(remote):
+    with pytest.raises(ValueError):
+        remote.get_field_in_window('total', 'T')
+    with pytest.raises(FileNotFoundError):
+        RemotePostProcess(remote.client, 0.4, 999).get_field_in_window('rans', 'ux')
@@ -0,0 +1,61 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.Field.shared_dataset import (SEGMENT_PREFIX, SharedDataset, attach_dataset, cleanup_stale_segments,
+                                      get_attached_dataset)
+
+TS = [0, 25, 60]
+
+
+def worker_task(St, ID_MACH):
+    """
+    Task of the workers: total fields from the attached dataset, and whether its arrays are writeable.
+    """
+    case = get_attached_dataset()[St, ID_MACH]
+    return case.compute_total_fields(TS, 0.05)['ux'], case.amplitude['ux'].flags.writeable
+
+
+def test_workers_attach_to_the_dataset(perturbation_field):
+    with SharedDataset.create([(0.4, 1), (0.4, 2), (0.4, 1)]) as dataset:
+        assert len(dataset) == 2 and dataset.owner
+        with ProcessPoolExecutor(2, initializer=attach_dataset, initargs=(dataset.spec,)) as executor:
+            results = list(executor.map(worker_task, [0.4, 0.4], [1, 2]))
+    total_ux, writeable = results[0]
+    assert not writeable
+    assert np.allclose(total_ux, perturbation_field.compute_total_fields(TS, 0.05)['ux'])
+    assert not np.allclose(results[1][0], total_ux)
+
+
+def test_shared_case_matches_the_field(perturbation_field):
+    with SharedDataset.create([(0.4, 1)]) as dataset:
+        case = dataset[0.4, 1]
+        assert np.array_equal(case.x_grid, perturbation_field.x_grid)
+        assert np.array_equal(case.rans_values['ux'], perturbation_field.rans_values['ux'].to_numpy())
+        with pytest.raises(KeyError):
+            dataset[0.4, 3]
+
+
+def test_closed_dataset_cannot_be_attached():
+    dataset = SharedDataset.create([(0.4, 1)])
+    spec = dataset.spec
+    attached = SharedDataset.attach(spec)
+    assert not attached.owner and attached.nbytes == dataset.nbytes
+    attached.close()
+    dataset.close()
+    with pytest.raises(FileNotFoundError):
+        SharedDataset.attach(spec)
+
+
+def test_stale_segments_are_removed(tmp_path):
+    dead_pid = 2 ** 22 + 1
+    (tmp_path / f'{SEGMENT_PREFIX}_{dead_pid}_0123456789ab').write_bytes(b'0')
+    (tmp_path / f'{SEGMENT_PREFIX}_1_0123456789ab').write_bytes(b'0')
+    assert cleanup_stale_segments(tmp_path) == [f'{SEGMENT_PREFIX}_{dead_pid}_0123456789ab']
+    assert (tmp_path / f'{SEGMENT_PREFIX}_1_0123456789ab').exists()
+
+
+def test_invalid_plan():
+    with pytest.raises(ValueError):
+        SharedDataset.create([])
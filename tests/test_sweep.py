@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.Analysis.sweep import Sweep, SweepPoint
+
+CALLS = []
+INTERRUPT_AFTER = [None]
+
+
+def mean_ux(post_process, point):
+    """
+    Task of the tests: the mean of the total axial velocity, interrupted (as by Ctrl-C) after a number of calls.
+    """
+    if INTERRUPT_AFTER[0] is not None and len(CALLS) >= INTERRUPT_AFTER[0]:
+        raise KeyboardInterrupt
+    CALLS.append(point)
+    return float(post_process.graph.get('total')['ux'].to_numpy().mean())
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+    INTERRUPT_AFTER[0] = None
+
+
+def test_sweep_resumes_after_an_interruption(tmp_path):
+    sweep = Sweep(mean_ux, tmp_path, t=[0, 25, 50, 75], epsilon=[0.01, 0.1])
+    INTERRUPT_AFTER[0] = 3
+    with pytest.raises(KeyboardInterrupt):
+        sweep.run(verbose=False)
+    assert len(sweep.get_pending()) == 5
+
+    INTERRUPT_AFTER[0] = None
+    first_run = list(CALLS)
+    resumed = Sweep(mean_ux, tmp_path, t=[0, 25, 50, 75], epsilon=[0.01, 0.1])
+    progress = resumed.run(verbose=False)
+    assert progress.completed == progress.total == 8 and progress.failed == 0
+    # Only the pending points were computed by the second run
+    assert sorted(CALLS) == sorted(first_run + resumed.points[3:]) and len(CALLS) == 8
+    assert resumed.get_pending() == []
+
+    results = resumed.load_results()
+    assert len(results) == 8
+    assert results[SweepPoint(0.4, 1, 0, 0.01)] != results[SweepPoint(0.4, 1, 0, 0.1)]
+
+
+def test_sweep_rejects_another_sweep_in_the_same_directory(tmp_path):
+    Sweep(mean_ux, tmp_path, t=[0, 50])
+    with pytest.raises(ValueError):
+        Sweep(mean_ux, tmp_path, t=[0, 25])
+
+
+def test_sweep_accepts_numpy_grids(tmp_path):
+    sweep = Sweep('total', tmp_path, t=np.arange(0, 100, 25), epsilon=np.array([0.01]))
+    assert [point.t for point in sweep.points] == [0, 25, 50, 75]
+
+
+def test_point_keys_are_unique():
+    assert SweepPoint(0.4, 1, 12.3456781, 0.01).key != SweepPoint(0.4, 1, 12.3456789, 0.01).key
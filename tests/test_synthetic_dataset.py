@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.toolbox.path_directories import BASE_DIR
+from src.toolbox.synthetic_dataset import (generate_synthetic_dataset, get_rans_x_grid, get_stability_data,
+                                           get_stretched_r_grid)
+
+_READ_CASE = """
+import json
+import numpy as np
+from src.Field.post_process import PostProcess
+
+post_process = PostProcess(0.4, 2, t=10)
+total = post_process.perturbation_field.compute_total_field(10, 0.01)
+print(json.dumps({'grid': [len(post_process.x_grid), len(post_process.r_grid)], 'shape': list(total['ux'].shape),
+                  'finite': bool(all(np.isfinite(value.to_numpy()).all() for value in total.values()))}))
+"""
+
+
+def test_grids():
+    r_grid = get_stretched_r_grid(21, 20)
+    assert len(r_grid) == 21 and r_grid[0] == 0 and r_grid[-1] == 20
+    assert np.all(np.diff(r_grid) > 0)
+    x_pse = np.linspace(0, 20, 41)
+    x_rans = get_rans_x_grid(x_pse, 5)
+    assert x_rans[0] == 0 and x_rans[-1] == 20 and np.all(np.diff(x_rans) > 0)
+    # Every 5th RANS node lies on a PSE node in the first half of the domain
+    assert np.allclose(x_rans[:5 * 20 + 1:5], x_pse[:21])
+
+
+def test_wavenumber_integrals_are_consistent():
+    x = np.linspace(0, 20, 201)
+    stability = get_stability_data(x, 0.4)
+    assert np.isclose(stability['Re(int(alpha))'][-1], np.trapezoid(stability['Re(alpha)'], x))
+    assert np.allclose(stability['N'], -stability['Im(int(alpha))'])
+
+
+def test_dataset_is_read_by_the_package(tmp_path):
+    generate_synthetic_dataset(tmp_path, n_cases=2, St_list=(0.4,), nx=41, nr=21)
+    env = dict(os.environ, JET_TURBULENT_DATA=str(tmp_path), MPLBACKEND='Agg')
+    env['PYTHONPATH'] = os.pathsep.join([str(BASE_DIR), str(BASE_DIR / 'src'), env.get('PYTHONPATH', '')])
+    output = subprocess.run([sys.executable, '-c', _READ_CASE], env=env, cwd=BASE_DIR, capture_output=True,
+                            text=True, check=True)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    assert result['grid'] == [41, 21]
+    assert result['shape'] == [41, 21] and result['finite']
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        generate_synthetic_dataset(tmp_path, n_cases=0)
+    with pytest.raises(ValueError):
+        generate_synthetic_dataset(tmp_path, nx=1)
@@ -0,0 +1,47 @@
+import json
+
+from matplotlib import pyplot as plt
+
+from src.Field.post_process import PostProcess
+from src.toolbox import tracing
+from src.toolbox.tracing import span, traced
+
+
+@traced('test.double')
+def double(value):
+    return 2 * value
+
+
+def test_disabled_tracing_records_nothing():
+    tracing.reset()
+    with span('test.block'):
+        assert double(2) == 4
+    assert tracing.get_events() == []
+
+
+def test_nested_spans():
+    with tracing.tracing():
+        with span('test.outer', size=3):
+            tracing.record_bytes_read(100)
+            with span('test.inner'):
+                tracing.record_bytes_read(20)
+            double(1)
+        double(2)
+    stats = tracing.get_stats()
+    assert not tracing.is_enabled()
+    assert stats['test.double']['calls'] == 2
+    # The bytes read in a nested span are included in the enclosing one
+    assert stats['test.inner']['bytes_read'] == 20 and stats['test.outer']['bytes_read'] == 120
+    assert stats['test.outer']['total'] >= stats['test.inner']['total']
+    outer = next(event for event in tracing.get_events() if event['name'] == 'test.outer')
+    assert outer['args']['size'] == 3
+
+
+def test_chrome_trace_of_a_plot(tmp_path, capsys):
+    with tracing.tracing(tmp_path / 'trace.json', summary=True):
+        plt.close(PostProcess(0.4, 1).plot_field('rans', 'ux', show=False))
+    trace = json.loads((tmp_path / 'trace.json').read_text())
+    names = {event['name'] for event in trace['traceEvents']}
+    assert {'PostProcess.init', 'PostProcess.plot_field', 'matplotlib.contourf'} <= names
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace['traceEvents'])
+    assert 'PostProcess.plot_field' in capsys.readouterr().out